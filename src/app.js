@@ -5,6 +5,7 @@
 import { $, $$ } from "./core/dom.js";
 import { uid, clamp, pctToMul, toNum, deepCopy, escapeHtml, escapeAttr, fmt, fmtPct, quantile } from "./core/utils.js";
 import { readEmbeddedDefaults, readEmbeddedJson } from "./core/embedded.js";
+import { loadLiveDb, liveCharacterLoaded, loadLiveCharacter, loadAllLiveCharacters, loadSkillTable } from "./core/livedb.js";
 const STORAGE_KEY = "7ds_origin_theorycraft_guided_v9";
 
 // Character kits (skills + potentials): pre-release placeholders; to be refined after launch.
@@ -22,7 +23,9 @@ let defaults = readEmbeddedDefaults() || {
 
 // ----- External packs (optional) -----
 const FORMULA_PROFILES = (window.__FORMULA_PROFILES__ || {});
-const LIVE_DB_PACKAGE = (window.__DB_LIVE__ || null);
+// Monolithic window.__DB_LIVE__ (older db_live.js) or sharded index: boot shards only, kits on demand.
+const LIVE_DB_PACKAGE = (window.__DB_LIVE__ || await loadLiveDb().catch(e => { console.warn(e); return null; }));
+const LIVE_DB_SHARDED = !window.__DB_LIVE__ && !!LIVE_DB_PACKAGE;
 const LIVE_DB = (LIVE_DB_PACKAGE && LIVE_DB_PACKAGE.db) ? LIVE_DB_PACKAGE.db : null;
 const LIVE_DB_META = (LIVE_DB_PACKAGE && LIVE_DB_PACKAGE.meta) ? LIVE_DB_PACKAGE.meta : null;
 const LIVE_DBX = (LIVE_DB_PACKAGE && LIVE_DB_PACKAGE.dbx) ? LIVE_DB_PACKAGE.dbx : null;
@@ -283,6 +286,21 @@ function applyPotentialsToBuild(build, ctx=null){
 }
 
 
+function ensureLiveCharacter(charId, onLoaded=refreshAllSelectors){
+  // Sharded live DB: a character's kit (skills_by_weapon, skills) arrives on first use.
+  if (!LIVE_DB_SHARDED || !LIVE_DBX || getActiveDbX() !== LIVE_DBX || liveCharacterLoaded(charId)) return true;
+  loadLiveCharacter(LIVE_DBX, charId).then(merged => { if (merged && onLoaded) onLoaded(); }).catch(e => console.warn(e));
+  return false;
+}
+
+function prefetchLiveCharacters(){
+  // Kits of the characters used by saved builds/rotations, so simulations never see a missing kit.
+  const ids = new Set();
+  for (const b of state.builds || []) { const id = b.character_id || b.source?.character_id; if (id) ids.add(String(id)); }
+  for (const r of state.rotations || []) { if (r.character_id) ids.add(String(r.character_id)); }
+  for (const id of ids) ensureLiveCharacter(id);
+}
+
 function getActiveDbX(){
   if (state.settings.db_source === 'session' && state._sessionDbX) return state._sessionDbX;
   if (state.settings.db_source === 'imported' && state.dbx) return state.dbx;
@@ -1552,6 +1570,7 @@ function getSkillsForCharacter(charId, weaponType=null){
   if (!charId) return [];
   const dbx = getActiveDbX();
   if (dbx && dbx.modules && dbx.modules.skills){
+    ensureLiveCharacter(charId);
     let arr = Object.values(dbx.modules.skills).filter(s => String(s.character_id) === String(charId));
     if (weaponType) arr = arr.filter(s => String(s.weapon_type) === String(weaponType));
     arr.sort((a,b) => (toNum(a.slot, 999) - toNum(b.slot, 999)) || String(a.name||'').localeCompare(String(b.name||'')) || String(a.id||'').localeCompare(String(b.id||'')));
@@ -2088,6 +2107,28 @@ function renderDbList(box, arr){
 
 
 
+function fillSkillTableRows(dbx, charId){
+  // Precomputed skill tables (tools/skill_tables.py, lazy live shard): hits, multiplier and reference damage per skill.
+  loadSkillTable(charId).then(tables => {
+    if (!tables) return;
+    const skills = (dbx.modules && dbx.modules.skills) || {};
+    const profile = state.settings.formula_profile;
+    for (const el of document.querySelectorAll("#modalBody [data-table-skill]")){
+      const t = el.dataset.tableChar === String(charId) ? tables[el.dataset.tableWt] : null;
+      if (!t) continue;
+      const j = t.skills.findIndex(sid => (skills[sid] || {}).name === el.dataset.tableSkill);
+      if (j < 0) continue;
+      const dmg = (t.dmg[profile] || Object.values(t.dmg)[0] || [])[j];
+      el.textContent = [
+        `${t.hits[j]} hit${t.hits[j] > 1 ? "s" : ""}`,
+        t.total_mult_pct[j] != null ? `${fmtPct(t.total_mult_pct[j])} ATK` : null,
+        t.hits_per_sec[j] != null ? `${fmt(t.hits_per_sec[j])} hits/s` : null,
+        dmg != null ? `réf. 1000 ATK : ${fmt(dmg)}` : null,
+      ].filter(Boolean).join(" · ");
+    }
+  }).catch(e => console.warn(e));
+}
+
 function openDbEntityModal(kind, id){
   const dbx = getActiveDbX();
   if (!dbx || !dbx.modules) {
@@ -2095,6 +2136,7 @@ function openDbEntityModal(kind, id){
     return;
   }
   if (kind === "character"){
+    if (!ensureLiveCharacter(id, () => openDbEntityModal(kind, id))) return;
     const c = (dbx.modules.characters||{})[id];
     if (!c) return;
     const img = c.image_url ? `<img class="dbHeroImg" src="${escapeAttr(c.image_url)}" alt=""/>` : "";
@@ -2110,6 +2152,7 @@ function openDbEntityModal(kind, id){
             <div class="skillMeta">${escapeHtml([s.type, s.key ? `Key ${s.key}` : null, (s.cooldown_sec!=null)?`${s.cooldown_sec}s` : null].filter(Boolean).join(" · "))}</div>
           </div>
           <div class="skillDesc">${escapeHtml(s.description || "")}</div>
+          <div class="skillMeta" data-table-char="${escapeAttr(id)}" data-table-wt="${escapeAttr(wt)}" data-table-skill="${escapeAttr(s.name || "")}"></div>
         </div>
       `).join("");
       skillsHtml += `
@@ -2152,6 +2195,7 @@ function openDbEntityModal(kind, id){
       `,
       [{label:"OK", kind:"primary", onClick: closeModal}]
     );
+    fillSkillTableRows(dbx, id);
     return;
   }
 
@@ -2232,9 +2276,12 @@ function bindDb(){
     }
   });
 
-  $("#btnDbExport")?.addEventListener("click", () => {
+  $("#btnDbExport")?.addEventListener("click", async () => {
     const db = getActiveDb();
     const dbx = getActiveDbX();
+    if (LIVE_DB_SHARDED && dbx === LIVE_DBX){
+      try{ await loadAllLiveCharacters(LIVE_DBX); }catch(e){ console.warn(e); }
+    }
     downloadJson("7ds_origin_db_export.json", {db, dbx, meta:{exported:new Date().toISOString(), schema: db.schema_version}});
   });
 
@@ -5067,6 +5114,7 @@ function init(){
 
   refreshAll();
   setMode(state.settings.mode || "simple");
+  prefetchLiveCharacters();
 
   // UX: first run onboarding
   try{ maybeShowFirstRun(); }catch(e){ console.warn(e); }
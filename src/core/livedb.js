@@ -0,0 +1,79 @@
+// Sharded live DB (module)
+// data/db_live.js defines window.__DB_LIVE_INDEX__ (meta + shard file names, see tools/update_db.py);
+// shards are data/live/<name>.<hash>.js scripts, injected as <script> tags (no fetch, cache-friendly).
+const INDEX = window.__DB_LIVE_INDEX__ || null;
+const pending = new Map();
+const loadedChars = new Set();
+
+function shardStore(){
+  return (window.__DB_LIVE_SHARDS__ = window.__DB_LIVE_SHARDS__ || {});
+}
+
+export function loadShard(name){
+  if (!INDEX || !INDEX.shards || !INDEX.shards[name]) return Promise.reject(new Error("unknown DB shard: " + name));
+  if (shardStore()[name] !== undefined) return Promise.resolve(shardStore()[name]);
+  if (pending.has(name)) return pending.get(name);
+  const p = new Promise((resolve, reject) => {
+    const el = document.createElement("script");
+    el.src = (INDEX.base || "") + INDEX.shards[name];
+    el.async = true;
+    el.onload = () => {
+      pending.delete(name);
+      const data = shardStore()[name];
+      if (data === undefined) reject(new Error("DB shard did not register: " + name));
+      else resolve(data);
+    };
+    el.onerror = () => { pending.delete(name); reject(new Error("DB shard failed to load: " + el.src)); };
+    document.head.appendChild(el);
+  });
+  pending.set(name, p);
+  return p;
+}
+
+// {meta, db, dbx} like the former monolithic window.__DB_LIVE__, with character kits not loaded yet.
+export async function loadLiveDb(){
+  if (!INDEX) return null;
+  const boot = INDEX.boot || [];
+  const parts = await Promise.all(boot.map(loadShard));
+  const got = {};
+  boot.forEach((name, i) => { got[name] = parts[i]; });
+
+  const doc = INDEX.doc || {};
+  const modules = Object.assign({}, doc.modules || {});
+  for (const name of boot){
+    if (name.startsWith("module.")) modules[name.slice("module.".length)] = got[name];
+  }
+  modules.characters = got.characters || {};
+  modules.skills = Object.assign({}, got.skills || {});
+  return {meta: INDEX.meta || null, db: got.db || null, dbx: Object.assign({}, doc, {modules})};
+}
+
+export function liveCharacterLoaded(id){
+  return !INDEX || !INDEX.shards || !INDEX.shards["char." + id] || loadedChars.has(String(id));
+}
+
+// Merge the kit shard of one character into dbx (modules.characters[id] + modules.skills).
+// Resolves true when new data was merged, false when there was nothing to load.
+export async function loadLiveCharacter(dbx, id){
+  if (liveCharacterLoaded(id)) return false;
+  const kit = await loadShard("char." + id);
+  if (loadedChars.has(String(id))) return false;
+  const mods = dbx.modules;
+  mods.characters[id] = Object.assign(mods.characters[id] || {}, kit.character || {});
+  Object.assign(mods.skills, kit.skills || {});
+  loadedChars.add(String(id));
+  return true;
+}
+
+export async function loadAllLiveCharacters(dbx){
+  const ids = Object.keys((INDEX && INDEX.shards) || {}).filter(n => n.startsWith("char.")).map(n => n.slice("char.".length));
+  const res = await Promise.all(ids.map(id => loadLiveCharacter(dbx, id)));
+  return res.some(Boolean);
+}
+
+// Precomputed skill tables of one character ({weapon type: table}, see tools/skill_tables.py),
+// or null when the build has none.
+export async function loadSkillTable(id){
+  if (!INDEX || !INDEX.shards || !INDEX.shards["tables." + id]) return null;
+  return loadShard("tables." + id);
+}
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Static build artifacts
+
+Minified and precompressed outputs for the static host, plus a per-module size report:
+
+- dumps_min(obj)        minified JSON (no whitespace, MIN_SEPARATORS), the serialization of every web artifact
+- precompress(path)     <path>.gz (gzip -9) and <path>.br (brotli q11, only when a brotli module
+                        is importable); both byte-stable for identical input (gzip mtime 0), so
+                        content hashes of the artifacts do not change between identical builds
+- size_report(dbx)      per module: records, pretty/minified/gzip/brotli bytes and JSON parse time;
+                        sizes are counted on the streamed serialization (json_stream.iter_json(), one
+                        record at a time, incremental gzip / brotli), parse time is measured on the first
+                        PARSE_SAMPLE_CHARS of records and scaled to the module size, so the report's
+                        memory does not grow with the DB
+
+precompress() writes both variants through json_stream.atomic_write(): a crash leaves the previous
+.gz / .br, never a truncated one.
+
+CLI (report on an existing build):
+  python tools/artifacts.py [data/db.json]
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from json_stream import STREAM_DEPTH, atomic_write, iter_json
+
+try:
+    import brotli as _brotli
+except ImportError:
+    try:
+        import brotlicffi as _brotli
+    except ImportError:
+        _brotli = None
+
+MIN_SEPARATORS = (",", ":")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+PARSE_RUNS = 5
+PARSE_SAMPLE_CHARS = 1 << 16
+READ_CHUNK = 1 << 16
+
+
+def dumps_min(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=MIN_SEPARATORS)
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data: bytes) -> Optional[bytes]:
+    return _brotli.compress(data, quality=11) if _brotli is not None else None
+
+
+def _brotli_compressor() -> Any:
+    return _brotli.Compressor(quality=11) if _brotli is not None else None
+
+
+def _brotli_feed(br: Any, data: bytes) -> bytes:
+    # brotli: process(); brotlicffi: compress()
+    return (br.process if hasattr(br, "process") else br.compress)(data)
+
+
+def _read_chunks(path: Path):
+    with open(path, "rb") as src:
+        yield from iter(lambda: src.read(READ_CHUNK), b"")
+
+
+def precompress(path: Path) -> Dict[str, int]:
+    """Write path.gz / path.br next to `path` (drops a stale .br when brotli is unavailable)."""
+    gz_path, br_path = Path(f"{path}.gz"), Path(f"{path}.br")
+    with atomic_write(gz_path, compress=True) as out:
+        for block in _read_chunks(path):
+            out.write(block)
+    sizes = {"raw": path.stat().st_size, "gzip": gz_path.stat().st_size}
+    br = _brotli_compressor()
+    if br is not None:
+        with atomic_write(br_path) as out:
+            for block in _read_chunks(path):
+                out.write(_brotli_feed(br, block))
+            out.write(br.finish())
+        sizes["brotli"] = br_path.stat().st_size
+    else:
+        br_path.unlink(missing_ok=True)
+    return sizes
+
+
+def is_precompressed(path: Path) -> bool:
+    """True when every variant precompress() would write exists."""
+    return Path(f"{path}.gz").exists() and (_brotli is None or Path(f"{path}.br").exists())
+
+
+def artifact_names(name: str) -> List[str]:
+    """A file name and its precompressed variants."""
+    return [name] + [name + s for s in COMPRESSED_SUFFIXES]
+
+
+def _parse_sample(obj: Any, depth: int = STREAM_DEPTH) -> Any:
+    """
+    The first records of `obj`, up to PARSE_SAMPLE_CHARS of minified JSON. Containers above
+    `depth` (as streamed by iter_json) are sampled recursively, records below it are taken whole.
+    """
+    budget = [PARSE_SAMPLE_CHARS]
+
+    def take(o: Any, level: int) -> Any:
+        if level >= depth or not isinstance(o, (dict, list)) or not o:
+            budget[0] -= len(dumps_min(o))
+            return o
+        is_dict = isinstance(o, dict)
+        out: Any = {} if is_dict else []
+        for item in (o.items() if is_dict else o):
+            if budget[0] <= 0:
+                break
+            if is_dict:
+                out[item[0]] = take(item[1], level + 1)
+            else:
+                out.append(take(item, level + 1))
+        return out
+
+    return take(obj, 0)
+
+
+def _parse_ms(obj: Any, min_bytes: int, depth: int = STREAM_DEPTH) -> float:
+    """json.loads time of `obj`, measured on a sample and scaled by size."""
+    raw = dumps_min(_parse_sample(obj, depth))
+    runs = []
+    for _ in range(PARSE_RUNS):
+        t0 = time.perf_counter()
+        json.loads(raw)
+        runs.append(time.perf_counter() - t0)
+    size = len(raw.encode("utf-8"))
+    return round(statistics.median(runs) * 1000 * (min_bytes / size if size else 1.0), 3)
+
+
+def _sizes(obj: Any, depth: int = STREAM_DEPTH) -> Dict[str, Any]:
+    """Pretty / minified / gzip / brotli bytes of `obj`, counted chunk by chunk (never serialized whole)."""
+    json_bytes = sum(len(chunk.encode("utf-8")) for chunk in iter_json(obj, indent=2, depth=depth))
+    gz = zlib.compressobj(9, zlib.DEFLATED, 31)  # gzip container, same size as gzip_bytes()
+    br = _brotli_compressor()
+    min_bytes = gz_bytes = br_bytes = 0
+    for chunk in iter_json(obj, separators=MIN_SEPARATORS, depth=depth):
+        data = chunk.encode("utf-8")
+        min_bytes += len(data)
+        gz_bytes += len(gz.compress(data))
+        if br is not None:
+            br_bytes += len(_brotli_feed(br, data))
+    gz_bytes += len(gz.flush())
+    if br is not None:
+        br_bytes += len(br.finish())
+    return {
+        "json_bytes": json_bytes,
+        "min_bytes": min_bytes,
+        "gzip_bytes": gz_bytes,
+        "brotli_bytes": br_bytes if br is not None else None,
+        "parse_ms": _parse_ms(obj, min_bytes, depth),
+    }
+
+
+def _file_sizes(json_path: Path, min_path: Path) -> Dict[str, Any]:
+    """Sizes of an already written db.json / db.min.json pair (and its precompressed variants)."""
+    br = Path(f"{min_path}.br")
+    return {
+        "json_bytes": json_path.stat().st_size,
+        "min_bytes": min_path.stat().st_size,
+        "gzip_bytes": Path(f"{min_path}.gz").stat().st_size,
+        "brotli_bytes": br.stat().st_size if _brotli is not None and br.exists() else None,
+        "parse_ms": None,
+    }
+
+
+def size_report(dbx: Dict[str, Any], live_index: Optional[Dict[str, Any]] = None, live_dir: Optional[Path] = None,
+                json_path: Optional[Path] = None, min_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Transfer size and parse cost per module (and per live shard group when given).
+    With the written db.json / db.min.json paths, the totals are read from the files instead of
+    serializing the whole DB once more.
+    """
+    modules = {}
+    for module, recs in (dbx.get("modules") or {}).items():
+        modules[module] = {"records": len(recs) if isinstance(recs, (dict, list)) else None, **_sizes(recs, depth=1)}
+    rest = {k: v for k, v in dbx.items() if k != "modules"}
+    report: Dict[str, Any] = {
+        "generated_at": dbx.get("generated_at"),
+        "brotli": _brotli is not None,
+        "modules": modules,
+        "other_keys": _sizes(rest),
+        "total": _file_sizes(json_path, min_path) if json_path and min_path else _sizes(dbx),
+    }
+    if live_index is not None and live_dir is not None:
+        boot = set(live_index.get("boot") or [])
+        groups: Dict[str, Dict[str, int]] = {}
+        for name, fname in (live_index.get("shards") or {}).items():
+            group = "boot" if name in boot else name.split(".", 1)[0]
+            g = groups.setdefault(group, {"files": 0, "min_bytes": 0, "gzip_bytes": 0,
+                                          "brotli_bytes": 0 if _brotli is not None else None})
+            g["files"] += 1
+            for key, suffix in (("min_bytes", ""), ("gzip_bytes", ".gz"), ("brotli_bytes", ".br")):
+                p = live_dir / (fname + suffix)
+                if p.exists() and g[key] is not None:
+                    g[key] += p.stat().st_size
+        report["live_shards"] = groups
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    def kb(n: Optional[int]) -> str:
+        return f"{n / 1024:9.1f}" if n is not None else "        —"
+
+    lines = [f"{'module':14} {'records':>8} {'json KB':>9} {'min KB':>9} {'gzip KB':>9} {'br KB':>9} {'parse ms':>9}"]
+    rows = list(report["modules"].items()) + [("(other keys)", report["other_keys"]), ("TOTAL", report["total"])]
+    for name, r in rows:
+        recs = r.get("records")
+        lines.append(f"{name:14} {recs if recs is not None else '':>8} {kb(r['json_bytes'])} {kb(r['min_bytes'])} "
+                     f"{kb(r['gzip_bytes'])} {kb(r['brotli_bytes'])} {r['parse_ms'] if r['parse_ms'] is not None else '—':>9}")
+    for group, g in (report.get("live_shards") or {}).items():
+        lines.append(f"live {group:9} {g['files']:>8} {'':9} {kb(g['min_bytes'])} {kb(g['gzip_bytes'])} "
+                     f"{kb(g['brotli_bytes'])}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parents[1] / "data" / "db.json"
+    dbx = json.loads(path.read_text(encoding="utf-8"))
+    print(format_report(size_report(dbx)))
+    if _brotli is None:
+        print("[INFO] brotli not installed: .br sizes skipped (pip install brotli)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized damage engine (tools/damage_engine.py).
+
+Evaluates N random (build, skill, enemy) rows with DamageEngine.expected() (NumPy, one pass over
+the whole batch) and with a per-row scalar port of singleHitDamage()/actionDamage() kept below as
+the reference, for every formula profile plus the alternate formula switches (linear mitigation,
+additive pierce, early element, crit before DEF), and checks both agree. Skills are the ones of
+data/db.json plus synthetic ones carrying every parsed effect type; builds (stats + scoped
+add/mul buffs) and enemies are random.
+
+--js also runs a sample of the rows through the functions of src/app.js themselves (extracted and
+run with node) and checks the engine against them.
+
+Usage:
+  python tools/bench/bench_damage.py [--db data/db.json] [--rows 200000] [--scalar-rows 20000] [--js 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import damage_engine as de  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+RTOL = 1e-9
+ELEMENTS = ["neutral", "fire", "wind", "earth", "water", "light", "dark", ""]
+BUFF_STATS = ["atk_pct", "dmg_pct", "skill_dmg_pct", "ult_dmg_pct", "crit_rate_pct", "crit_dmg_pct",
+              "pierce_pct", "def_pen_pct", "res_pen_pct", "atk", "dmg"]
+EFFECT_TYPES = ["atk_pct", "crit_dmg_bonus", "crit_rate_pct", "ignore_def_pct", "bonus_if_debuffed",
+                "bonus_if_hp_below", "bonus_per_stack", "bonus_per_debuff", "bonus_if_ally_count_at_least",
+                "crit_dmg_bonus_pct", "true_damage"]
+VARIANTS = [
+    ("", {}),
+    ("linear", {"mitigation_model": "linear"}),
+    ("additive+beforeDef", {"pierce_mode": "additive", "crit_order": "beforeDef"}),
+    ("early+hidden", {"element_stage": "early", "hidden_defense_coefficient": 1.15, "hidden_global_multiplier": 0.9}),
+    ("context", {"context_stacks": 2.5, "context_hp_pct": 30, "context_debuff_count": 3, "context_ally_count": 2,
+                 "context_enemy_debuffed": True}),
+]
+
+
+# ---------------------------------------------------------------------------
+# Scalar reference (one row at a time, as src/app.js does)
+
+def reference_damage(build: Mapping[str, Any], skill: Mapping[str, Any], enemy: Mapping[str, Any],
+                     settings: Mapping[str, Any], burst: bool = False) -> float:
+    """actionCtxFromAction() + actionDamage(..., "expected") for one row, times the Burst bonus."""
+    sk = de.normalize_skill(skill)
+    kind = de.skill_kind(sk["type"])
+    mult = de.js_num(sk["multiplier"], 0) / 100
+    hit_mults = [de.js_num(x, 0) / 100 for x in sk["hit_multipliers_pct"] or []]
+    hits = max(1, de.js_round(de.js_num(sk["hits"], 1)))
+    ctx = {
+        "debuffed": bool(enemy.get("is_debuffed") or settings.get("enemy_debuffed") or settings.get("context_enemy_debuffed")),
+        "hp": de.js_num(settings.get("context_hp_pct", de._MISSING), 100),
+        "stacks": de.js_num(settings.get("context_stacks", de._MISSING), 0),
+        "debuffs": de.js_num(settings.get("context_debuff_count", de._MISSING), 0),
+        "allies": de.js_num(settings.get("context_ally_count", de._MISSING), 4),
+    }
+
+    def one(m: float) -> float:
+        cs = de.computed_stats(build, kind, settings)
+        for e in sk["parsed_effects"]:
+            if not isinstance(e, dict) or not e.get("type"):
+                continue
+            t, v = e["type"], de.js_num(e.get("value", de._MISSING), 0)
+            thr = de.js_num(e.get("threshold", de._MISSING), 0)
+            if t == "atk_pct":
+                cs["atk"] = cs["atk"] * (1 + v / 100)
+            elif t == "crit_dmg_bonus":
+                cs["crit_dmg_pct"] += v
+            elif t == "crit_rate_pct":
+                cs["crit_rate_pct"] += v
+            elif t == "ignore_def_pct":
+                cs["def_pen_pct"] += v
+            elif t == "bonus_if_debuffed" and ctx["debuffed"]:
+                cs["dmg_bonus_pct"] += v
+            elif t == "bonus_if_hp_below" and ctx["hp"] <= thr:
+                cs["dmg_bonus_pct"] += v
+            elif t == "bonus_per_stack":
+                cs["dmg_bonus_pct"] += v * max(0, de.js_round(ctx["stacks"]))
+            elif t == "bonus_per_debuff":
+                cs["dmg_bonus_pct"] += v * max(0, de.js_round(ctx["debuffs"]))
+            elif t == "bonus_if_ally_count_at_least" and max(0, de.js_round(ctx["allies"])) >= max(0, de.js_round(thr)):
+                cs["dmg_bonus_pct"] += v
+
+        enemy_red = 1 - de._num(enemy, "dmg_reduction_pct", 0) / 100
+        taken_mul = 1 + cs["dmg_taken_pct"] / 100
+        bonus = cs["dmg_bonus_pct"]
+        if kind == "skill":
+            bonus += cs["skill_dmg_pct"]
+        if kind == "ultimate":
+            bonus += cs["ult_dmg_pct"]
+        ele = de.element_multiplier(cs["element"], enemy.get("element") or "neutral", settings)
+        stage = settings.get("element_stage") or "late"
+        eff_def = max(0, de._num(enemy, "def", 0) * de._setting(settings, "hidden_defense_coefficient", 1)
+                      * (1 - cs["def_pen_pct"] / 100))
+        k = max(1, de._num(settings, "mitigation_k", math.nan))
+        if settings.get("mitigation_model") == "linear":
+            mit = 1 - min(max(eff_def / k, 0), 0.80)
+        else:
+            mit = 1 - eff_def / (eff_def + k)
+        eff_res = min(max(de._num(enemy, "resistance_pct", 0) - cs["res_pen_pct"], -100), de._setting(settings, "resist_cap", 200))
+        pierce = min(max((cs["pierce_pct"] - eff_res) / 100, -0.90), 3.00)
+        crit_res = min(max(de._num(enemy, "crit_resist_pct", 0), 0), 200)
+        crit_def = min(max(de._num(enemy, "crit_def_pct", 0), 0), 300)
+        cc = min(max(cs["crit_rate_pct"] - crit_res + cs["crit_resist_pen_pct"], 0), de._setting(settings, "crit_cap", 100)) / 100
+        cd = max(0, cs["crit_dmg_pct"] - crit_def + cs["crit_def_pen_pct"]) / 100
+        crit_mul = (1 - cc) * 1 + cc * (1 + cd)
+        core = cs["atk"] * m * (ele if stage == "early" else 1)
+        if (settings.get("crit_order") or "afterDef") == "beforeDef":
+            core *= crit_mul
+        if (settings.get("pierce_mode") or "multiplicative") == "additive":
+            after = core * mit + core * pierce
+        else:
+            after = core * mit * (1 + pierce)
+        base = after * (1 + bonus / 100) * cs["dmg_mul"] * taken_mul * enemy_red * (ele if stage == "late" else 1)
+        base *= de._setting(settings, "hidden_global_multiplier", 1)
+        if (settings.get("crit_order") or "afterDef") == "afterDef":
+            base *= crit_mul
+        return base
+
+    total = sum(one(hm) for hm in hit_mults) if hit_mults else one(mult) * hits
+    if burst:
+        total *= (1 + (settings.get("burst_bonus_pct") or 0) / 100) * (1 - (enemy.get("burst_resist") or 0))
+    return total
+
+
+# ---------------------------------------------------------------------------
+# src/app.js through node
+
+JS_FUNCTIONS = ["parseOrdinalHitMultipliersPct", "normalizeDbxSkill", "elementMultiplier", "aggregateBuffs",
+                "computedStatsForContext", "mitigationFactorWithDefPen", "applyParsedEffectsToComputedStats",
+                "actionCtxFromAction", "singleHitDamage", "actionDamage"]
+JS_MAIN = """
+let CURRENT_SKILL = null;
+function resolveSkillForAction(){ return CURRENT_SKILL; }
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const out = input.rows.map(([bi, si, ei, burst]) => {
+  const build = input.builds[bi], enemy = input.enemies[ei], settings = input.settings;
+  CURRENT_SKILL = normalizeDbxSkill(input.skills[si]);
+  const ctx = actionCtxFromAction(build, null, {skill_index: 0}, enemy, settings);
+  let d = actionDamage(build, enemy, settings, ctx, "expected", null);
+  if (burst) d *= (1 + (settings.burst_bonus_pct || 0) / 100) * (1 - (enemy.burst_resist || 0));
+  return d;
+});
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def js_function(source: str, name: str) -> str:
+    """Text of `function name(...){...}` in source (brace matching; these functions hold no brace in strings)."""
+    m = re.search(r"^(?:export\s+)?function\s+" + name + r"\(", source, re.M)
+    if not m:
+        raise KeyError(name)
+    depth, i = 0, source.index("{", m.end())
+    for j in range(i, len(source)):
+        if source[j] == "{":
+            depth += 1
+        elif source[j] == "}":
+            depth -= 1
+            if depth == 0:
+                return source[m.start():j + 1].replace("export function", "function", 1)
+    raise ValueError(name)
+
+
+def js_damage(builds, skills, enemies, settings, rows: Sequence[Sequence[int]]) -> List[float]:
+    utils = (ROOT / "src" / "core" / "utils.js").read_text(encoding="utf-8")
+    app = (ROOT / "src" / "app.js").read_text(encoding="utf-8")
+    script = "\n".join([js_function(utils, n) for n in ("clamp", "pctToMul", "toNum")]
+                       + [js_function(app, n) for n in JS_FUNCTIONS] + [JS_MAIN])
+    payload = json.dumps({"builds": builds, "skills": skills, "enemies": enemies, "settings": settings,
+                          "rows": [list(map(int, r[:3])) + [bool(r[3])] for r in rows]})
+    res = subprocess.run(["node", "-e", script], input=payload, capture_output=True, text=True, check=True)
+    return [math.nan if v is None else v for v in json.loads(res.stdout)]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+
+def random_builds(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    builds = []
+    for i in range(n):
+        stats = {
+            "atk": rng.uniform(300, 6000), "crit_rate_pct": rng.uniform(0, 130), "crit_dmg_pct": rng.uniform(0, 350),
+            "pierce_pct": rng.uniform(-120, 200), "def_pen_pct": rng.uniform(0, 110), "res_pen_pct": rng.uniform(0, 80),
+            "crit_resist_pen_pct": rng.choice([0, 0, rng.uniform(0, 40)]), "crit_def_pen_pct": rng.choice([0, rng.uniform(0, 60)]),
+            "dmg_bonus_pct": rng.uniform(0, 80), "dmg_taken_pct": rng.choice([0, rng.uniform(0, 30)]),
+            "skill_dmg_pct": rng.uniform(0, 40), "ult_dmg_pct": rng.uniform(0, 60), "element": rng.choice(ELEMENTS),
+        }
+        if rng.random() < 0.2:
+            stats["dmg_mult_pct"] = rng.uniform(-10, 30)
+        if rng.random() < 0.1:
+            stats["atk"] = str(round(stats["atk"]))
+        buffs = [{"stat": rng.choice(BUFF_STATS), "value": rng.uniform(-10, 50), "type": rng.choice(["add", "add", "mul"]),
+                  "scope": rng.choice(["all", "skill", "ultimate", None, "other"]), "enabled": rng.random() > 0.1}
+                 for _ in range(rng.randrange(0, 6))]
+        builds.append({"id": f"b{i}", "stats": stats, "buffs": buffs})
+    return builds
+
+
+def random_enemies(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [{
+        "def": rng.choice([0, rng.uniform(0, 4000)]), "resistance_pct": rng.uniform(-20, 150),
+        "crit_resist_pct": rng.choice([0, rng.uniform(0, 80)]), "crit_def_pct": rng.choice([0, rng.uniform(0, 120)]),
+        "dmg_reduction_pct": rng.uniform(0, 30), "burst_resist": rng.uniform(0, 0.5), "element": rng.choice(ELEMENTS),
+        "is_debuffed": rng.random() < 0.3,
+    } for _ in range(n)]
+
+
+def synthetic_skills(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    skills = []
+    for i in range(n):
+        effects = [{"type": rng.choice(EFFECT_TYPES), "value": rng.uniform(5, 60),
+                    **({"threshold": rng.choice([25, 50, 3.5])} if rng.random() < 0.5 else {})}
+                   for _ in range(rng.randrange(1, 4))]
+        hits = [{"hit": h + 1, "multiplier_pct": rng.uniform(20, 300), "scaling": "ATK"} for h in range(rng.randrange(0, 6))]
+        skills.append({
+            "id": f"syn{i}", "name": f"Synthetic {i}", "type": rng.choice(["Normal Skill", "Special Skill", "Ultimate Move", "Tag Skill", "Passive"]),
+            "description": rng.choice(["Deals damage equal to 180% of Attack.", "No numbers here.", "1st hit: 50% 2nd hit: 75.5%"]),
+            "hits": hits, "multipliers": [{"value_pct": rng.choice([120, "85", None]), "scaling": "ATK", "context": ""}] if rng.random() < 0.5 else [],
+            "parsed_effects": effects,
+        })
+    return skills
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--rows", type=int, default=200000, help="Rows evaluated by the vectorized engine.")
+    ap.add_argument("--scalar-rows", type=int, default=20000, help="Rows checked (and timed) with the scalar reference.")
+    ap.add_argument("--js", type=int, default=0, help="Also check N rows per settings variant against src/app.js (node).")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = de.load_skills(args.db) + synthetic_skills(64, rng)
+    builds, enemies = random_builds(64, rng), random_enemies(64, rng)
+    np_rng = np.random.default_rng(args.seed)
+    rows = np.stack([np_rng.integers(0, len(builds), args.rows), np_rng.integers(0, len(skills), args.rows),
+                     np_rng.integers(0, len(enemies), args.rows), np_rng.random(args.rows) < 0.3], axis=1)
+    n_check = min(args.scalar_rows, args.rows)
+    if args.js and not shutil.which("node"):
+        print("[WARN] node not found: --js skipped", file=sys.stderr)
+        args.js = 0
+
+    profiles = de.load_formula_profiles()
+    defaults = de.load_site_defaults()
+    print(f"rows: {args.rows} ({len(builds)} builds x {len(skills)} skills x {len(enemies)} enemies), "
+          f"scalar reference on {n_check}" + (f", src/app.js on {args.js}" if args.js else ""))
+    for name in [None, *profiles]:
+        for tag, variant in VARIANTS if name is None else VARIANTS[:1]:
+            settings = {**de.profile_settings(name, profiles, defaults), **variant}
+            label = (name or "defaults") + (f" ({tag})" if tag else "")
+            engine = de.DamageEngine(settings)
+            t0 = time.perf_counter()
+            bt = de.BuildTable.from_builds(builds, settings)
+            st = de.SkillTable.from_records(skills, settings)
+            et = de.EnemyTable.from_enemies(enemies, settings)
+            t1 = time.perf_counter()
+            got = engine.expected(bt, st, et, rows[:, 0], rows[:, 1], rows[:, 2], burst=rows[:, 3].astype(bool))
+            t2 = time.perf_counter()
+            ref = np.array([reference_damage(builds[b], skills[s], enemies[e], settings, bool(u)) for b, s, e, u in rows[:n_check]])
+            t3 = time.perf_counter()
+            bad = ~np.isclose(got[:n_check], ref, rtol=RTOL, atol=1e-9, equal_nan=True)
+            if bad.any():
+                i = int(np.flatnonzero(bad)[0])
+                print(f"[FAIL] {label}: row {rows[i].tolist()} engine {got[i]!r} != reference {ref[i]!r}", file=sys.stderr)
+                return 2
+            js_note = ""
+            if args.js:
+                sample = rows[:args.js]
+                js = np.array(js_damage(builds, skills, enemies, settings, sample.tolist()))
+                bad = ~np.isclose(got[:len(sample)], js, rtol=RTOL, atol=1e-9, equal_nan=True)
+                if bad.any():
+                    i = int(np.flatnonzero(bad)[0])
+                    print(f"[FAIL] {label}: row {rows[i].tolist()} engine {got[i]!r} != app.js {js[i]!r}", file=sys.stderr)
+                    return 2
+                js_note = "  app.js ok"
+            per_row_scalar = (t3 - t2) / max(1, n_check)
+            print(f"{label:30} tables {1000 * (t1 - t0):7.2f} ms  vectorized {1000 * (t2 - t1):8.2f} ms "
+                  f"({(t2 - t1) * 1e9 / args.rows:7.1f} ns/row)  scalar {per_row_scalar * 1e6:6.1f} us/row  "
+                  f"speedup x{per_row_scalar * args.rows / max(t2 - t1, 1e-12):.0f}{js_note}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
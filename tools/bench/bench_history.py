@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark: columnar snapshot history (tools/history_table.py).
+
+Builds a synthetic snapshot store in a temp directory: data/db.json, then --snapshots daily
+snapshots each changing a few weapons' equipment_attack, a few skills' hit multipliers and
+descriptions, and now and then removing / re-adding a weapon. The history is appended in
+--batches runs (incremental appends, like the daily build), then:
+- checks series() of sampled (module, id, field) against the values read back from every
+  snapshot (store.read(), flattened), change points and removals included;
+- times the time-series queries against rebuilding every snapshot, and reports the compressed
+  column bytes the queries read against the snapshot JSON the rebuild materializes.
+
+Usage:
+  python tools/bench/bench_history.py [--snapshots 180] [--batches 6] [--samples 30]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import history_table as ht  # noqa: E402
+from snapshot_store import SnapshotStore  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+SEED = 7
+
+
+def mutate(db: Dict[str, Any], rng: random.Random, removed: Dict[str, Any]) -> None:
+    mods = db["modules"]
+    for wid in rng.sample(sorted(mods["weapons"]), 3):
+        mods["weapons"][wid]["equipment_attack"] = int(mods["weapons"][wid].get("equipment_attack") or 0) + rng.choice([-8, 5, 12])
+    skills = [sid for sid, sk in mods["skills"].items() if sk.get("hits")]
+    for sid in rng.sample(skills, 4):
+        h = rng.choice(mods["skills"][sid]["hits"])
+        h["multiplier_pct"] = round(float(h.get("multiplier_pct") or 0) * rng.choice([0.9, 1.05, 1.1]), 1)
+    sid = rng.choice(sorted(mods["skills"]))
+    mods["skills"][sid]["description"] = (mods["skills"][sid].get("description") or "") + " (adjusted)"
+    if removed and rng.random() < 0.5:
+        wid, rec = removed.popitem()
+        mods["weapons"][wid] = rec
+    elif rng.random() < 0.2:
+        wid = rng.choice(sorted(mods["weapons"]))
+        removed[wid] = mods["weapons"].pop(wid)
+
+
+def expected_series(store: SnapshotStore, sids: List[str], keys: List[Tuple[str, str, str]]) -> Tuple[Dict[Tuple[str, str, str], list], int]:
+    """Change points of each key, from every snapshot read back in full; plus the snapshot bytes rebuilt."""
+    out: Dict[Tuple[str, str, str], list] = {k: [] for k in keys}
+    last: Dict[Tuple[str, str, str], Any] = {}
+    missing = object()
+    size = 0
+    for sid in sids:
+        raw = store.read_bytes(sid)
+        size += len(raw)
+        mods = json.loads(raw.decode("utf-8"))["modules"]
+        for k in keys:
+            module, rid, path = k
+            rec = mods.get(module, {}).get(rid)
+            v = ht.flatten(rec).get(path, missing) if rec is not None else missing
+            prev = last.get(k, missing)
+            if v is missing:
+                if prev is not missing:
+                    out[k].append((sid, None))
+            elif prev is missing or not ht._same(prev, v):
+                out[k].append((sid, float(v) if ht._is_num(v) else v))
+            last[k] = v
+    return out, size
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--snapshots", type=int, default=180)
+    ap.add_argument("--batches", type=int, default=6, help="Incremental appends over the snapshots.")
+    ap.add_argument("--samples", type=int, default=30, help="(module, id, field) series checked.")
+    args = ap.parse_args()
+
+    rng = random.Random(SEED)
+    db = json.loads(args.db.read_text(encoding="utf-8"))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        store = SnapshotStore(tmp / "snapshots")
+        table = ht.HistoryTable(tmp / "history")
+        removed: Dict[str, Any] = {}
+        sids: List[str] = []
+        per_batch = max(1, args.snapshots // max(1, args.batches))
+        t_write = t_append = 0.0
+        for day in range(args.snapshots):
+            if day:
+                mutate(db, rng, removed)
+            sid = f"db_2026{1 + day // 28:02d}{1 + day % 28:02d}T060000Z"
+            t0 = time.perf_counter()
+            store.write(copy.deepcopy(db), sid)
+            t_write += time.perf_counter() - t0
+            sids.append(sid)
+            if (day + 1) % per_batch == 0 or day == args.snapshots - 1:
+                t0 = time.perf_counter()
+                table.append(store)
+                t_append += time.perf_counter() - t0
+        store_bytes = sum(p.stat().st_size for p in (tmp / "snapshots").rglob("*") if p.is_file())
+        hist_bytes = sum(p.stat().st_size for p in (tmp / "history").rglob("*") if p.is_file())
+        print(f"{len(sids)} snapshots (store {store_bytes / 1024:.0f} KB, written in {t_write:.1f} s), "
+              f"history {len(table)} rows in {len(table.meta['segments'])} segments, {hist_bytes / 1024:.0f} KB "
+              f"(appends {t_append:.2f} s)")
+
+        weapons = sorted(set(db["modules"]["weapons"]) | set(removed))
+        skills = [sid for sid, sk in db["modules"]["skills"].items() if sk.get("hits")]
+        keys = [("weapons", w, "equipment_attack") for w in rng.sample(weapons, args.samples // 2)]
+        keys += [("skills", s, "hits[0].multiplier_pct") for s in rng.sample(skills, args.samples - args.samples // 2)]
+        keys += [("skills", s, "description") for s in rng.sample(sorted(db["modules"]["skills"]), 5)]
+
+        cold = ht.HistoryTable(tmp / "history")
+        t0 = time.perf_counter()
+        cold.series(*keys[0])
+        t_cold = time.perf_counter() - t0
+        reader = ht.HistoryTable(tmp / "history")
+        t0 = time.perf_counter()
+        got = {k: reader.series(*k) for k in keys}
+        t_series = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        want, rebuilt = expected_series(store, sids, keys)
+        t_full = time.perf_counter() - t0
+        for k in keys:
+            if got[k] != want[k]:
+                print(f"[FAIL] {k}: history {got[k][:4]} != snapshots {want[k][:4]}", file=sys.stderr)
+                return 2
+        changes = sum(len(v) for v in got.values())
+        print(f"{len(keys)} series ({changes} change points)  ok")
+        print(f"history  : one series cold {t_cold * 1e3:7.2f} ms, {cold.bytes_read / 1024:6.0f} KB read; "
+              f"{len(keys)} series {t_series * 1e3:7.2f} ms, {reader.bytes_read / 1024:6.0f} KB read")
+        print(f"snapshots: all {len(sids)} rebuilt {t_full * 1e3:7.0f} ms, {rebuilt / 1024:6.0f} KB of JSON "
+              f"({store_bytes / 1024:.0f} KB packs on disk)")
+
+        scan = ht.HistoryTable(tmp / "history")
+        t0 = time.perf_counter()
+        rows = scan.scan(("snapshot", "id", "value"), "weapons", path="equipment_attack")
+        dt = time.perf_counter() - t0
+        print(f"scan weapons.equipment_attack: {len(rows['id'])} rows  {dt * 1e3:.2f} ms  {scan.bytes_read / 1024:.0f} KB read")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
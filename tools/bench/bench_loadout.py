@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: weapon loadout optimizer (tools/loadout_optimizer.py).
+
+Runs on the DB catalogue and on a synthetic one (the DB weapons' types and substats, random
+equipment ATK / substat values, --weapons entries) and checks:
+- pruning: the kept weapons are exactly those dominated by fewer than --top others (pairwise
+  dominance test), and the Pareto front (K=1) likewise;
+- scoring: BuildTable.from_stat_deltas() rows == BuildTable.from_builds() of the materialized
+  loadouts (loadout_build()), same DPS;
+- top-K: the pruned search returns the brute-force top-K over every weapon of the character's
+  weapon types (same weapons, or same DPS where scores tie).
+Times catalogue index + pruning, the pruned search, the unpruned search and the brute force
+(one materialized build per weapon, scored one by one).
+
+Usage:
+  python tools/bench/bench_loadout.py [--weapons 20000] [--top 3] [--characters 4]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import damage_engine as de  # noqa: E402
+import loadout_optimizer as lo  # noqa: E402
+import sweep_engine as sw  # noqa: E402
+from bench_damage import ROOT  # noqa: E402
+
+RTOL = 1e-9
+SEED = 7
+
+
+def synthetic_weapons(weapons: List[Dict[str, Any]], n: int, seed: int = SEED) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    types = sorted({str(w.get("weapon_type")) for w in weapons if w.get("weapon_type")})
+    subs = sorted({str(w.get("substat_name")) for w in weapons if w.get("substat_name")})
+    atk = rng.integers(300, 700, n)
+    val = np.round(rng.uniform(1, 12, n), 1)
+    return [{"id": f"w{i}", "name": f"Weapon {i}", "weapon_type": types[i % len(types)], "equipment_attack": int(atk[i]),
+             "substat_name": subs[int(rng.integers(len(subs)))], "substat_value": f"{val[i]}%"} for i in range(n)]
+
+
+def dominators(cat: lo.WeaponCatalog, idx: np.ndarray) -> np.ndarray:
+    """Pairwise: number of weapons j != i dominating weapon i (ties broken by catalogue order)."""
+    a, s, v = cat.atk[idx], cat.substat[idx], cat.value[idx]
+    none = s == lo.NO_SUBSTAT
+    ge = a[None, :] >= a[:, None]
+    better = ge & (((s[None, :] == s[:, None]) & (v[None, :] >= v[:, None])) | none[:, None])
+    strict = (a[None, :] > a[:, None]) | ((s[None, :] == s[:, None]) & (v[None, :] > v[:, None]))
+    # an exact duplicate (or a no-damage weapon at equal ATK) dominates only the later ones
+    earlier = idx[None, :] < idx[:, None]
+    dom = better & (strict | earlier | (none[:, None] & ~none[None, :]))
+    np.fill_diagonal(dom, False)
+    return dom.sum(axis=1)
+
+
+def brute_force(dbx, cat: lo.WeaponCatalog, weapons, build, enemy, settings, cid: str) -> Dict[int, float]:
+    """One materialized loadout build per compatible weapon, scored one by one."""
+    skills = list((dbx["modules"].get("skills") or {}).values())
+    engine = de.DamageEngine(settings)
+    enemies = de.EnemyTable.from_enemies([enemy], settings)
+    out: Dict[int, float] = {}
+    for wt in dict.fromkeys(dbx["modules"]["characters"][cid].get("weapon_types") or []):
+        kit = [de.normalize_skill(sk) for sk in de.select_skills(skills, cid, wt)]
+        plan = sw.cast_plan(sw.kit_rotation(kit, cid, wt), settings, sw.DEFAULT_DURATION, kit)
+        if not len(plan.table):
+            continue
+        for i in cat.by_type.get(wt, []):
+            b = lo.loadout_build({**build, "character_id": cid}, weapons[i])
+            out[int(i)] = float(plan.dps(engine, de.BuildTable.from_builds([b], settings), enemies)[0, 0])
+    return out
+
+
+def check(label: str, dbx, weapons, build, enemy, settings, top: int, characters: List[str]) -> bool:
+    t0 = time.perf_counter()
+    cat = lo.WeaponCatalog.from_weapons(weapons)
+    t_index = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    kept = sum(len(v) for v in cat.front(top).values())
+    t_index += time.perf_counter() - t0
+    for wt, idx in cat.by_type.items():
+        for k in dict.fromkeys((1, top)):
+            if len(idx) > 4000:
+                sub = idx[:4000]
+                want = np.sort(sub[dominators(cat, sub) < k])
+                got = lo.pareto_front(cat.atk, cat.substat, cat.value, sub, k)
+            else:
+                want, got = np.sort(idx[dominators(cat, idx) < k]), cat.front(k)[wt]
+            if not np.array_equal(want, got):
+                print(f"[FAIL] {label} · {wt}: pruned set (K={k}) != weapons dominated by fewer than {k}", file=sys.stderr)
+                return False
+
+    t0 = time.perf_counter()
+    pruned = lo.optimize_loadouts(dbx, build, enemy, settings, top, catalog=cat, character_ids=characters)
+    t_pruned = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    lo.optimize_loadouts(dbx, build, enemy, settings, top, catalog=cat, character_ids=characters, prune=False)
+    t_full = time.perf_counter() - t0
+
+    t_brute = 0.0
+    for cid in characters:
+        t0 = time.perf_counter()
+        ref = brute_force(dbx, cat, weapons, build, enemy, settings, cid)
+        t_brute += time.perf_counter() - t0
+        ids = {cat.ids[i]: i for i in ref}
+        want = sorted(ref, key=lambda i: (-ref[i], i))[:top]
+        got = pruned.get(cid, [])
+        if len(got) != len(want):
+            print(f"[FAIL] {label} · {cid}: {len(got)} loadouts != brute-force top-{top} ({len(want)})", file=sys.stderr)
+            return False
+        if [ids[x["weapon_id"]] for x in got] != want:
+            if not np.allclose([x["dps"] for x in got], [ref[i] for i in want], rtol=RTOL):
+                print(f"[FAIL] {label} · {cid}: top-{top} != brute force", file=sys.stderr)
+                return False
+        for x in got:
+            if not np.isclose(x["dps"], ref[ids[x["weapon_id"]]], rtol=RTOL):
+                print(f"[FAIL] {label} · {cid} · {x['weapon_id']}: from_stat_deltas {x['dps']!r} != loadout build "
+                      f"{ref[ids[x['weapon_id']]]!r}", file=sys.stderr)
+                return False
+
+    n = len(characters)
+    print(f"{label:10} {len(cat):6} weapons  {kept:5} after pruning  index+prune {t_index * 1e3:8.1f} ms  "
+          f"search {t_pruned * 1e3 / n:7.2f} ms/char  unpruned {t_full * 1e3 / n:7.2f} ms/char  "
+          f"brute force {t_brute * 1e3 / n:9.1f} ms/char  ok")
+    return True
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--weapons", type=int, default=20000, help="Synthetic catalogue size.")
+    ap.add_argument("--top", type=int, default=lo.DEFAULT_TOP)
+    ap.add_argument("--characters", type=int, default=4, help="Characters checked against the brute force.")
+    args = ap.parse_args()
+
+    defaults = de.load_site_defaults()
+    dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    build, enemy = defaults["builds"][0], defaults["scenarios"][1]["enemy"]
+    settings = de.profile_settings(None, defaults=defaults)
+    weapons = list((dbx["modules"].get("weapons") or {}).values())
+    skills = list((dbx["modules"].get("skills") or {}).values())
+    characters = [cid for cid in dbx["modules"]["characters"]
+                  if any(de.select_skills(skills, cid, wt) for wt in dbx["modules"]["characters"][cid].get("weapon_types") or [])]
+    characters = characters[:args.characters]
+
+    ok = check("db", dbx, weapons, build, enemy, settings, args.top, characters)
+    ok = ok and check("synthetic", dbx, synthetic_weapons(weapons, args.weapons), build, enemy, settings, args.top, characters)
+    return 0 if ok else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
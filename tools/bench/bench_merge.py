@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: 7dsorigin -> genshin weapon merge on a synthetic catalogue.
+
+Compares the id-indexed ModuleStore path used by build_db (merge_sdso_weapon) against
+the previous linear legacy lookup (next(w for w in weapons_legacy if w["id"] == wid)),
+and checks both produce identical legacy + normalized collections.
+
+Usage:
+  python tools/bench/bench_merge.py [--n 10000] [--overlap 0.7]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import update_db as u  # noqa: E402
+
+WTYPES = sorted(u.WEAPON_TYPES)
+
+
+def synthetic_catalogue(n: int, overlap: float, seed: int = 7) -> Tuple[List[Dict[str, Any]], Dict[str, Any], List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+    """(genshin legacy list, genshin normalized dict, [(sdso legacy, sdso normalized)])"""
+    rng = random.Random(seed)
+    weapons_x: Dict[str, Any] = {}
+    for i in range(n):
+        name, wt = f"Weapon {i}", WTYPES[i % len(WTYPES)]
+        wid = u.stable_id("wp", name, wt)
+        weapons_x[wid] = {
+            "id": wid, "name": name, "weapon_type": wt, "image_url": None if i % 5 == 0 else f"https://img/{i}.png",
+            "equipment_attack": 0 if i % 11 == 0 else 20 + i % 40, "substat_name": "Crit Rate", "substat_value": "4.8%",
+            "passive_text": f"Passive {i}", "sources": {"genshin": {"source_url": u.GENSHIN_WEAPONS_LIST}},
+        }
+    weapons_legacy = [u.genshin_weapon_legacy(w) for w in weapons_x.values()]
+
+    sdso = []
+    for i in range(n):
+        j = i if rng.random() < overlap else n + i
+        name, wt = f"Weapon {j}", WTYPES[j % len(WTYPES)]
+        wid = u.stable_id("wp", name, wt)
+        src = {"source_url": f"{u.SDSO_BASE}/weapons/w-{j}", "patch_version": None, "last_seen": "2026-01-01T00:00:00Z"}
+        atk = 20 + j % 40 + (1 if j % 13 == 0 else 0)
+        legacy = {"id": wid, "name": name, "weapon_type": wt, "icon": f"https://sdso/{j}.png", "atk_bonus": atk,
+                  "substat": {"name": "Crit Rate", "value": 4.8}, "passive": f"Passive {j}", "source": src}
+        wx = {"id": wid, "name": name, "weapon_type": wt, "image_url": f"https://sdso/{j}.png", "equipment_attack": atk,
+              "substat_name": "Crit Rate", "substat_value": 4.8, "passive_text": f"Passive {j}", "rarity": 3,
+              "sources": {"7dsorigin": {"source_url": src["source_url"], "last_seen": src["last_seen"]}}}
+        sdso.append((legacy, wx))
+    return weapons_legacy, weapons_x, sdso
+
+
+def merge_linear(weapons_legacy, weapons_x, sdso, conflicts) -> None:
+    """Pre-index implementation (linear legacy scan per weapon), kept as the reference."""
+    for w_legacy, wx in sdso:
+        wid = wx["id"]
+        if wid in weapons_x:
+            weapons_x[wid] = u.merge_sources_record(weapons_x[wid], wx, "7dsorigin", conflicts, "weapons")
+        else:
+            weapons_x[wid] = wx
+        existing = next((w for w in weapons_legacy if w.get("id") == wid), None)
+        if existing:
+            if not existing.get("icon") and w_legacy.get("icon"):
+                existing["icon"] = w_legacy["icon"]
+            if existing.get("atk_bonus", 0) == 0 and w_legacy.get("atk_bonus", 0) > 0:
+                existing["atk_bonus"] = w_legacy["atk_bonus"]
+            existing.setdefault("sources", {})["7dsorigin"] = w_legacy.get("source")
+        else:
+            w_legacy["sources"] = {"7dsorigin": w_legacy.get("source")}
+            weapons_legacy.append(w_legacy)
+
+
+def merge_indexed(weapons_legacy, weapons_x, sdso, conflicts) -> u.ModuleStore:
+    store = u.ModuleStore("weapons", weapons_legacy, weapons_x)
+    for w_legacy, wx in sdso:
+        u.merge_sdso_weapon(store, w_legacy, wx, conflicts)
+    return store
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=10000, help="Weapons per source (default 10000).")
+    ap.add_argument("--overlap", type=float, default=0.7, help="Share of 7dsorigin weapons already on genshin.gg.")
+    args = ap.parse_args()
+
+    base = synthetic_catalogue(args.n, args.overlap)
+
+    legacy, wx, sdso = copy.deepcopy(base)
+    c_lin: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    merge_linear(legacy, wx, sdso, c_lin)
+    t_lin = time.perf_counter() - t0
+    ref = (legacy, wx)
+
+    legacy, wx, sdso = copy.deepcopy(base)
+    c_idx: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    store = merge_indexed(legacy, wx, sdso, c_idx)
+    t_idx = time.perf_counter() - t0
+
+    if (store.legacy, store.records) != ref or c_idx != c_lin:
+        print("[FAIL] indexed merge differs from the linear reference", file=sys.stderr)
+        return 2
+
+    print(f"catalogue: {args.n} genshin + {args.n} 7dsorigin weapons -> {len(store)} merged, {len(c_idx)} conflicts")
+    print(f"linear legacy lookup:  {t_lin * 1000:9.1f} ms")
+    print(f"ModuleStore (id index): {t_idx * 1000:8.1f} ms")
+    print(f"speedup: x{t_lin / t_idx:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batched Monte-Carlo crit simulation (tools/monte_carlo.py).
+
+Builds the hit list of one character's kit (each skill once per run, default build and scenario of
+the site) and draws N runs with the vectorized "js" stream, against the previous run-by-run loop
+(makeRng() per run, one draw per hit, as runSimulation() does), kept below as the reference.
+Checks the per-run totals are identical and the statistics (mean, std, percentiles, hist_bins
+histogram) agree, both with one chunk and with the two-pass chunked path.
+
+--js N also runs N runs through src/app.js itself (makeRng, actionCtxFromAction, actionDamage,
+quantile and the renderHistogram() binning, with node) and checks totals and statistics. app.js sums
+its totals in another order, so they agree within RTOL only: a run on a bin edge may land in the
+adjacent bin, and the histogram check allows exactly those moves (see edge_moves_ok()).
+--big N times a large study (default 10^7 runs) and reports the peak memory it holds (tracemalloc).
+
+Usage:
+  python tools/bench/bench_montecarlo.py [--character NAME|ID] [--runs 20000] [--js 20000] [--big 10000000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import damage_engine as de  # noqa: E402
+import monte_carlo as mc  # noqa: E402
+from bench_damage import ROOT, js_function  # noqa: E402
+
+RTOL = 1e-9
+
+
+def make_rng(seed: int):
+    """makeRng() of src/app.js."""
+    s = (seed % (1 << 32)) or 1
+
+    def rng() -> float:
+        nonlocal s
+        s = (1664525 * s + 1013904223) % (1 << 32)
+        return s / 4294967296
+    return rng
+
+
+def reference_totals(plan: mc.HitPlan, runs: int, seed: Any) -> List[float]:
+    """runSimulation() loop: per-run seed from the base generator, then one draw per hit."""
+    base = make_rng(mc.to_uint32(de.js_num(seed, 0) or 12345))
+    hits = list(zip(plan.base.tolist(), plan.crit.tolist(), plan.crit_chance.tolist()))
+    out = []
+    for i in range(runs):
+        run_seed = (math.floor(base() * 1e9) ^ (int(i * 2654435761.0) % (1 << 32))) % (1 << 32)
+        rng = make_rng(run_seed)
+        total = 0.0
+        for b, c, cc in hits:
+            total += c if rng() < cc else b
+        out.append(total)
+    return out
+
+
+def reference_summary(totals: List[float], bins: Any) -> Dict[str, Any]:
+    ordered = sorted(totals)
+    mean = sum(ordered) / len(ordered)
+    std = math.sqrt(sum((x - mean) ** 2 for x in ordered) / (len(ordered) - 1)) if len(ordered) > 1 else 0.0
+    hist = mc.js_histogram(np.array(totals), ordered[0], ordered[-1], bins) if len(totals) > 1 else None
+    return {"mean": mean, "std": std, "min": ordered[0], "max": ordered[-1],
+            **{name: mc.js_quantile(ordered, q) for name, q in mc.PERCENTILES},
+            "hist": None if hist is None else {"counts": hist.tolist()}}
+
+
+def edge_moves_ok(a: List[int], b: List[int], totals: np.ndarray, lo: float, hi: float) -> bool:
+    """
+    Histograms equal up to runs crossing a bin edge: at every interior edge, the runs moved across it
+    (difference of the cumulative counts) are at most the totals lying within RTOL of that edge.
+    """
+    if len(a) != len(b) or sum(a) != sum(b) or hi <= lo:
+        return False
+    bins = len(a)
+    pos = (totals - lo) / (hi - lo) * bins
+    slack = 4 * RTOL * max(float(np.abs(totals).max()), 1.0) * bins / (hi - lo) + 1e-12
+    near = np.abs(pos[:, None] - np.arange(1, bins)[None, :]) <= slack
+    moved = np.abs(np.cumsum(a)[:-1] - np.cumsum(b)[:-1])
+    return bool((moved <= near.sum(axis=0)).all())
+
+
+def compare(label: str, got: Dict[str, Any], ref: Dict[str, Any], totals: Optional[np.ndarray] = None) -> bool:
+    """Statistics equal within RTOL; histogram counts equal, or (given the totals) equal up to edge runs."""
+    for key in ["mean", "std", "min", "max", *(name for name, _ in mc.PERCENTILES)]:
+        if not math.isclose(got[key], ref[key], rel_tol=RTOL, abs_tol=1e-9):
+            print(f"[FAIL] {label}: {key} {got[key]!r} != {ref[key]!r}", file=sys.stderr)
+            return False
+    a, b = got["hist"], ref["hist"]
+    if a and b and a["counts"] != b["counts"] and totals is not None \
+            and edge_moves_ok(a["counts"], b["counts"], totals, ref["min"], ref["max"]):
+        return True
+    if (a is None) != (b is None) or (a and a["counts"] != b["counts"]):
+        print(f"[FAIL] {label}: histogram {a and a['counts']} != {b and b['counts']}", file=sys.stderr)
+        return False
+    return True
+
+
+JS_MAIN = """
+let CURRENT_SKILL = null;
+function resolveSkillForAction(){ return CURRENT_SKILL; }
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const {build, enemy, settings, runs} = input;
+const ctxs = input.skills.map(sk => {
+  CURRENT_SKILL = normalizeDbxSkill(sk);
+  return actionCtxFromAction(build, null, {skill_index: 0}, enemy, settings);
+});
+const rngBase = makeRng(settings.mc_seed || 12345);
+const totals = [];
+for (let i = 0; i < runs; i++){
+  const seed = (Math.floor(rngBase()*1e9) ^ (i*2654435761)) >>> 0;
+  const rng = makeRng(seed);
+  let t = 0;
+  for (const ctx of ctxs) t += actionDamage(build, enemy, settings, ctx, "mc", rng);
+  totals.push(t);
+}
+const sorted = [...totals].sort((a,b)=>a-b);
+const mean = sorted.reduce((a,b)=>a+b,0) / sorted.length;
+const std = sorted.length > 1 ? Math.sqrt(sorted.reduce((acc,x)=>acc + (x-mean)*(x-mean), 0) / (sorted.length - 1)) : 0;
+const min = sorted[0], max = sorted[sorted.length-1];
+let hist = null;
+if (totals.length > 1 && max > min + 1e-9){
+  const b = clamp(settings.hist_bins || 24, 5, 60);
+  const counts = new Array(b).fill(0);
+  for (const x of totals){ counts[clamp(Math.floor((x - min) / (max - min) * b), 0, b-1)]++; }
+  hist = {counts};
+}
+process.stdout.write(JSON.stringify({totals, mean, std, min, max, hist,
+  p05: quantile(sorted, 0.05), p10: quantile(sorted, 0.10), p50: quantile(sorted, 0.50),
+  p90: quantile(sorted, 0.90), p95: quantile(sorted, 0.95)}));
+"""
+
+
+def js_simulation(build, enemy, settings, skills, runs: int) -> Dict[str, Any]:
+    import bench_damage
+    utils = (ROOT / "src" / "core" / "utils.js").read_text(encoding="utf-8")
+    app = (ROOT / "src" / "app.js").read_text(encoding="utf-8")
+    script = "\n".join([js_function(utils, n) for n in ("clamp", "pctToMul", "toNum", "quantile")]
+                       + [js_function(app, n) for n in bench_damage.JS_FUNCTIONS + ["makeRng"]] + [JS_MAIN])
+    payload = json.dumps({"build": build, "enemy": enemy, "settings": settings, "skills": skills, "runs": runs})
+    res = subprocess.run(["node", "-e", script], input=payload, capture_output=True, text=True, check=True)
+    return json.loads(res.stdout)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--character", default=None, help="Character id or name (default: first character of the DB).")
+    ap.add_argument("--profile", default=None)
+    ap.add_argument("--runs", type=int, default=20000, help="Runs checked against the run-by-run reference.")
+    ap.add_argument("--js", type=int, default=0, help="Also check N runs against src/app.js (node).")
+    ap.add_argument("--big", type=int, default=0, help="Time N runs (e.g. 10000000) and report peak memory.")
+    args = ap.parse_args()
+
+    defaults = de.load_site_defaults()
+    settings = de.profile_settings(args.profile, defaults=defaults)
+    characters = list(((json.loads(args.db.read_text(encoding="utf-8")).get("modules") or {}).get("characters") or {}).values())
+    ch = mc._find(characters, args.character)
+    if ch is None:
+        print(f"Unknown character: {args.character}", file=sys.stderr)
+        return 1
+    skills = de.load_skills(args.db, ch["id"])
+    build, scen = defaults["builds"][0], defaults["scenarios"][0]
+    engine = de.DamageEngine(settings)
+    st = de.SkillTable.from_records(skills, settings)
+    n = len(st)
+    terms = engine.row_terms(de.BuildTable.from_builds([build], settings), st, de.EnemyTable.from_scenarios([scen], settings),
+                             np.zeros(n, dtype=np.intp), np.arange(n), np.zeros(n, dtype=np.intp))
+    plan = mc.hit_plan(terms)
+    seed, bins = settings.get("mc_seed"), settings.get("hist_bins")
+    print(f"{ch.get('name')}: {n} skills, {len(plan)} hits/run, seed {seed}, hist_bins {bins}")
+
+    t0 = time.perf_counter()
+    ref_totals = reference_totals(plan, args.runs, seed)
+    t1 = time.perf_counter()
+    got_totals = np.concatenate(list(mc.iter_totals(plan, args.runs, seed)))
+    t2 = time.perf_counter()
+    if not np.array_equal(got_totals, np.array(ref_totals)):
+        i = int(np.flatnonzero(got_totals != np.array(ref_totals))[0])
+        print(f"[FAIL] run {i}: vectorized {got_totals[i]!r} != run-by-run {ref_totals[i]!r}", file=sys.stderr)
+        return 2
+    ref = reference_summary(ref_totals, bins)
+    for label, chunk in (("one chunk", mc.CHUNK_RUNS), ("chunked", max(1, args.runs // 7))):
+        if not compare(label, mc.simulate(plan, args.runs, seed, bins, chunk=chunk), ref):
+            return 2
+    per_hit_ref = (t1 - t0) * 1e9 / (args.runs * len(plan))
+    per_hit_new = (t2 - t1) * 1e9 / (args.runs * len(plan))
+    print(f"{args.runs} runs  run-by-run {1000 * (t1 - t0):9.1f} ms ({per_hit_ref:6.1f} ns/hit)  "
+          f"vectorized {1000 * (t2 - t1):7.1f} ms ({per_hit_new:5.1f} ns/hit)  speedup x{per_hit_ref / max(per_hit_new, 1e-9):.0f}  "
+          "totals identical, stats ok")
+
+    if args.js:
+        if not shutil.which("node"):
+            print("[WARN] node not found: --js skipped", file=sys.stderr)
+        else:
+            t0 = time.perf_counter()
+            js = js_simulation(build, scen["enemy"], settings, skills, args.js)
+            t1 = time.perf_counter()
+            got = np.concatenate(list(mc.iter_totals(plan, args.js, seed)))
+            bad = ~np.isclose(got, np.array(js["totals"]), rtol=RTOL, atol=1e-9)
+            if bad.any():
+                i = int(np.flatnonzero(bad)[0])
+                print(f"[FAIL] app.js run {i}: {got[i]!r} != {js['totals'][i]!r}", file=sys.stderr)
+                return 2
+            if not compare("app.js", mc.simulate(plan, args.js, seed, bins, chunk=max(1, args.js // 5)), js, got):
+                return 2
+            print(f"{args.js} runs  src/app.js (node) {1000 * (t1 - t0):9.1f} ms  totals and stats ok")
+
+    if args.big:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        res = mc.simulate(plan, args.big, seed, bins)
+        dt = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{args.big} runs  {dt:.2f} s ({dt * 1e9 / (args.big * len(plan)):.1f} ns/hit, two passes)  "
+              f"peak {peak / 2 ** 20:.1f} MiB  mean {res['mean']:.1f}  P05 {res['p05']:.1f}  P95 {res['p95']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark: kit description parsing (tools/parser_engine.py).
+
+Compares the single-pass scanner (one combined regex per description, see scan_text) against
+the previous one-regex-per-rule implementation, kept below as the reference, on every skill
+description of data/db.json (and potential tiers when present), and checks both return
+identical results. --fuzz N also checks N synthetic descriptions built from rule fragments
+(newlines, "%" without a trailing word char, overlapping rules). The worst-case lines time
+long inputs on which the former greedy "if .* debuff" / "per stack .*?" rules backtrack
+quadratically.
+
+--corpus re-parses the skill descriptions of every stored snapshot (data/db_snapshots) plus the
+fuzz cases, one parse() call per text vs parse_many() (dedupe, then a process pool of --workers
+processes once the batch has POOL_MIN_TEXTS unique texts), and checks the results match. It also
+compares the memory held by one result per text (tracemalloc) and the parse throughput of the
+dict form (parse) against the compact form (parse_compact: slotted ParseResult, EffectList arrays).
+
+Usage:
+  python tools/bench/bench_parser.py [--db data/db.json] [--repeat N] [--fuzz N] [--corpus] [--workers N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import parser_engine as pe  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+NUM = r"([0-9]+(?:\.[0-9]+)?)"
+
+_MULT_PATTERNS = [
+    re.compile(NUM + r"%\s*(?:of\s*)?(ATK|Attack)\b", re.I),
+    re.compile(NUM + r"%\s*(?:of\s*)?HP\b", re.I),
+    re.compile(r"damage\s+equal\s+to\s*" + NUM + r"%\s*(?:of\s*)?(ATK|Attack|HP)\b", re.I),
+]
+
+
+def legacy_skill_parse(text: str) -> Dict[str, Any]:
+    """Pre-scanner SkillParser.parse (one re.search per rule), kept as the reference."""
+    t = (text or "").strip()
+    mult = scale = None
+    for pat in _MULT_PATTERNS:
+        m = pat.search(t)
+        if m:
+            mult = float(m.group(1))
+            if len(m.groups()) >= 2:
+                s = (m.group(2) or "").upper()
+                scale = "HP" if "HP" in s else "ATK" if ("ATK" in s or "ATTACK" in s) else None
+            break
+    if mult is None:
+        if re.search(r"\bHP\b", t, re.I):
+            scale = "HP"
+        elif re.search(r"\bATK\b|\bAttack\b", t, re.I):
+            scale = "ATK"
+    m = re.search(r"(\d+)\s*(?:hits|hit|times)\b", t, re.I)
+    hits = int(m.group(1)) if m else None
+
+    effects: List[Dict[str, Any]] = []
+    for m in re.finditer(r"increase(?:s)?\s+damage(?:\s+dealt)?\s+by\s+" + NUM + r"%\b", t, re.I):
+        effects.append({"type": "dmg_bonus_pct", "value": float(m.group(1))})
+    if re.search(r"\bif\b.*\b(debuffed|debuff)\b", t, re.I):
+        m = re.search(r"increase(?:s)?\s+damage(?:\s+dealt)?\s+by\s+" + NUM + r"%.*\b(debuffed|debuff)\b", t, re.I)
+        effects.append({"type": "bonus_if_debuffed", "value": float(m.group(1))} if m else {"type": "cond_if_debuffed", "value": True})
+    m = re.search(r"ignore(?:s)?\s+" + NUM + r"%\s*DEF\b", t, re.I)
+    if m:
+        effects.append({"type": "ignore_def_pct", "value": float(m.group(1))})
+    elif re.search(r"\bignore(?:s)?\s+defense\b", t, re.I):
+        effects.append({"type": "ignore_def_pct", "value": 100.0})
+    rules = [
+        ("res_pen_pct", r"(?:penetrate|ignore)(?:s)?\s+" + NUM + r"%\s*(?:resistance|res)\b"),
+        ("true_damage", r"\btrue damage\b"),
+        ("crit_dmg_bonus_pct", r"increase(?:s)?\s+crit(?:ical)?\s+damage\s+by\s+" + NUM + r"%\b"),
+        ("crit_rate_bonus_pct", r"increase(?:s)?\s+crit(?:ical)?\s+(?:rate|chance)\s+by\s+" + NUM + r"%\b"),
+        ("enemy_crit_resist_down_pct", r"reduce(?:s)?\s+enemy\s+crit(?:ical)?\s+resist(?:ance)?\s+by\s+" + NUM + r"%\b"),
+        ("cond_hp_below_pct", r"HP\s+is\s+below\s+" + NUM + r"%\b"),
+        ("per_stack_bonus_pct", r"per\s+stack\b.*?" + NUM + r"%\b"),
+    ]
+    for typ, pat in rules:
+        m = re.search(pat, t, re.I)
+        if m:
+            effects.append({"type": typ, "value": float(m.group(1)) if m.groups() else True})
+    m = re.search(r"max(?:imum)?\s+([0-9]+)\s+stacks\b", t, re.I)
+    if m:
+        effects.append({"type": "max_stacks", "value": int(m.group(1))})
+    uniq, seen = [], set()
+    for e in effects:
+        if (e["type"], e["value"]) not in seen:
+            seen.add((e["type"], e["value"]))
+            uniq.append(e)
+
+    score = (0.45 if mult is not None else 0.0) + (0.15 if hits is not None else 0.0) + (0.10 if scale is not None else 0.0)
+    if uniq:
+        score += min(0.30, 0.12 * len(uniq))
+    return {"parsed_multiplier_pct": mult, "parsed_hits": hits, "parsed_scaling": scale, "parsed_effects": uniq,
+            "confidence_score": max(0.0, min(1.0, score)), "description_raw": t}
+
+
+def legacy_potential_parse(text: str) -> Dict[str, Any]:
+    """Pre-scanner PotentialParser.parse, kept as the reference."""
+    t = (text or "").strip()
+    effects: List[Dict[str, Any]] = []
+    rules = [(f"{stat.lower()}_pct", rf"increase(?:s)?\s+{stat}\s+by\s+" + NUM + r"%\b") for stat in ("ATK", "DEF", "HP")] + [
+        ("dmg_bonus_pct", r"increase(?:s)?\s+damage(?:\s+dealt)?\s+by\s+" + NUM + r"%\b"),
+        ("crit_rate_pct", r"increase(?:s)?\s+crit(?:ical)?\s+(?:rate|chance)\s+by\s+" + NUM + r"%\b"),
+        ("crit_dmg_pct", r"increase(?:s)?\s+crit(?:ical)?\s+damage\s+by\s+" + NUM + r"%\b"),
+        ("cond_if_debuffed", r"\bif\b.*\b(?:debuffed|debuff)\b"),
+        ("cond_hp_below_pct", r"HP\s+is\s+below\s+" + NUM + r"%\b"),
+    ]
+    for typ, pat in rules:
+        m = re.search(pat, t, re.I)
+        if m:
+            effects.append({"type": typ, "value": float(m.group(1)) if m.groups() else True})
+    conf = min(1.0, 0.35 + 0.15 * len(effects)) if effects else 0.25
+    return {"parsed_effects": effects, "confidence_score": conf, "description_raw": t}
+
+
+def load_texts(db_path: Path) -> Tuple[List[str], List[str]]:
+    return texts_of(json.loads(db_path.read_text(encoding="utf-8")))
+
+
+def texts_of(dbx: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    mods = dbx.get("modules") or {}
+    skills = [s.get("description") or "" for s in (mods.get("skills") or {}).values()]
+    potentials = []
+    for ch in (mods.get("characters") or {}).values():
+        for tiers in (ch.get("potential_by_weapon") or {}).values():
+            for tier in tiers or []:
+                if isinstance(tier, dict) and tier.get("text"):
+                    potentials.append(tier["text"])
+    return skills, potentials
+
+
+FRAGMENTS = [
+    "Deals {n}% of ATK as damage", "Deals {n}%ATK", "{n}% of HP", "{n}% HP is below {n}%x", "damage equal to {n}% of Attack",
+    "Increases damage by {n}%", "increases damage dealt by {n}%x", "increase damage\nby {n}%", "Increase ATK by {n}%DEF",
+    "increases HP by {n}%a", "increase DEF by {n}%", "increases crit damage by {n}%z", "Increase Critical Chance by {n}%q",
+    "if the target is debuffed", "If debuff", "debuffs", "ignores {n}% DEF", "ignore defense", "penetrates {n}% res",
+    "ignore {n}%resistance", "true damage", "Reduces enemy critical resistance by {n}%b", "when HP is below {n}%c",
+    "per stack", "per\nstack {n}%d", "per stack, up to {n}%e", "max {n} stacks", "maximum {n} stacks", "{n} hits", "{n}times",
+    "Attack", "ATK", "HP", "climax {n} stacks", "{n}.{n}.{n}%f", "\n", ". ", ", ", " and ", "unificent", "ifdebuff",
+]
+
+
+WORST_CASES = [
+    "if per stack increase damage by 5% " * 400,
+    "increases damage by 1%" + " if" * 5000,
+]
+
+
+def fuzz_texts(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        parts = [rng.choice(FRAGMENTS).replace("{n}", str(rng.choice([1, 5, 12, 12.5, 30, 100]))) for _ in range(rng.randint(1, 8))]
+        out.append(rng.choice(["", " ", "\n"]).join(parts))
+    return out
+
+
+def snapshot_corpus(store_dir: Path) -> List[str]:
+    from snapshot_store import SnapshotStore
+
+    store = SnapshotStore(store_dir)
+    out: List[str] = []
+    for sid in store.ids():
+        out.extend(texts_of(store.read(sid))[0])
+    for path in store.legacy_files():  # not migrated yet (tools/snapshot_store.py migrate)
+        out.extend(texts_of(json.loads(path.read_text(encoding="utf-8")))[0])
+    return out
+
+
+def bench_corpus(texts: List[str], workers: Optional[int]) -> int:
+    sp = pe.SkillParser()
+    t0 = time.perf_counter()
+    looped = [sp.parse(t) for t in texts]
+    t_loop = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batched = sp.parse_many(texts, workers=1)
+    t_dedupe = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pooled = sp.parse_many(texts, workers=workers)
+    t_pool = time.perf_counter() - t0
+    if not (looped == batched == pooled):
+        print("[FAIL] parse_many results differ from parse()", file=sys.stderr)
+        return 2
+    n_unique = len(set(t.strip() for t in texts))
+    print(f"corpus: {len(texts)} texts, {n_unique} unique")
+    print(f"parse() per text:          {t_loop * 1000:9.1f} ms")
+    print(f"parse_many, in-process:    {t_dedupe * 1000:9.1f} ms")
+    print(f"parse_many, workers={workers if workers is not None else 'auto'}:  {t_pool * 1000:9.1f} ms"
+          + ("" if n_unique >= pe.POOL_MIN_TEXTS else f"  (below POOL_MIN_TEXTS={pe.POOL_MIN_TEXTS}: in-process)"))
+    return 0
+
+
+def bench_memory(texts: List[str]) -> int:
+    sp = pe.SkillParser()
+    rows = []
+    for name, fn in (("dicts", sp.parse), ("compact", sp.parse_compact)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        held = [fn(t) for t in texts]
+        elapsed = time.perf_counter() - t0
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        rows.append((name, size, elapsed, held))
+    if [r.to_dict() for r in rows[1][3]] != rows[0][3]:
+        print("[FAIL] parse_compact(...).to_dict() differs from parse()", file=sys.stderr)
+        return 2
+    for name, size, elapsed, _ in rows:
+        print(f"held results, {name:8} {size / 1024:9.1f} KB  ({size / len(texts):6.1f} B/result)  "
+              f"{len(texts) / elapsed:9.0f} desc/s (under tracemalloc)")
+    return 0
+
+
+def time_parser(fn: Callable[[str], Any], texts: List[str], repeat: int) -> Tuple[float, List[Any]]:
+    best, out = float("inf"), []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def check(name: str, texts: List[str], legacy: Callable[[str], Any], current: Callable[[str], Any]) -> Optional[str]:
+    for t in texts:
+        a, b = legacy(t), current(t)
+        if a != b:
+            return f"{name}: {t!r}\n  legacy:  {a}\n  scanner: {b}"
+    return None
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--repeat", type=int, default=5, help="Timing repeats (best kept).")
+    ap.add_argument("--fuzz", type=int, default=0, help="Also check N synthetic descriptions.")
+    ap.add_argument("--corpus", action="store_true", help="Time parse_many() over every stored snapshot.")
+    ap.add_argument("--snapshots", type=Path, default=ROOT / "data" / "db_snapshots")
+    ap.add_argument("--workers", type=int, default=None, help="parse_many() pool size (default: CPU count).")
+    args = ap.parse_args()
+
+    skills, potentials = load_texts(args.db)
+    if not skills:
+        print(f"No skill descriptions in {args.db}.", file=sys.stderr)
+        return 1
+    sp, pp = pe.SkillParser(), pe.PotentialParser()
+    fuzz = fuzz_texts(args.fuzz)
+    for name, texts, legacy, current in (
+        ("skill", skills + fuzz, legacy_skill_parse, sp.parse),
+        ("potential", potentials + fuzz, legacy_potential_parse, pp.parse),
+    ):
+        err = check(name, texts, legacy, current)
+        if err:
+            print(f"[FAIL] parse mismatch, {err}", file=sys.stderr)
+            return 2
+
+    print(f"descriptions: {len(skills)} skills ({len(set(skills))} unique), {len(potentials)} potential tiers"
+          + (f", {len(fuzz)} fuzz cases checked" if fuzz else ""))
+    for name, texts, legacy, current in (("skills", skills, legacy_skill_parse, sp.parse),
+                                         ("potentials", potentials, legacy_potential_parse, pp.parse)):
+        if not texts:
+            continue
+        t_old, _ = time_parser(legacy, texts, args.repeat)
+        t_new, _ = time_parser(current, texts, args.repeat)
+        print(f"{name:10} per-rule regex: {t_old * 1000:8.2f} ms  ({t_old * 1e6 / len(texts):6.1f} us/desc)")
+        print(f"{name:10} single pass:    {t_new * 1000:8.2f} ms  ({t_new * 1e6 / len(texts):6.1f} us/desc)"
+              + (f"  speedup x{t_old / t_new:.1f}" if t_new > 0 else ""))
+    for text in WORST_CASES:
+        t_old, _ = time_parser(legacy_skill_parse, [text], 1)
+        t_new, _ = time_parser(sp.parse, [text], 1)
+        print(f"worst case {len(text):6} chars: per-rule regex {t_old * 1000:8.1f} ms, single pass {t_new * 1000:6.1f} ms")
+    if args.corpus:
+        corpus = snapshot_corpus(args.snapshots) + fuzz
+        return bench_corpus(corpus, args.workers) or bench_memory(corpus)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
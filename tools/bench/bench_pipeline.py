@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the scraping hot path, run against a recorded fixture corpus
+(tools/bench/fixtures.py) through a stub fetcher — no network.
+
+Stages:
+- parse_genshin_character_page  (every recorded genshin.gg character page)
+- parse_genshin_weapons_list
+- parse_sdso_character_page     (only if the corpus has 7dsorigin.gg pages)
+- parse_sdso_weapon_page        (idem)
+- build_db                      (whole pipeline, stub fetcher)
+- build_skill_tables            (precomputed skill tables of the build_db output, see tools/skill_tables.py)
+
+Per stage: best wall time over --repeat runs, peak traced memory (separate tracemalloc run,
+so tracing overhead never pollutes timings), records produced and throughput (records/s).
+
+Regression gate: with a stored baseline (tools/bench/baseline.json, written by
+--save-baseline), the run fails (exit 1) when a stage's throughput drops by more than
+--threshold (default 25%). Baselines are machine-specific: record them on the machine
+that runs the gate.
+
+Usage:
+  python tools/bench/bench_pipeline.py [--fixtures DIR] [--repeat N] [--threshold 0.25]
+  python tools/bench/bench_pipeline.py --save-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import update_db as u  # noqa: E402
+from fixtures import FixtureCorpus  # noqa: E402
+
+BASELINE_JSON = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _sdso_kind(url: str) -> Optional[str]:
+    if not url.startswith(u.SDSO_BASE) or urlparse(url).query:
+        return None
+    seg = [s for s in u._sdso_norm_path(urlparse(url).path).split("/") if s]
+    return seg[0] if len(seg) == 2 else None
+
+
+def build_stages(corpus: FixtureCorpus) -> List[Tuple[str, Callable[[], int]]]:
+    """(name, fn) pairs; fn runs the stage once and returns the number of records produced."""
+    pages = {url: corpus.get(url) for url in corpus.urls()}
+    char_pages = [(url, h) for url, h in pages.items() if url.startswith(u.GENSHIN_BASE + "/7dso/characters/")]
+    sdso_chars = [(url, h) for url, h in pages.items() if _sdso_kind(url) == "characters"]
+    sdso_weapons = [(url, h) for url, h in pages.items() if _sdso_kind(url) == "weapons"]
+
+    def genshin_chars() -> int:
+        n = 0
+        for url, html in char_pages:
+            _, charx = u.parse_genshin_character_page(url, html)
+            n += 1 + sum(len(v) for v in charx["skills_by_weapon"].values())
+        return n
+
+    def genshin_weapons() -> int:
+        _, wx = u.parse_genshin_weapons_list(pages[u.GENSHIN_WEAPONS_LIST])
+        return len(wx)
+
+    def sdso_char_pages() -> int:
+        n = 0
+        for url, html in sdso_chars:
+            _, cx = u.parse_sdso_character_page(url, html)
+            n += 1 + sum(len(v) for v in cx["skills_by_weapon"].values())
+        return n
+
+    def sdso_weapon_pages() -> int:
+        for url, html in sdso_weapons:
+            u.parse_sdso_weapon_page(url, html)
+        return len(sdso_weapons)
+
+    built: Dict[str, Any] = {}
+
+    def build() -> int:
+        u.install_fetcher(corpus.get)
+        try:
+            _, dbx, _ = u.build_db(enable_7dsorigin=corpus.has_sdso())
+        finally:
+            u.install_fetcher(None)
+        built["dbx"] = dbx
+        mods = dbx["modules"]
+        return len(mods["characters"]) + len(mods["weapons"]) + len(mods["skills"])
+
+    def skill_tables() -> int:
+        if "dbx" not in built:
+            build()
+        tables = u.build_skill_tables(built["dbx"])
+        return sum(len(t["skills"]) for by_wt in tables["characters"].values() for t in by_wt.values())
+
+    stages: List[Tuple[str, Callable[[], int]]] = []
+    if char_pages:
+        stages.append(("parse_genshin_character_page", genshin_chars))
+    if u.GENSHIN_WEAPONS_LIST in pages:
+        stages.append(("parse_genshin_weapons_list", genshin_weapons))
+    if sdso_chars:
+        stages.append(("parse_sdso_character_page", sdso_char_pages))
+    if sdso_weapons:
+        stages.append(("parse_sdso_weapon_page", sdso_weapon_pages))
+    stages.append(("build_db", build))
+    stages.append(("build_skill_tables", skill_tables))
+    return stages
+
+
+def run_stage(fn: Callable[[], int], repeat: int) -> Dict[str, Any]:
+    best = float("inf")
+    records = 0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        records = fn()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": round(best * 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+        "records": records,
+        "throughput_per_s": round(records / best, 1) if best > 0 else 0.0,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    failures = []
+    for name, res in results.items():
+        ref = (baseline.get("stages") or {}).get(name)
+        if not ref or not ref.get("throughput_per_s"):
+            continue
+        floor = ref["throughput_per_s"] * (1.0 - threshold)
+        if res["throughput_per_s"] < floor:
+            failures.append(f"{name}: {res['throughput_per_s']}/s < {floor:.1f}/s "
+                            f"(baseline {ref['throughput_per_s']}/s, -{threshold:.0%})")
+    return failures
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", type=Path, default=None, help="Fixture version directory (default: latest under tools/fixtures).")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best kept).")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Allowed throughput drop vs baseline (0.25 = 25%%).")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_JSON, help="Baseline file.")
+    ap.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline.")
+    ap.add_argument("--json", type=Path, default=None, help="Also write results as JSON.")
+    args = ap.parse_args()
+
+    corpus = FixtureCorpus(args.fixtures) if args.fixtures else FixtureCorpus.latest()
+    u.configure_fetch(rate_limit=0)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"fixtures: {corpus.version} ({len(corpus.urls())} pages)")
+    print(f"{'stage':32} {'wall ms':>10} {'peak KB':>10} {'records':>8} {'rec/s':>10}")
+    for name, fn in build_stages(corpus):
+        res = run_stage(fn, args.repeat)
+        results[name] = res
+        print(f"{name:32} {res['wall_ms']:>10.1f} {res['peak_kb']:>10.1f} {res['records']:>8} {res['throughput_per_s']:>10.1f}")
+
+    report = {"fixtures": corpus.version, "recorded_at": u.utc_now_iso(), "stages": results}
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[OK] baseline saved -> {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("[INFO] no baseline yet (run with --save-baseline)")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("fixtures") != corpus.version:
+        print(f"[WARN] baseline was recorded on fixtures {baseline.get('fixtures')}, not {corpus.version}", file=sys.stderr)
+    failures = compare(results, baseline, args.threshold)
+    for f in failures:
+        print(f"[FAIL] {f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: section extraction on saved genshin.gg character pages.
+
+Compares the per-lookup scan (extract_h2_section_lines: costumes + skills/potential per
+weapon type, each call walking the document) against one SectionIndex pass per page,
+and checks both return identical lines.
+
+Pages come from a directory of saved .html files (--pages, e.g. tools/fixtures/<version>/pages),
+or by default from the genshin.gg character pages in the HTTP cache (.cache/http) left by
+tools/update_db.py.
+
+Usage:
+  python tools/bench/bench_sections.py [--pages DIR] [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import update_db as u  # noqa: E402
+
+
+def load_pages(pages_dir: Path = None) -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    if pages_dir is not None:
+        for p in sorted(pages_dir.rglob("*.html")):
+            out.append((str(p), p.read_text(encoding="utf-8")))
+        return out
+    for p in sorted(u.HTTP_CACHE_DIR.glob("*.json.gz")):
+        try:
+            entry = json.loads(gzip.decompress(p.read_bytes()).decode("utf-8"))
+        except Exception:
+            continue
+        if "/7dso/characters/" in entry.get("url", ""):
+            out.append((entry["url"], entry["body"]))
+    return out
+
+
+def lookups_for(soup: BeautifulSoup) -> Tuple[str, List[str]]:
+    h1 = soup.find("h1")
+    title = h1.get_text(" ", strip=True) if h1 else ""
+    name = title.split(" Build", 1)[0].strip() if " Build" in title else title.strip()
+    weapons = u.parse_character_weapons_from_text(u.clean_lines(soup.get_text("\n")))
+    prefixes = [f"{name} Costumes"]
+    for wt in weapons:
+        prefixes += [f"{name} {wt} Skills", f"{name} {wt} Potential"]
+    return name, prefixes
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=Path, default=None, help="Directory of saved .html pages (default: HTTP cache).")
+    ap.add_argument("--repeat", type=int, default=3, help="Timing repeats per page (best kept).")
+    args = ap.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print("No saved character pages found (run tools/update_db.py once, or pass --pages).", file=sys.stderr)
+        return 1
+
+    total_scan = total_index = 0.0
+    n_lookups = 0
+    for src, html in pages:
+        soup = BeautifulSoup(html, "lxml")
+        _, prefixes = lookups_for(soup)
+        n_lookups += len(prefixes)
+
+        best_scan = best_index = float("inf")
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            scanned = [u.extract_h2_section_lines(soup, p) for p in prefixes]
+            best_scan = min(best_scan, time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            idx = u.SectionIndex(soup)
+            indexed = [idx.lines(p) for p in prefixes]
+            best_index = min(best_index, time.perf_counter() - t0)
+
+        if scanned != indexed:
+            print(f"[FAIL] section mismatch: {src}", file=sys.stderr)
+            return 2
+        total_scan += best_scan
+        total_index += best_index
+
+    print(f"pages: {len(pages)}  lookups: {n_lookups}")
+    print(f"extract_h2_section_lines: {total_scan * 1000:9.1f} ms  ({total_scan * 1000 / len(pages):.2f} ms/page)")
+    print(f"SectionIndex:             {total_index * 1000:9.1f} ms  ({total_index * 1000 / len(pages):.2f} ms/page)")
+    if total_index > 0:
+        print(f"speedup: x{total_scan / total_index:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite export (tools/sqlite_export.py).
+
+Exports data/db.json (x --scale copies of every record, ids suffixed, to see the export grow)
+and times it against the same inserts committed row by row. Then answers cross-roster questions
+both in SQL on the export and with the Python loops they replace (load db.json, walk the nested
+records), checks the answers are identical and times both:
+- highest total multiplier Ultimate per weapon type (TOP_ULTIMATES_SQL)
+- number of skills per character and skill type
+- weapons per weapon type with their best equipment ATK
+
+Usage:
+  python tools/bench/bench_sqlite.py [--scale 20] [--repeat 20]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import sqlite_export as sx  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+
+SKILL_COUNTS_SQL = "SELECT character_id, type, COUNT(*) FROM skills GROUP BY character_id, type ORDER BY character_id, type"
+WEAPON_ATK_SQL = "SELECT weapon_type, COUNT(*), MAX(equipment_attack) FROM weapons GROUP BY weapon_type ORDER BY weapon_type"
+
+
+def scaled(dbx: Dict[str, Any], k: int) -> Dict[str, Any]:
+    """k copies of every module record, ids (and skill character_id) suffixed per copy."""
+    out = copy.deepcopy(dbx)
+    for name, recs in (dbx.get("modules") or {}).items():
+        if not isinstance(recs, dict):
+            continue
+        mod = out["modules"][name] = {}
+        for i in range(k):
+            for rid, rec in recs.items():
+                r = copy.deepcopy(rec)
+                r["id"] = f"{rid}~{i}" if i else rid
+                if i and r.get("character_id"):
+                    r["character_id"] = f"{r['character_id']}~{i}"
+                mod[r["id"]] = r
+    return out
+
+
+def py_top_ultimates(dbx: Dict[str, Any]) -> List[tuple]:
+    mods = dbx["modules"]
+    best: Dict[str, tuple] = {}
+    for sk in mods["skills"].values():
+        if sk.get("type") != "Ultimate Move":
+            continue
+        hits = [h.get("multiplier_pct") for h in sk.get("hits") or [] if isinstance(h, dict)]
+        mults = [m.get("value_pct") for m in sk.get("multipliers") or [] if isinstance(m, dict)]
+        total = sum(float(x) for x in hits if x is not None) if hits else (sum(float(x) for x in mults if x is not None) if mults else None)
+        if total is None:
+            continue
+        wt = sk.get("weapon_type")
+        if wt not in best or total > best[wt][3]:
+            ch = mods["characters"].get(sk.get("character_id")) or {}
+            best[wt] = (wt, ch.get("name"), sk.get("name"), total)
+    return [best[wt] for wt in sorted(best)]
+
+
+def py_skill_counts(dbx: Dict[str, Any]) -> List[tuple]:
+    counts: Dict[tuple, int] = {}
+    for sk in dbx["modules"]["skills"].values():
+        key = (sk.get("character_id"), sk.get("type"))
+        counts[key] = counts.get(key, 0) + 1
+    return [k + (n,) for k, n in sorted(counts.items())]
+
+
+def py_weapon_atk(dbx: Dict[str, Any]) -> List[tuple]:
+    agg: Dict[str, List[float]] = {}
+    for w in dbx["modules"]["weapons"].values():
+        agg.setdefault(w.get("weapon_type"), []).append(float(w.get("equipment_attack") or 0))
+    return [(wt, len(v), max(v)) for wt, v in sorted(agg.items())]
+
+
+def row_by_row(dbx: Dict[str, Any], path: Path) -> None:
+    """Same tables, one INSERT + COMMIT per row, indexes first (the naive export)."""
+    con = sqlite3.connect(path)
+    for stmt in filter(str.strip, (sx.SCHEMA + sx.INDEXES).split(";\n")):
+        con.execute(stmt)
+    con.commit()
+    for table, values in sx.table_rows(dbx).items():
+        for v in values:
+            con.execute(f"INSERT INTO {table} VALUES ({','.join('?' * len(v))})", v)
+            con.commit()
+    con.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--scale", type=int, default=20, help="Copies of every record for the export timing.")
+    ap.add_argument("--repeat", type=int, default=20, help="Runs of each query.")
+    args = ap.parse_args()
+
+    dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    big = scaled(dbx, max(1, args.scale))
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        t0 = time.perf_counter()
+        counts = sx.export_sqlite(big, tmp / "big.sqlite")
+        t_bulk = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        row_by_row(big, tmp / "rows.sqlite")
+        t_rows = time.perf_counter() - t0
+        n_rows = sum(counts.values())
+        print(f"export x{args.scale}: {n_rows} rows  one transaction {t_bulk * 1e3:8.1f} ms   "
+              f"row by row {t_rows * 1e3:8.1f} ms  (x{t_rows / t_bulk:.0f})")
+
+        path = tmp / "db.sqlite"
+        sx.export_sqlite(dbx, path)
+        checks = [("top Ultimate per weapon type", sx.TOP_ULTIMATES_SQL, py_top_ultimates),
+                  ("skills per character x type", SKILL_COUNTS_SQL, py_skill_counts),
+                  ("weapons per weapon type", WEAPON_ATK_SQL, py_weapon_atk)]
+        for label, sql, fn in checks:
+            t_sql = t_py = 0.0
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+                got = [tuple(r) for r in con.execute(sql)]
+                con.close()
+                t1 = time.perf_counter()
+                want = fn(json.loads(args.db.read_text(encoding="utf-8")))
+                t_py += time.perf_counter() - t1
+                t_sql += t1 - t0
+            if got != want:
+                print(f"[FAIL] {label}: SQL {got[:3]} != Python {want[:3]}", file=sys.stderr)
+                return 2
+            print(f"{label:30} {len(got):4} rows  SQL (open + query) {t_sql * 1e3 / args.repeat:7.2f} ms   "
+                  f"Python (load db.json + loops) {t_py * 1e3 / args.repeat:7.2f} ms  ok")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stat-scaling / boss-level sweeps (tools/sweep_engine.py).
+
+Sweeps the default rotations of the site (priority with a Burst plan, looping timeline), a
+rotation with a wait action / cast times / gauge-triggered Burst, and the kit rotation of a few
+characters, over a stat x Δ% x boss level grid for every formula profile, and checks the batched
+result against src/app.js itself: runScaling() x runBossScaling() point by point, i.e. one
+simulateOnce(..., "expected") per grid point (extracted and run with node).
+Times the batched sweep against the same point-by-point loop in Python (one schedule + one
+damage evaluation per point), then the whole roster x profiles batch job, in-process and over
+the process pool.
+
+Usage:
+  python tools/bench/bench_sweep.py [--characters 3] [--levels 1:200:20] [--workers N] [--no-js]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import damage_engine as de  # noqa: E402
+import sweep_engine as sw  # noqa: E402
+from bench_damage import JS_FUNCTIONS, ROOT, js_function  # noqa: E402
+
+RTOL = 1e-9
+JS_SIM_FUNCTIONS = ["cooldownKeyForAction", "countHitsFromCtx", "effectiveCooldownSec", "castTimeSec",
+                    "isBurstActiveNow", "maybeTriggerBurst", "updateResourcesAfterAction", "simulateOnce"]
+GAUGE_SETTINGS = {"burst_gauge_threshold": 12, "burst_duration_sec": 5, "cast_time_skill": 0.9}
+
+JS_MAIN = """
+let KIT = [];
+function resolveSkillForAction(build, rot, action){
+  const si = action?.skill_index;
+  if (si === undefined || si === null) return null;
+  return KIT[si] || null;
+}
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const out = input.cases.map(c => {
+  KIT = (c.kit || []).map(normalizeDbxSkill);
+  const res = [];
+  for (const statKey of c.stats){
+    for (const pct of c.deltas){
+      const b2 = deepCopy(c.build);
+      const v0 = b2.stats[statKey] || 0;
+      if (statKey === "atk"){
+        const baseAtk = (v0===0 ? 100 : v0);
+        b2.stats.atk = baseAtk * (1 + pct/100);
+      } else {
+        b2.stats[statKey] = v0 * (1 + pct/100);
+      }
+      for (const lvl of c.levels){
+        const enemy = Object.assign({}, c.enemy, {def: c.boss.def_base + (lvl-1)*c.boss.def_per, hp: c.boss.hp_base + (lvl-1)*c.boss.hp_per});
+        res.push(simulateOnce(b2, c.rot, {name: "", enemy}, c.duration, c.settings, "expected", null).dps);
+      }
+    }
+  }
+  return res;
+});
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def js_sweeps(cases: List[Dict[str, Any]]) -> List[List[float]]:
+    utils = (ROOT / "src" / "core" / "utils.js").read_text(encoding="utf-8")
+    app = (ROOT / "src" / "app.js").read_text(encoding="utf-8")
+    script = "\n".join([js_function(utils, n) for n in ("clamp", "pctToMul", "toNum", "deepCopy")]
+                       + [js_function(app, n) for n in JS_FUNCTIONS + JS_SIM_FUNCTIONS] + [JS_MAIN])
+    res = subprocess.run(["node", "-e", script], input=json.dumps({"cases": cases}), capture_output=True, text=True, check=True)
+    return json.loads(res.stdout)
+
+
+def gauge_rotation(kit_rot: Dict[str, Any]) -> Dict[str, Any]:
+    """Kit rotation with a wait action first (the priority loop's fallback), cast times and no Burst plan."""
+    actions = [{"kind": "wait", "label": "Wait", "cd": 0.3}]
+    for i, a in enumerate(kit_rot["actions"]):
+        actions.append({**a, "cast_time": 0.5 + 0.25 * (i % 3), "burstEligible": i % 2 == 0})
+    return {**kit_rot, "id": "gauge", "actions": actions}
+
+
+def point_by_point(case: sw.SweepCase, enemy, settings, grid: sw.SweepGrid) -> np.ndarray:
+    out = np.zeros(grid.shape())
+    for s, stat in enumerate(grid.stats):
+        for d, pct in enumerate(grid.deltas):
+            for lv, level in enumerate(grid.levels):
+                point = replace(grid, stats=(stat,), deltas=[pct], levels=[level])
+                out[s, d, lv] = sw.sweep_dps(case.build, case.rotation, enemy, settings, point, case.kit)[0, 0, 0]
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--characters", type=int, default=3, help="Characters whose kit rotation is checked.")
+    ap.add_argument("--levels", default="1:200:20")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--no-js", action="store_true", help="Skip the src/app.js check.")
+    args = ap.parse_args()
+
+    defaults = de.load_site_defaults()
+    profile_defs = de.load_formula_profiles()
+    dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    raw_skills = list(((dbx.get("modules") or {}).get("skills") or {}).values())
+    build, enemy = defaults["builds"][0], defaults["scenarios"][1]["enemy"]
+    lv = [int(x) for x in args.levels.split(":")] + [1]
+    grid = sw.SweepGrid(levels=list(range(lv[0], lv[1] + 1, lv[2])))
+
+    roster = sw.roster_cases(dbx, build)
+    cases = [sw.SweepCase(r["id"], dict(build), r) for r in defaults["rotations"]]
+    for c in roster[:args.characters]:
+        cases.append(c)
+        cases.append(replace(c, key=f"{c.key}/gauge", rotation=gauge_rotation(c.rotation)))
+    raw_kits = {c.key: de.select_skills(raw_skills, c.rotation.get("character_id"), c.weapon_type) if c.kit else [] for c in cases}
+
+    settings_sets = [(p, de.profile_settings(p, profile_defs, defaults)) for p in profile_defs]
+    settings_sets += [(f"{p}+gauge", {**s, **GAUGE_SETTINGS}) for p, s in settings_sets[:1]]
+    print(f"{len(cases)} rotations x {len(settings_sets)} settings x {int(np.prod(grid.shape()))} points "
+          f"({len(grid.stats)} stats x {len(grid.deltas)} Δ% x {len(grid.levels)} levels)")
+
+    if not args.no_js and not shutil.which("node"):
+        print("[WARN] node not found: app.js check skipped", file=sys.stderr)
+        args.no_js = True
+    t_batch = t_points = t_js = 0.0
+    n_points = 0
+    for label, settings in settings_sets:
+        t0 = time.perf_counter()
+        got = [sw.sweep_dps(c.build, c.rotation, enemy, settings, grid, c.kit) for c in cases]
+        t1 = time.perf_counter()
+        ref = point_by_point(cases[0], enemy, settings, grid)
+        t2 = time.perf_counter()
+        t_batch += (t1 - t0) / len(cases)
+        t_points += t2 - t1
+        n_points += ref.size
+        if not np.allclose(got[0], ref, rtol=RTOL, atol=1e-9):
+            print(f"[FAIL] {label}: batched sweep != point by point", file=sys.stderr)
+            return 2
+        if args.no_js:
+            continue
+        payload = [{"build": c.build, "rot": c.rotation, "kit": raw_kits[c.key], "enemy": enemy, "settings": settings,
+                    "stats": list(grid.stats), "deltas": grid.deltas, "levels": grid.levels, "boss": grid.boss,
+                    "duration": grid.duration} for c in cases]
+        t0 = time.perf_counter()
+        js = js_sweeps(payload)
+        t_js += time.perf_counter() - t0
+        for c, g, j in zip(cases, got, js):
+            j = np.array(j).reshape(grid.shape())
+            bad = ~np.isclose(g, j, rtol=RTOL, atol=1e-9)
+            if bad.any():
+                s, d, lvl = (int(x[0]) for x in np.nonzero(bad))
+                print(f"[FAIL] {label} · {c.key}: {grid.stats[s]} Δ{grid.deltas[d]:+.1f}% L{grid.levels[lvl]}: "
+                      f"{g[s, d, lvl]!r} != app.js {j[s, d, lvl]!r}", file=sys.stderr)
+                return 2
+        print(f"{label:28} {len(cases)} rotations  app.js ok")
+
+    per_batch = t_batch / len(settings_sets) * 1e6 / int(np.prod(grid.shape()))
+    per_point = t_points * 1e6 / n_points
+    print(f"batched {per_batch:8.2f} us/point  point by point {per_point:8.1f} us/point  speedup x{per_point / per_batch:.0f}"
+          + ("" if args.no_js else f"  (app.js through node {t_js * 1e6 / (n_points * len(cases)):.1f} us/point)"))
+
+    full = sw.SweepGrid(levels=list(range(1, 201)))
+    points = len(roster) * len(profile_defs) * int(np.prod(full.shape()))
+    for workers in (0, args.workers):
+        if workers is not None and workers <= 1 and workers != 0:
+            continue
+        t0 = time.perf_counter()
+        results = sw.sweep_cases(roster, enemy, full, None, workers, profile_defs, defaults)
+        dt = time.perf_counter() - t0
+        print(f"roster {len(roster)} characters x {len(profile_defs)} profiles, full grid ({points} points)  "
+              f"workers={workers if workers is not None else 'cpu'}  {dt:6.2f} s ({dt * 1e6 / points:.2f} us/point)")
+    table = sw.sweep_table(results, roster, full, enemy, build, profile_defs)
+    size = len(json.dumps(table, separators=(",", ":")))
+    print(f"result table {size / 1024:.0f} KiB minified")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-text index (tools/text_index.py).
+
+Builds the index from data/db.json, draws AND / OR / phrase queries from the corpus itself (words
+and word runs of random documents, plus effect:<type> terms and words absent from the DB) and
+checks every answer against a scan of the documents (tokenize each text, match the query on the
+token lists). Times the index load and the queries against the scan, including the cost the scan
+pays first: loading db.json.
+
+Usage:
+  python tools/bench/bench_text_index.py [--queries 500] [--seed 7]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import text_index as ti  # noqa: E402
+from parser_engine import EFFECT_TYPES  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def scan(docs: List[Dict[str, Any]], query: str) -> List[int]:
+    """The query evaluated by tokenizing and walking every document."""
+    out = []
+    groups = ti.parse_query(query)
+    for i, d in enumerate(docs):
+        tokens = ti.tokenize(d["text"]) + [ti.EFFECT_PREFIX + e for e in d["effects"]]
+        text = " " + " ".join(ti.tokenize(d["text"])) + " "
+        effects = {ti.EFFECT_PREFIX + e for e in d["effects"]}
+        for group in groups:
+            if all((c[0] in effects) if len(c) == 1 and c[0].startswith(ti.EFFECT_PREFIX)
+                   else (c[0] in tokens if len(c) == 1 else f" {' '.join(c)} " in text) for c in group):
+                out.append(i)
+                break
+    return out
+
+
+def random_queries(docs: List[Dict[str, Any]], n: int, rng: random.Random) -> List[str]:
+    texts = [ti.tokenize(d["text"]) for d in docs]
+    texts = [t for t in texts if len(t) >= 3]
+    effects = [ti.EFFECT_PREFIX + name for name, _ in EFFECT_TYPES]
+    out = []
+    for _ in range(n):
+        clauses = []
+        for _ in range(rng.randint(1, 3)):
+            t = rng.choice(texts)
+            r = rng.random()
+            if r < 0.35:
+                k = rng.randint(0, len(t) - 3)
+                clauses.append('"' + " ".join(t[k:k + rng.randint(2, 3)]) + '"')
+            elif r < 0.45:
+                clauses.append(rng.choice(effects))
+            elif r < 0.5:
+                clauses.append("zzxq")
+            else:
+                clauses.append(rng.choice(t))
+        q = clauses[0]
+        for c in clauses[1:]:
+            q += rng.choice([" ", " AND ", " OR ", " | "]) + c
+        out.append(q)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=ROOT / "data" / "db.json")
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    t_db = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index = ti.build_text_index(dbx)
+    t_build = time.perf_counter() - t0
+    docs = ti.collect_documents(dbx)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "text_index.json"
+        ti.write_text_index(index, path)
+        sizes = {s: Path(f"{path}{s}").stat().st_size for s in ("", ".gz", ".br") if Path(f"{path}{s}").exists()}
+        t0 = time.perf_counter()
+        idx = ti.TextIndex.load(path)
+        t_load = time.perf_counter() - t0
+
+    queries = random_queries(docs, args.queries, random.Random(args.seed))
+    t_index = t_scan = 0.0
+    matched = 0
+    for q in queries:
+        t0 = time.perf_counter()
+        got = idx.search(q)
+        t1 = time.perf_counter()
+        want = scan(docs, q)
+        t2 = time.perf_counter()
+        t_index += t1 - t0
+        t_scan += t2 - t1
+        matched += bool(got)
+        if got != want:
+            print(f"[FAIL] {q!r}: index {got[:10]} != scan {want[:10]}", file=sys.stderr)
+            return 2
+
+    n = len(queries)
+    print(f"{len(idx)} documents, {len(index['terms'])} terms, built in {t_build * 1e3:.0f} ms; "
+          + ", ".join(f"{k or 'json'} {v / 1024:.1f} KB" for k, v in sizes.items())
+          + f" (db.json {args.db.stat().st_size / 1024:.0f} KB)")
+    print(f"{n} queries ({matched} with hits)  ok")
+    print(f"index: load {t_load * 1e3:6.2f} ms   query {t_index * 1e6 / n:8.1f} us")
+    print(f"scan : load {t_db * 1e3:6.2f} ms   query {t_scan * 1e6 / n:8.1f} us   (x{t_scan / t_index:.0f} per query)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Offline HTML fixture corpus for the scraping hot path.
+
+record: runs the real build_db fetch path once and saves every page it requested
+        (genshin.gg lists + character pages, and 7dsorigin.gg with --enable-7dsorigin)
+        into a versioned directory:
+
+    tools/fixtures/<version>/manifest.json   {"version", "recorded_at", "pages": [{url, file, sha1, bytes}]}
+    tools/fixtures/<version>/pages/<sha1(url)[:16]>.html
+
+FixtureCorpus.get is a drop-in fetcher for update_db.install_fetcher, so the
+parsers and build_db run against the corpus without touching the network.
+
+Usage:
+  python tools/bench/fixtures.py record [--version V] [--enable-7dsorigin]
+  python tools/bench/fixtures.py list
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import update_db as u  # noqa: E402
+
+FIXTURES_DIR = u.ROOT / "tools" / "fixtures"
+
+
+class FixtureCorpus:
+    """A recorded fixture version: url -> saved html."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest = json.loads((self.root / "manifest.json").read_text(encoding="utf-8"))
+        self.version = self.manifest.get("version") or self.root.name
+        self._files: Dict[str, str] = {p["url"]: p["file"] for p in self.manifest.get("pages", [])}
+
+    @classmethod
+    def latest(cls, fixtures_dir: Path = FIXTURES_DIR) -> "FixtureCorpus":
+        versions = versions_in(fixtures_dir)
+        if not versions:
+            raise FileNotFoundError(f"no fixture corpus under {fixtures_dir} (run: python tools/bench/fixtures.py record)")
+        return cls(fixtures_dir / versions[-1])
+
+    def urls(self) -> List[str]:
+        return list(self._files)
+
+    def get(self, url: str) -> str:
+        f = self._files.get(url)
+        if f is None:
+            raise KeyError(f"not in fixture corpus {self.version}: {url}")
+        return (self.root / f).read_text(encoding="utf-8")
+
+    def has_sdso(self) -> bool:
+        return any(url.startswith(u.SDSO_BASE) for url in self._files)
+
+
+def versions_in(fixtures_dir: Path = FIXTURES_DIR) -> List[str]:
+    if not fixtures_dir.exists():
+        return []
+    return sorted(p.name for p in fixtures_dir.iterdir() if (p / "manifest.json").exists())
+
+
+def record(version: Optional[str] = None, enable_7dsorigin: bool = False, fixtures_dir: Path = FIXTURES_DIR) -> Path:
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%d")
+    out = fixtures_dir / version
+    (out / "pages").mkdir(parents=True, exist_ok=True)
+
+    lock = threading.Lock()
+    seen: Dict[str, str] = {}
+
+    def recording_fetch(url: str) -> str:
+        html = u.fetch_url(url)
+        with lock:
+            seen[url] = html
+        return html
+
+    u.install_fetcher(recording_fetch)
+    try:
+        u.build_db(enable_7dsorigin=enable_7dsorigin)
+    finally:
+        u.install_fetcher(None)
+
+    pages = []
+    for url in sorted(seen):
+        html = seen[url]
+        name = f"pages/{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.html"
+        (out / name).write_text(html, encoding="utf-8")
+        pages.append({
+            "url": url,
+            "file": name,
+            "sha1": hashlib.sha1(html.encode("utf-8")).hexdigest(),
+            "bytes": len(html.encode("utf-8")),
+        })
+    manifest = {
+        "version": version,
+        "recorded_at": u.utc_now_iso(),
+        "enable_7dsorigin": enable_7dsorigin,
+        "pages": pages,
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record", help="Record the current live pages into tools/fixtures/<version>/.")
+    rec.add_argument("--version", default=None, help="Fixture version name (default: today, YYYYMMDD).")
+    rec.add_argument("--enable-7dsorigin", action="store_true", help="Also record 7dsorigin.gg pages (check permissions first).")
+    sub.add_parser("list", help="List recorded fixture versions.")
+    args = ap.parse_args()
+
+    if args.cmd == "list":
+        for v in versions_in():
+            c = FixtureCorpus(FIXTURES_DIR / v)
+            print(f"{v}  {len(c.urls())} pages  recorded {c.manifest.get('recorded_at')}")
+        return 0
+
+    u.configure_fetch()
+    u.configure_cache()
+    out = record(args.version, args.enable_7dsorigin)
+    n = len(FixtureCorpus(out).urls())
+    print(f"[OK] recorded {n} pages -> {out.relative_to(u.ROOT)}")
+    print(f"[INFO] HTTP: {u.STATS.summary()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
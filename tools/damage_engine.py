@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Vectorized damage engine (NumPy)
+
+Python mirror of the browser damage math of src/app.js, evaluated for whole batches of
+(build, skill, enemy) rows as NumPy arrays:
+
+- settings      defaults-json of index.html (what the site starts with), overlaid with a
+                profile's settings from data/formula_profiles.js (same as "Appliquer le profil")
+- builds        computedStatsForContext() + aggregateBuffs(), once per build and skill kind
+- skills        normalizeDbxSkill() on data/db.json modules.skills (per-hit multipliers, or
+                multiplier x hits), applyParsedEffectsToComputedStats() on parsed_effects
+- damage        singleHitDamage() / actionDamage() in "expected" mode: DEF/(DEF+K) or linear
+                mitigation, pierce vs resistance, element, crit chance/damage vs enemy crit
+                resist/def, dmg buckets, hidden multipliers; optional Burst bonus as in simulateOnce()
+
+singleHitDamage() is linear in the hit multiplier and in the crit factor, so a row is
+computed once as a non-crit damage per 100% multiplier (RowTerms.unit) plus crit chance /
+crit damage, then combined with the per-hit multipliers. Results match the JS engine up to
+floating-point reassociation (relative 1e-9; tools/bench/bench_damage.py --js checks it).
+Rotation actions (action_context(), SkillTable.from_contexts()) are scheduled by
+tools/sweep_engine.py.
+
+CLI (best skills of the default builds against the default scenarios):
+  python tools/damage_engine.py [--profile cbt_v1] [--db data/db.json] [--top 10]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from js_values import _MISSING, js_num, js_round
+
+ROOT = Path(__file__).resolve().parents[1]
+INDEX_HTML = ROOT / "index.html"
+PROFILES_JS = ROOT / "data" / "formula_profiles.js"
+DB_JSON = ROOT / "data" / "db.json"
+
+KINDS = ("skill", "normal", "tag", "ultimate", "passive")
+KIND_CODES = {k: i for i, k in enumerate(KINDS)}
+
+# computedStatsForContext() fields kept per (build, kind); dmg_mul is its _dmgMul
+STAT_FIELDS = ("atk", "pierce_pct", "res_pen_pct", "def_pen_pct", "crit_rate_pct", "crit_dmg_pct",
+               "crit_resist_pen_pct", "crit_def_pen_pct", "dmg_bonus_pct", "dmg_taken_pct",
+               "skill_dmg_pct", "ult_dmg_pct", "dmg_mul")
+ENEMY_FIELDS = ("def", "resistance_pct", "crit_resist_pct", "crit_def_pct", "dmg_reduction_pct", "burst_resist")
+# applyParsedEffectsToComputedStats() as deltas: atk factor, then additive points
+EFFECT_FIELDS = ("atk_mul", "crit_dmg_pct", "crit_rate_pct", "def_pen_pct", "dmg_bonus_pct")
+
+DEFAULT_ELEMENT_ADV = {"fire": "wind", "wind": "earth", "earth": "water", "water": "fire", "light": "dark", "dark": "light"}
+
+_ORDINAL_HIT = re.compile(r"(\d+)(?:st|nd|rd|th)\s*hit\s*:\s*([0-9]+(?:\.[0-9]+)?)%", re.I)
+_FIRST_PCT = re.compile(r"([0-9]+(?:\.[0-9]+)?)%")
+
+
+# ---------------------------------------------------------------------------
+# JS value semantics
+
+def _get(obj: Optional[Mapping[str, Any]], key: str) -> Any:
+    return obj.get(key, _MISSING) if isinstance(obj, Mapping) else _MISSING
+
+
+def _num(obj: Optional[Mapping[str, Any]], key: str, d: float = 0.0) -> float:
+    return js_num(_get(obj, key), d)
+
+
+def _setting(settings: Mapping[str, Any], key: str, d: Any) -> Any:
+    """settings.key ?? d"""
+    v = settings.get(key)
+    return d if v is None else v
+
+
+def _or(v: Any, d: Any) -> Any:
+    """v || d"""
+    return v if v else d
+
+
+def _clamp(x, lo, hi):
+    return np.maximum(lo, np.minimum(hi, x))
+
+
+# ---------------------------------------------------------------------------
+# Settings / profiles
+
+def js_object_to_json(text: str) -> str:
+    """
+    JSON text of a JS object literal (as written in data/formula_profiles.js): drops comments and
+    trailing commas, quotes bare keys, turns single-quoted strings into JSON strings.
+    """
+    out: List[str] = []
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c in "\"'":
+            j, buf = i + 1, []
+            while j < n and text[j] != c:
+                if text[j] == "\\" and j + 1 < n:
+                    buf.append(text[j:j + 2])
+                    j += 2
+                    continue
+                buf.append(text[j])
+                j += 1
+            body = "".join(buf)
+            out.append(json.dumps(json.loads(f'"{body}"' if c == '"' else '"' + body.replace('"', '\\"').replace("\\'", "'") + '"'),
+                                  ensure_ascii=False))
+            i = j + 1
+        elif text.startswith("//", i):
+            i = text.find("\n", i) if "\n" in text[i:] else n
+        elif text.startswith("/*", i):
+            i = text.index("*/", i) + 2
+        elif c == ",":
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and text[j] in "}]":
+                i += 1
+                continue
+            out.append(c)
+            i += 1
+        elif c.isalpha() or c in "_$":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in "_$"):
+                j += 1
+            word = text[i:j]
+            k = j
+            while k < n and text[k].isspace():
+                k += 1
+            if k < n and text[k] == ":" and word not in ("true", "false", "null"):
+                out.append(json.dumps(word))
+            else:
+                out.append(word)
+            i = j
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+def load_formula_profiles(path: Path = PROFILES_JS) -> Dict[str, Any]:
+    """window.__FORMULA_PROFILES__ of data/formula_profiles.js."""
+    text = Path(path).read_text(encoding="utf-8")
+    start = text.index("=", text.index("__FORMULA_PROFILES__")) + 1
+    end = text.rindex("}") + 1
+    return json.loads(js_object_to_json(text[start:end]))
+
+
+def load_site_defaults(path: Path = INDEX_HTML) -> Dict[str, Any]:
+    """The defaults-json block of index.html (settings, example builds and scenarios)."""
+    html = Path(path).read_text(encoding="utf-8")
+    m = re.search(r'<script[^>]*id="defaults-json"[^>]*>(.*?)</script>', html, re.S)
+    return json.loads(m.group(1)) if m else {}
+
+
+def profile_settings(profile: Optional[str] = None, profiles: Optional[Dict[str, Any]] = None,
+                     defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Site default settings with a formula profile applied on top (Object.assign, like the UI)."""
+    settings = dict((defaults if defaults is not None else load_site_defaults()).get("settings") or {})
+    if profile:
+        profiles = profiles if profiles is not None else load_formula_profiles()
+        if profile not in profiles:
+            raise KeyError(f"unknown formula profile: {profile} (known: {', '.join(profiles)})")
+        settings.update(profiles[profile].get("settings") or {})
+        settings["formula_profile"] = profile
+    return settings
+
+
+def element_multiplier(att: Optional[str], dfn: Optional[str], settings: Mapping[str, Any]) -> float:
+    adv_map = settings.get("element_adv_map") or DEFAULT_ELEMENT_ADV
+    adv = _setting(settings, "elem_adv_bonus_pct", 30) / 100
+    dis = _setting(settings, "elem_disadv_penalty_pct", -20) / 100
+    if not att or not dfn or att == "neutral" or dfn == "neutral":
+        return 1.0
+    if att == dfn:
+        return 1.0
+    if adv_map.get(att) == dfn:
+        return 1 + adv
+    if adv_map.get(dfn) == att:
+        return 1 + dis
+    return 1.0
+
+
+# ---------------------------------------------------------------------------
+# Builds
+
+def _buff_applies(scope: str, kind: str) -> bool:
+    if scope == "all":
+        return True
+    if scope == "skill":
+        return kind in ("skill", "normal", "tag")
+    if scope == "ultimate":
+        return kind == "ultimate"
+    return False
+
+
+def _stat_sums(build: Mapping[str, Any], kind: str) -> Tuple[Dict[str, Any], float, float]:
+    """computedStatsForContext() before ATK% and caps: (stats + additive buffs, ATK% sum, ATK mul buffs)."""
+    s = build.get("stats") or {}
+    add = dict.fromkeys(("atk_pct", "dmg_pct", "skill_dmg_pct", "ult_dmg_pct", "crit_rate_pct", "crit_dmg_pct",
+                         "pierce_pct", "def_pen_pct", "res_pen_pct"), 0.0)
+    dmg_mul = atk_mul = 1.0
+    buffs = build.get("buffs")
+    for b in (buffs if isinstance(buffs, list) else []):
+        if not isinstance(b, dict) or b.get("enabled") is False:
+            continue
+        if not _buff_applies(b.get("scope") or "all", kind):
+            continue
+        stat, val = b.get("stat"), _num(b, "value", 0)
+        if (b.get("type") or "add") == "mul":
+            if stat == "dmg":
+                dmg_mul *= (1 + val / 100)
+            elif stat == "atk":
+                atk_mul *= (1 + val / 100)
+            continue
+        if stat in add:
+            add[stat] += val
+    legacy_dmg_mult = _num(s, "dmg_mult_pct", 0)
+    if legacy_dmg_mult:
+        dmg_mul *= (1 + legacy_dmg_mult / 100)
+
+    out = {f: _num(s, f, 0) for f in STAT_FIELDS if f != "dmg_mul"}
+    out["dmg_mul"] = dmg_mul
+    out["dmg_bonus_pct"] += add["dmg_pct"]
+    for f in ("skill_dmg_pct", "ult_dmg_pct", "crit_rate_pct", "crit_dmg_pct", "pierce_pct", "def_pen_pct", "res_pen_pct"):
+        out[f] += add[f]
+    el = s.get("element")
+    out["element"] = el if isinstance(el, str) else "neutral"
+    return out, add["atk_pct"], atk_mul
+
+
+def _finish_stats(out: Dict[str, Any], atk_pct: Any, atk_mul: float, settings: Mapping[str, Any]) -> Dict[str, Any]:
+    """ATK% and caps of computedStatsForContext(); works on floats and on arrays of variants alike."""
+    out["atk"] = out["atk"] * (1 + atk_pct / 100) * atk_mul
+    out["pierce_pct"] = np.minimum(np.maximum(out["pierce_pct"], -100), _setting(settings, "pierce_cap", 300))
+    out["def_pen_pct"] = np.minimum(np.maximum(out["def_pen_pct"], 0), 95)
+    out["res_pen_pct"] = np.minimum(np.maximum(out["res_pen_pct"], 0), 300)
+    out["crit_rate_pct"] = np.minimum(np.maximum(out["crit_rate_pct"], 0), _setting(settings, "crit_cap", 100))
+    out["crit_dmg_pct"] = np.minimum(np.maximum(out["crit_dmg_pct"], 0), 500)
+    return out
+
+
+def computed_stats(build: Mapping[str, Any], kind: str, settings: Mapping[str, Any]) -> Dict[str, Any]:
+    """computedStatsForContext() (with aggregateBuffs()) for one build and skill kind."""
+    out, atk_pct, atk_mul = _stat_sums(build, kind)
+    return _finish_stats(out, atk_pct, atk_mul, settings)
+
+
+@dataclass
+class BuildTable:
+    ids: List[str]
+    stats: np.ndarray  # (builds, kinds, STAT_FIELDS)
+    elements: List[str]
+
+    @classmethod
+    def from_builds(cls, builds: Sequence[Mapping[str, Any]], settings: Mapping[str, Any]) -> "BuildTable":
+        stats = np.zeros((len(builds), len(KINDS), len(STAT_FIELDS)))
+        elements = []
+        for i, b in enumerate(builds):
+            for k, kind in enumerate(KINDS):
+                cs = computed_stats(b, kind, settings)
+                stats[i, k] = [cs[f] for f in STAT_FIELDS]
+            elements.append(cs["element"])
+        return cls([str(b.get("id", i)) for i, b in enumerate(builds)], stats, elements)
+
+    @classmethod
+    def from_stat_deltas(cls, build: Mapping[str, Any], deltas: Mapping[str, np.ndarray], settings: Mapping[str, Any],
+                         ids: Optional[Sequence[str]] = None) -> "BuildTable":
+        """
+        Variants of one build without a Python loop per variant: deltas[f][i] is added to stats f
+        of variant i (before buffs' ATK% and caps), "atk_pct" to its additive ATK% buffs. Same
+        numbers as from_builds() on the materialized variants.
+        """
+        n = len(next(iter(deltas.values()))) if deltas else 1
+        stats = np.zeros((n, len(KINDS), len(STAT_FIELDS)))
+        for k, kind in enumerate(KINDS):
+            out, atk_pct, atk_mul = _stat_sums(build, kind)
+            for f, d in deltas.items():
+                d = np.asarray(d, dtype=float)
+                if f == "atk_pct":
+                    atk_pct = atk_pct + d
+                elif f in STAT_FIELDS and f != "dmg_mul":
+                    out[f] = out[f] + d
+                else:
+                    raise KeyError(f"not a build stat: {f}")
+            out = _finish_stats(out, atk_pct, atk_mul, settings)
+            for j, f in enumerate(STAT_FIELDS):
+                stats[:, k, j] = out[f]
+        element = _stat_sums(build, KINDS[0])[0]["element"]
+        return cls(list(ids) if ids is not None else [str(i) for i in range(n)], stats, [element] * n)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+# ---------------------------------------------------------------------------
+# Enemies
+
+@dataclass
+class EnemyTable:
+    ids: List[str]
+    values: np.ndarray  # (enemies, ENEMY_FIELDS)
+    elements: List[str]
+    debuffed: np.ndarray  # bool (enemies,)
+
+    @classmethod
+    def from_enemies(cls, enemies: Sequence[Mapping[str, Any]], settings: Mapping[str, Any],
+                     ids: Optional[Sequence[str]] = None) -> "EnemyTable":
+        values = np.zeros((len(enemies), len(ENEMY_FIELDS)))
+        elements, debuffed = [], []
+        setting_debuffed = bool(settings.get("enemy_debuffed") or settings.get("context_enemy_debuffed"))
+        for i, e in enumerate(enemies):
+            values[i] = [_num(e, f, 0) for f in ENEMY_FIELDS]
+            elements.append(e.get("element") or "neutral")
+            debuffed.append(bool(e.get("is_debuffed")) or setting_debuffed)
+        return cls(list(ids) if ids is not None else [str(i) for i in range(len(enemies))],
+                   values, elements, np.array(debuffed, dtype=bool))
+
+    @classmethod
+    def from_scenarios(cls, scenarios: Sequence[Mapping[str, Any]], settings: Mapping[str, Any]) -> "EnemyTable":
+        return cls.from_enemies([sc.get("enemy") or {} for sc in scenarios], settings,
+                                [str(sc.get("id", i)) for i, sc in enumerate(scenarios)])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+# ---------------------------------------------------------------------------
+# Skills
+
+def ordinal_hit_multipliers_pct(text: str) -> List[float]:
+    """parseOrdinalHitMultipliersPct(): "1st hit: 120%" ... by hit number."""
+    by_hit: Dict[float, float] = {}
+    for m in _ORDINAL_HIT.finditer(text or ""):
+        by_hit[float(m.group(1))] = float(m.group(2))
+    return [by_hit[h] for h in sorted(by_hit)]
+
+
+def normalize_skill(sk: Mapping[str, Any]) -> Dict[str, Any]:
+    """normalizeDbxSkill(): the UI skill shape (multiplier %, hits, hit_multipliers_pct)."""
+    desc = sk.get("description") or ""
+    mults = sk.get("multipliers") if isinstance(sk.get("multipliers"), list) else []
+    contexts = " ".join((m or {}).get("context") or "" for m in mults)
+    ord_pcts = ordinal_hit_multipliers_pct(desc + " " + contexts)
+
+    struct_pcts: List[float] = []
+    hits = sk.get("hits") if isinstance(sk.get("hits"), list) else []
+    if hits:
+        by_hit: Dict[float, float] = {}
+        seq: List[float] = []
+        for h in hits:
+            h = h or {}
+            raw = next((h[k] for k in ("multiplier_pct", "value_pct", "pct") if h.get(k) is not None), _MISSING)
+            pct = js_num(raw, math.nan)
+            if not math.isfinite(pct):
+                continue
+            hn = js_num(h.get("hit", _MISSING), math.nan)
+            if math.isfinite(hn):
+                by_hit[hn] = pct
+            else:
+                seq.append(pct)
+        struct_pcts = [by_hit[k] for k in sorted(by_hit)] if by_hit else seq
+
+    hit_pcts = ord_pcts if len(ord_pcts) > len(struct_pcts) else struct_pcts
+    if hit_pcts:
+        primary = 0.0
+        for p in hit_pcts:
+            primary += p
+    elif mults:
+        primary = js_num(_get(mults[0], "value_pct"), math.nan)
+        primary = None if math.isnan(primary) else primary
+    else:
+        m = _FIRST_PCT.search(desc)
+        primary = float(m.group(1)) if m else None
+    return {
+        "id": sk.get("id"),
+        "name": sk.get("name") or sk.get("id") or "Skill",
+        "type": sk.get("type") or "Skill",
+        "cooldown_sec": sk.get("cooldown_sec"),
+        "multiplier": primary,
+        "hits": len(hit_pcts) if hit_pcts else (len(hits) if hits else 1),
+        "hit_multipliers_pct": hit_pcts or None,
+        "parsed_effects": sk.get("parsed_effects") if isinstance(sk.get("parsed_effects"), list) else [],
+    }
+
+
+def skill_kind(skill_type: Any) -> str:
+    t = str(skill_type or "").lower()
+    if "ult" in t:
+        return "ultimate"
+    if "tag" in t:
+        return "tag"
+    if "normal" in t:
+        return "normal"
+    if "passive" in t:
+        return "passive"
+    return "skill"
+
+
+def effect_deltas(effects: Iterable[Mapping[str, Any]], debuffed: bool, settings: Mapping[str, Any]) -> List[float]:
+    """applyParsedEffectsToComputedStats() as [atk factor, crit dmg, crit rate, def pen, dmg bonus] deltas."""
+    hp_pct = _num(settings, "context_hp_pct", 100)
+    stacks = max(0, js_round(_num(settings, "context_stacks", 0)))
+    debuff_count = max(0, js_round(_num(settings, "context_debuff_count", 0)))
+    ally_count = max(0, js_round(_num(settings, "context_ally_count", 4)))
+    atk_mul, crit_dmg, crit_rate, def_pen, dmg_bonus = 1.0, 0.0, 0.0, 0.0, 0.0
+    for e in effects or []:
+        if not isinstance(e, dict) or not e.get("type"):
+            continue
+        t, v = e["type"], _num(e, "value", 0)
+        if t == "atk_pct":
+            atk_mul *= (1 + v / 100)
+        elif t == "crit_dmg_bonus":
+            crit_dmg += v
+        elif t == "crit_rate_pct":
+            crit_rate += v
+        elif t == "ignore_def_pct":
+            def_pen += v
+        elif t == "bonus_if_debuffed":
+            if debuffed:
+                dmg_bonus += v
+        elif t == "bonus_if_hp_below":
+            if hp_pct <= _num(e, "threshold", 0):
+                dmg_bonus += v
+        elif t == "bonus_per_stack":
+            dmg_bonus += v * stacks
+        elif t == "bonus_per_debuff":
+            dmg_bonus += v * debuff_count
+        elif t == "bonus_if_ally_count_at_least":
+            if ally_count >= max(0, js_round(_num(e, "threshold", 0))):
+                dmg_bonus += v
+    return [atk_mul, crit_dmg, crit_rate, def_pen, dmg_bonus]
+
+
+def action_context(action: Optional[Mapping[str, Any]] = None, skill: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    actionCtxFromAction(): kind, multiplier (1.0 = 100%), hits, per-hit multipliers (or None) and
+    parsed effects of a rotation action, from its normalize_skill() record when it resolves to one,
+    else from the action's own kind/mult/hits.
+    """
+    action = action or {}
+    ctx: Dict[str, Any] = {
+        "id": action.get("label") or action.get("kind") or "skill",
+        "kind": action.get("kind") or "skill",
+        "mult": _num(action, "mult", 0),
+        "hits": max(1, js_round(_num(action, "hits", 1))),
+        "hit_mults": None,
+        "effects": [],
+        "skill": skill or None,
+    }
+    if skill:
+        ctx["id"] = skill.get("id") or ctx["id"]
+        m = _num(skill, "multiplier", math.nan)
+        if not math.isnan(m):
+            ctx["mult"] = m / 100
+        if skill.get("hit_multipliers_pct"):
+            ctx["hit_mults"] = [js_num(x, 0) / 100 for x in skill["hit_multipliers_pct"]]
+            ctx["hits"] = len(ctx["hit_mults"])
+        else:
+            ctx["hits"] = max(1, js_round(_num(skill, "hits", ctx["hits"])))
+        ctx["kind"] = skill_kind(skill.get("type"))
+        ctx["effects"] = skill.get("parsed_effects") if isinstance(skill.get("parsed_effects"), list) else []
+    return ctx
+
+
+@dataclass
+class SkillTable:
+    """
+    Skills as arrays. hit_mults holds the per-hit multipliers (1.0 = 100%), zero-padded; a skill
+    without per-hit values has its multiplier in column 0 and `repeat` = hits (actionDamage()).
+    """
+    ids: List[str]
+    records: List[Optional[Dict[str, Any]]]  # normalize_skill() output, None for an action without skill
+    kinds: np.ndarray  # int8 codes into KINDS
+    hit_mults: np.ndarray  # (skills, max hits)
+    n_hits: np.ndarray  # hits per action (countHitsFromCtx)
+    repeat: np.ndarray  # 1, or hits for multiplier x hits skills
+    effects: np.ndarray  # (skills, 2 = enemy debuffed no/yes, EFFECT_FIELDS)
+
+    @classmethod
+    def from_records(cls, skills: Sequence[Mapping[str, Any]], settings: Mapping[str, Any]) -> "SkillTable":
+        return cls.from_contexts([action_context(None, normalize_skill(sk)) for sk in skills], settings)
+
+    @classmethod
+    def from_contexts(cls, ctxs: Sequence[Mapping[str, Any]], settings: Mapping[str, Any]) -> "SkillTable":
+        """
+        One row per action_context(). An action kind outside KINDS (custom kind) deals damage
+        like "passive": no skill/ultimate bucket, only "all"-scoped buffs.
+        """
+        width = max([len(c["hit_mults"] or ()) for c in ctxs] + [1])
+        hit_mults = np.zeros((len(ctxs), width))
+        n_hits = np.ones(len(ctxs), dtype=np.int32)
+        repeat = np.ones(len(ctxs), dtype=np.int32)
+        kinds = np.zeros(len(ctxs), dtype=np.int8)
+        effects = np.zeros((len(ctxs), 2, len(EFFECT_FIELDS)))
+        for i, c in enumerate(ctxs):
+            kinds[i] = KIND_CODES.get(c["kind"], KIND_CODES["passive"])
+            if c["hit_mults"]:
+                hit_mults[i, :len(c["hit_mults"])] = c["hit_mults"]
+                n_hits[i] = len(c["hit_mults"])
+            else:
+                hit_mults[i, 0] = c["mult"]
+                n_hits[i] = repeat[i] = c["hits"]
+            effects[i, 0] = effect_deltas(c["effects"], False, settings)
+            effects[i, 1] = effect_deltas(c["effects"], True, settings)
+        return cls([str(c["id"]) for c in ctxs], [c["skill"] for c in ctxs], kinds, hit_mults, n_hits, repeat, effects)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def select_skills(skills: Iterable[Mapping[str, Any]], character_id: Optional[str] = None,
+                  weapon_type: Optional[str] = None) -> List[Mapping[str, Any]]:
+    """Skill records of one character / weapon type, in getSkillsForCharacter() order."""
+    skills = list(skills)
+    if character_id is not None:
+        skills = [s for s in skills if str(s.get("character_id")) == str(character_id)]
+        skills.sort(key=lambda s: (js_num(s.get("slot", _MISSING), 999), str(s.get("name") or ""), str(s.get("id") or "")))
+    if weapon_type:
+        skills = [s for s in skills if str(s.get("weapon_type")) == str(weapon_type)]
+    return skills
+
+
+def load_skills(db_path: Path = DB_JSON, character_id: Optional[str] = None,
+                weapon_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """modules.skills of a DB build, optionally for one character / weapon type (getSkillsForCharacter order)."""
+    dbx = json.loads(Path(db_path).read_text(encoding="utf-8"))
+    return select_skills(((dbx.get("modules") or {}).get("skills") or {}).values(), character_id, weapon_type)
+
+
+# ---------------------------------------------------------------------------
+# Engine
+
+@dataclass
+class RowTerms:
+    """
+    Per-row factors of actionDamage(): damage of one hit = unit * hit multiplier * crit factor,
+    crit factor = 1 + crit_dmg on a crit (probability crit_chance).
+    """
+    unit: np.ndarray
+    crit_chance: np.ndarray
+    crit_dmg: np.ndarray
+    hit_mults: np.ndarray  # (rows, max hits)
+    n_hits: np.ndarray
+    repeat: np.ndarray
+
+    def expected(self) -> np.ndarray:
+        crit_mul = (1 - self.crit_chance) * 1 + self.crit_chance * (1 + self.crit_dmg)
+        per_hit = (self.unit * crit_mul)[:, None] * self.hit_mults
+        return per_hit.sum(axis=1) * self.repeat
+
+
+class DamageEngine:
+    def __init__(self, settings: Mapping[str, Any]):
+        self.settings = dict(settings)
+
+    def _element_codes(self, builds: BuildTable, enemies: EnemyTable) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        names = sorted(set(builds.elements) | set(enemies.elements))
+        code = {n: i for i, n in enumerate(names)}
+        matrix = np.array([[element_multiplier(a, d, self.settings) for d in names] for a in names])
+        return (matrix, np.array([code[e] for e in builds.elements], dtype=np.int32),
+                np.array([code[e] for e in enemies.elements], dtype=np.int32))
+
+    def row_terms(self, builds: BuildTable, skills: SkillTable, enemies: EnemyTable,
+                  b_idx: np.ndarray, s_idx: np.ndarray, e_idx: np.ndarray, burst: Any = False) -> RowTerms:
+        """Gather and combine everything but the hit multipliers and crit rolls, for index arrays of rows."""
+        st = self.settings
+        b_idx, s_idx, e_idx = (np.asarray(x, dtype=np.intp) for x in (b_idx, s_idx, e_idx))
+        kind = skills.kinds[s_idx]
+        cs = builds.stats[b_idx, kind]  # (rows, STAT_FIELDS)
+        col = {f: cs[:, i] for i, f in enumerate(STAT_FIELDS)}
+        en = enemies.values[e_idx]
+        ecol = {f: en[:, i] for i, f in enumerate(ENEMY_FIELDS)}
+        fx = skills.effects[s_idx, enemies.debuffed[e_idx].astype(np.intp)]
+
+        atk = col["atk"] * fx[:, 0]
+        crit_dmg_pct = col["crit_dmg_pct"] + fx[:, 1]
+        crit_rate_pct = col["crit_rate_pct"] + fx[:, 2]
+        def_pen_pct = col["def_pen_pct"] + fx[:, 3]
+        dmg_bonus_pct = col["dmg_bonus_pct"] + fx[:, 4]
+
+        enemy_red = 1 - ecol["dmg_reduction_pct"] / 100
+        taken_mul = 1 + col["dmg_taken_pct"] / 100
+        dmg_bonus_pct = (dmg_bonus_pct + np.where(kind == KIND_CODES["skill"], col["skill_dmg_pct"], 0)
+                         + np.where(kind == KIND_CODES["ultimate"], col["ult_dmg_pct"], 0))
+        dmg_bonus_mul = 1 + dmg_bonus_pct / 100
+
+        matrix, b_el, e_el = self._element_codes(builds, enemies)
+        ele = matrix[b_el[b_idx], e_el[e_idx]]
+        stage = _or(st.get("element_stage"), "late")
+        ele_early = ele if stage == "early" else 1.0
+        ele_late = ele if stage == "late" else 1.0
+
+        def_coef = _setting(st, "hidden_defense_coefficient", 1)
+        eff_def = np.maximum(0, (ecol["def"] * def_coef) * (1 - def_pen_pct / 100))
+        k = _num(st, "mitigation_k", math.nan)
+        k = max(1.0, k) if not math.isnan(k) else k  # Math.max(1, undefined) is NaN
+        if st.get("mitigation_model") == "linear":
+            mit = 1 - _clamp(eff_def / k, 0, 0.80)
+        else:
+            mit = 1 - eff_def / (eff_def + k)
+
+        eff_res = _clamp(ecol["resistance_pct"] - col["res_pen_pct"], -100, _setting(st, "resist_cap", 200))
+        pierce = _clamp((col["pierce_pct"] - eff_res) / 100, -0.90, 3.00)
+
+        crit_res = _clamp(ecol["crit_resist_pct"], 0, 200)
+        crit_def = _clamp(ecol["crit_def_pct"], 0, 300)
+        crit_chance = _clamp(crit_rate_pct - crit_res + col["crit_resist_pen_pct"], 0, _setting(st, "crit_cap", 100)) / 100
+        crit_dmg = np.maximum(0, crit_dmg_pct - crit_def + col["crit_def_pen_pct"]) / 100
+
+        core = atk * ele_early
+        if _or(st.get("pierce_mode"), "multiplicative") == "additive":
+            after_mit = core * mit + core * pierce
+        else:
+            after_mit = core * mit * (1 + pierce)
+        unit = after_mit * dmg_bonus_mul * col["dmg_mul"] * taken_mul * enemy_red * ele_late
+        unit = unit * _setting(st, "hidden_global_multiplier", 1)
+
+        burst = np.broadcast_to(np.asarray(burst, dtype=bool), unit.shape)
+        if burst.any():
+            burst_mul = (1 + _or(st.get("burst_bonus_pct"), 0) / 100) * (1 - ecol["burst_resist"])
+            unit = np.where(burst, unit * burst_mul, unit)
+
+        return RowTerms(unit, crit_chance, crit_dmg, skills.hit_mults[s_idx], skills.n_hits[s_idx], skills.repeat[s_idx])
+
+    def expected(self, builds: BuildTable, skills: SkillTable, enemies: EnemyTable,
+                 b_idx: np.ndarray, s_idx: np.ndarray, e_idx: np.ndarray, burst: Any = False) -> np.ndarray:
+        """Expected damage of one use of skill s_idx by build b_idx on enemy e_idx, per row."""
+        return self.row_terms(builds, skills, enemies, b_idx, s_idx, e_idx, burst).expected()
+
+    def grid(self, builds: BuildTable, skills: SkillTable, enemies: EnemyTable, burst: bool = False) -> np.ndarray:
+        """Expected damage for every (build, skill, enemy): array of shape (builds, skills, enemies)."""
+        b, s, e = np.meshgrid(np.arange(len(builds)), np.arange(len(skills)), np.arange(len(enemies)), indexing="ij")
+        return self.expected(builds, skills, enemies, b.ravel(), s.ravel(), e.ravel(), burst).reshape(b.shape)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--profile", default=None, help="Formula profile of data/formula_profiles.js (default: site defaults).")
+    ap.add_argument("--db", type=Path, default=DB_JSON)
+    ap.add_argument("--burst", action="store_true", help="Apply the Burst bonus (burst_bonus_pct, enemy burst_resist).")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    defaults = load_site_defaults()
+    settings = profile_settings(args.profile, defaults=defaults)
+    skills = load_skills(args.db)
+    if not skills:
+        print(f"No skills in {args.db}.", file=sys.stderr)
+        return 1
+    engine = DamageEngine(settings)
+    t0 = time.perf_counter()
+    builds = BuildTable.from_builds(defaults.get("builds") or [], settings)
+    enemies = EnemyTable.from_scenarios(defaults.get("scenarios") or [], settings)
+    table = SkillTable.from_records(skills, settings)
+    t1 = time.perf_counter()
+    dmg = engine.grid(builds, table, enemies, burst=args.burst)
+    t2 = time.perf_counter()
+
+    print(f"profile: {settings.get('formula_profile') or '(site defaults)'}  mitigation: {settings.get('mitigation_model')} "
+          f"K={settings.get('mitigation_k')}  rows: {dmg.size}  tables {1000 * (t1 - t0):.1f} ms, damage {1000 * (t2 - t1):.2f} ms")
+    for bi, bid in enumerate(builds.ids):
+        for ei, eid in enumerate(enemies.ids):
+            print(f"\n{bid} vs {eid}")
+            for si in np.argsort(-dmg[bi, :, ei], kind="stable")[:args.top]:
+                r = table.records[si]
+                print(f"  {dmg[bi, si, ei]:12.1f}  {r['name']} ({r['type']}, {table.n_hits[si]} hit(s))  {r['id']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Structural DB diff
+
+Compares two DB builds module by module. Records are compared by content hash first
+(manifests, see tools/record_store.py): identical records are skipped without being loaded or
+walked, and only records whose hash differs are walked field by field.
+
+Output (same added/removed/changed shape as data/db_diff_latest.json, plus field-level paths):
+{
+  "added":   {module: [id, ...]},
+  "removed": {module: [id, ...]},
+  "changed": {module: [id, ...]},
+  "fields":  {module: {id: [{"path": "skills_by_weapon.Cudgel[0].hits[2].multiplier_pct",
+                             "old": 120, "new": 135}, ...]}}
+}
+A path whose "old" (or "new") key is absent was added (or removed) in the newer build.
+
+CLI (A and B are snapshot ids or paths to db.json files; default: the last two snapshots):
+  python tools/db_diff.py [A] [B] [--module skills] [--ids-only] [--out diff.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from record_store import Manifest, diff_manifests, manifest_of, module_records
+from snapshot_store import SnapshotStore
+
+MISSING = object()
+
+
+def _key_path(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def diff_values(old: Any, new: Any, path: str = "", out: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Field-level changes between two JSON values (dicts by key, lists by index)."""
+    out = [] if out is None else out
+    if old is new or (type(old) is type(new) and old == new):
+        return out
+    if isinstance(old, dict) and isinstance(new, dict):
+        for k, v in old.items():
+            diff_values(v, new.get(k, MISSING), _key_path(path, k), out)
+        for k, v in new.items():
+            if k not in old:
+                diff_values(MISSING, v, _key_path(path, k), out)
+        return out
+    if isinstance(old, list) and isinstance(new, list):
+        for i in range(max(len(old), len(new))):
+            diff_values(old[i] if i < len(old) else MISSING, new[i] if i < len(new) else MISSING, f"{path}[{i}]", out)
+        return out
+    change: Dict[str, Any] = {"path": path}
+    if old is not MISSING:
+        change["old"] = old
+    if new is not MISSING:
+        change["new"] = new
+    out.append(change)
+    return out
+
+
+def diff_records(old_records: Dict[str, Dict[str, Any]], new_records: Dict[str, Dict[str, Any]],
+                 old_manifest: Manifest, new_manifest: Manifest,
+                 modules: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Diff two builds given their manifests. `old_records` / `new_records` map module -> id -> record
+    (any mapping with __getitem__); only records listed as changed are looked up.
+    """
+    modules = list(modules) if modules is not None else list(dict.fromkeys([*old_manifest, *new_manifest]))
+    diff: Dict[str, Any] = diff_manifests(old_manifest, new_manifest, modules)
+    diff["fields"] = {}
+    for module in modules:
+        per_id = {}
+        for rid in diff["changed"][module]:
+            per_id[rid] = diff_values(old_records[module][rid], new_records[module][rid])
+        diff["fields"][module] = per_id
+    return diff
+
+
+def diff_dbs(old: Dict[str, Any], new: Dict[str, Any], modules: Optional[Iterable[str]] = None,
+             old_manifest: Optional[Manifest] = None, new_manifest: Optional[Manifest] = None) -> Dict[str, Any]:
+    """Diff two in-memory DBs (pass manifests when already computed, e.g. from data/db_manifest.json)."""
+    return diff_records(module_records(old) or {}, module_records(new) or {},
+                        old_manifest if old_manifest is not None else manifest_of(old),
+                        new_manifest if new_manifest is not None else manifest_of(new), modules)
+
+
+class _StoreRecords:
+    """module -> id -> record view of one snapshot manifest, resolved through the object store."""
+
+    def __init__(self, store: SnapshotStore, manifest: Manifest):
+        self.store = store
+        self.manifest = manifest
+
+    def __getitem__(self, module: str) -> "_StoreModule":
+        return _StoreModule(self.store, self.manifest[module])
+
+
+class _StoreModule:
+    def __init__(self, store: SnapshotStore, ids: Dict[str, str]):
+        self.store = store
+        self.ids = ids
+
+    def __getitem__(self, rid: str) -> Any:
+        return self.store.objects.get(self.ids[rid])
+
+
+def diff_snapshots(store: SnapshotStore, old_id: str, new_id: str, modules: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Diff two stored snapshots; only the records that changed are read from the object store."""
+    kinds = {sid: kind for sid, kind, _ in store._packs()}
+    if "raw" in (kinds.get(old_id), kinds.get(new_id)):
+        return diff_dbs(store.read(old_id), store.read(new_id), modules)
+    old_m, new_m = store.manifest(old_id), store.manifest(new_id)
+    return diff_records(_StoreRecords(store, old_m), _StoreRecords(store, new_m), old_m, new_m, modules)
+
+
+def _load_side(store: SnapshotStore, ref: str) -> Dict[str, Any]:
+    p = Path(ref)
+    if p.suffix == ".json" and p.exists():
+        return json.loads(p.read_text(encoding="utf-8"))
+    return store.read(ref)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("old", nargs="?", help="Snapshot id or db.json path (default: second-to-last snapshot).")
+    ap.add_argument("new", nargs="?", help="Snapshot id or db.json path (default: last snapshot).")
+    ap.add_argument("--dir", type=Path, default=Path(__file__).resolve().parents[1] / "data" / "db_snapshots")
+    ap.add_argument("--module", action="append", default=None, help="Restrict to a module (repeatable).")
+    ap.add_argument("--ids-only", action="store_true", help="Only added/removed/changed ids, no field paths.")
+    ap.add_argument("--out", type=Path, default=None, help="Write the diff as JSON instead of a text summary.")
+    args = ap.parse_args()
+
+    store = SnapshotStore(args.dir)
+    ids = store.ids()
+    old_ref = args.old or (ids[-2] if len(ids) >= 2 else None)
+    new_ref = args.new or (ids[-1] if ids else None)
+    if not old_ref or not new_ref:
+        print("Need two snapshots (or two db.json paths) to diff.", file=sys.stderr)
+        return 1
+
+    if old_ref in ids and new_ref in ids:
+        diff = diff_snapshots(store, old_ref, new_ref, args.module)
+    else:
+        diff = diff_dbs(_load_side(store, old_ref), _load_side(store, new_ref), args.module)
+    if args.ids_only:
+        diff.pop("fields", None)
+
+    if args.out:
+        args.out.write_text(json.dumps(diff, ensure_ascii=False, indent=2), encoding="utf-8")
+        return 0
+    print(f"{old_ref} -> {new_ref}")
+    for module in diff["added"]:
+        a, r, c = diff["added"][module], diff["removed"][module], diff["changed"][module]
+        if not (a or r or c):
+            continue
+        print(f"{module}: +{len(a)} -{len(r)} ~{len(c)}")
+        for rid in a:
+            print(f"  + {rid}")
+        for rid in r:
+            print(f"  - {rid}")
+        for rid in c:
+            print(f"  ~ {rid}")
+            for ch in (diff.get("fields") or {}).get(module, {}).get(rid, []):
+                print(f"      {ch['path']}: {json.dumps(ch.get('old'), ensure_ascii=False)} -> {json.dumps(ch.get('new'), ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Columnar snapshot history
+
+Every snapshot of data/db_snapshots/ flattened into one append-only change table, so "how did
+this skill's multiplier_pct / this weapon's equipment_attack move across patches" reads a few
+columns instead of rebuilding every snapshot:
+
+- rows          one per leaf value that appeared or changed (op 0) or disappeared (op 1) in a
+                snapshot, vs the previous snapshot: snapshot, module, id, field path (db_diff.py
+                syntax: "hits[2].multiplier_pct"), value. Unchanged records (same record hash)
+                are skipped without being flattened; a leaf is a scalar or an empty list / dict
+- segments      one gzip file per column (seg_<n>.<column>.gz); an append() adding rows writes
+                one segment, merged with the tail segment while that one has fewer than
+                SEGMENT_MIN_ROWS rows (the merge is a new seg_<n>, the old tail is deleted after
+                the commit); an append() adding no rows only records its snapshot ids
+                - snap u2, module u1, id u4, path u4, op u1 (codes into the dictionaries)
+                - num f8: the value when it is a number (NaN otherwise)
+                - json: the value as JSON text when it is not a number ("" otherwise)
+                - ids / paths: dictionary entries first used by this segment
+- tips          records of the last snapshot of a segment, to diff the next one against
+                (seg_<n>.tip.json.gz, named in that segment's entry of history.json); only the
+                last segment's tip is kept
+- history.json  the commit point, written last: snapshot ids, module names, and per segment its
+                row count, snapshot range, modules (scan() skips segments outside the query)
+                and tip. The one history.json replace commits the segment and its tip together:
+                a crash mid-append leaves stray segment / tip files that the next append
+                overwrites, and the committed tip still matches the committed rows
+
+History outlives snapshot pruning (SNAPSHOT_KEEP): rows are never rewritten. Numbers come back
+as float. Sources are the snapshot store (one manifest replay, records read from the object
+store only when their hash changed) plus legacy db_*.json files not migrated yet.
+
+Written by tools/update_db.py after each snapshot.
+
+CLI:
+  python tools/history_table.py append
+  python tools/history_table.py info
+  python tools/history_table.py series skills <id> "hits[0].multiplier_pct"
+  python tools/history_table.py scan --module weapons --path equipment_attack [--id ID] [--since db_2026...]
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from artifacts import gzip_bytes
+from db_diff import _key_path
+from json_stream import write_json
+from record_store import Manifest, manifest_of, module_records
+from snapshot_store import SnapshotStore, _ChainState
+
+ROOT = Path(__file__).resolve().parents[1]
+SNAP_DIR = ROOT / "data" / "db_snapshots"
+HISTORY_DIR = ROOT / "data" / "db_history"
+HISTORY_FORMAT = 1
+LEGACY_TIP = "tip.json.gz"  # single tip of histories written before per-segment tips
+SEGMENT_MIN_ROWS = 20000  # a tail segment below this is rewritten with the next append's rows
+
+OP_SET = 0
+OP_REMOVED = 1
+COLUMNS: Dict[str, Any] = {"snap": np.uint16, "module": np.uint8, "id": np.uint32, "path": np.uint32, "op": np.uint8,
+                           "num": np.float64}
+TEXT_COLUMNS = ("json", "ids", "paths")
+SCAN_COLUMNS = ("snapshot", "module", "id", "path", "op", "value")
+
+RecordGetter = Callable[[str, str, str], Any]  # (module, id, hash) -> record
+
+
+def flatten(value: Any, path: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Leaf path -> value (scalars and empty containers)."""
+    out = {} if out is None else out
+    if isinstance(value, dict) and value:
+        for k, v in value.items():
+            flatten(v, _key_path(path, str(k)), out)
+    elif isinstance(value, list) and value:
+        for i, v in enumerate(value):
+            flatten(v, f"{path}[{i}]", out)
+    else:
+        out[path] = value
+    return out
+
+
+def _same(a: Any, b: Any) -> bool:
+    return type(a) is type(b) and a == b
+
+
+def _is_num(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+
+
+def path_matcher(pattern: str) -> Callable[[str], bool]:
+    """Exact path, or * as a wildcard ("hits[*].multiplier_pct", "skills_by_weapon.*")."""
+    if "*" not in pattern:
+        return pattern.__eq__
+    rx = re.compile(".*".join(re.escape(p) for p in pattern.split("*")) + r"\Z")
+    return lambda p: rx.match(p) is not None
+
+
+def snapshot_sources(store: SnapshotStore, after: Optional[str] = None) -> Iterator[Tuple[str, Manifest, RecordGetter]]:
+    """(snapshot id, manifest, record getter) of every snapshot newer than `after`, oldest first."""
+    packs = store._packs()
+    legacy = [(p.name[:-len(".json")], p) for p in store.legacy_files()]
+    new_idx = [i for i, (sid, _, _) in enumerate(packs) if after is None or sid > after]
+    chain: Dict[str, Tuple[Manifest, RecordGetter]] = {}
+    if new_idx:
+        # replay manifests only, from the last base at or before the first new snapshot
+        start = max((i for i, (_, kind, _) in enumerate(packs[:new_idx[0] + 1]) if kind == "base"), default=0)
+        state = _ChainState()
+        for i, (sid, kind, p) in enumerate(packs[start:], start):
+            if kind == "raw":
+                continue
+            state.apply(store._load(p))
+            if i >= new_idx[0]:
+                chain[sid] = ({m: dict(ids) for m, ids in state.manifest.items()}, lambda m, rid, h: store.objects.get(h))
+    sids = sorted({packs[i][0] for i in new_idx} | {sid for sid, _ in legacy if after is None or sid > after})
+    legacy_paths = dict(legacy)
+    raw = {sid for sid, kind, _ in packs if kind == "raw"}
+    for sid in sids:
+        if sid in chain:
+            yield (sid, *chain[sid])
+            continue
+        doc = json.loads(legacy_paths[sid].read_text(encoding="utf-8")) if sid in legacy_paths and sid not in raw else store.read(sid)
+        mods = module_records(doc) or {}
+        yield sid, manifest_of(doc), (lambda m, rid, h, mods=mods: mods[m][rid])
+
+
+class HistoryTable:
+    def __init__(self, root: Path = HISTORY_DIR):
+        self.root = Path(root)
+        path = self.root / "history.json"
+        self.meta: Dict[str, Any] = (json.loads(path.read_text(encoding="utf-8")) if path.exists()
+                                     else {"format": HISTORY_FORMAT, "snapshots": [], "modules": [], "segments": []})
+        if self.meta.get("format") != HISTORY_FORMAT:
+            raise ValueError(f"history format {self.meta.get('format')!r}, expected {HISTORY_FORMAT}")
+        self.bytes_read = 0
+        self._dicts: Dict[str, List[str]] = {}
+        self._cols: Dict[Tuple[str, str], Any] = {}
+
+    @property
+    def snapshots(self) -> List[str]:
+        return self.meta["snapshots"]
+
+    def __len__(self) -> int:
+        return sum(s["rows"] for s in self.meta["segments"])
+
+    # --- reading
+
+    def _read(self, seg: str, col: str) -> bytes:
+        raw = (self.root / f"{seg}.{col}.gz").read_bytes()
+        self.bytes_read += len(raw)
+        return gzip.decompress(raw)
+
+    def _column(self, seg: Dict[str, Any], col: str) -> Any:
+        """One column of one segment, decoded once per table (segments are immutable)."""
+        key = (seg["name"], col)
+        if key not in self._cols:
+            data = self._read(seg["name"], col)
+            if col in COLUMNS:
+                self._cols[key] = np.frombuffer(data, dtype=np.dtype(COLUMNS[col]).newbyteorder("<"))
+            else:
+                self._cols[key] = data.decode("utf-8").split("\n") if data else []
+        return self._cols[key]
+
+    def dictionary(self, name: str) -> List[str]:
+        """ids / paths dictionary (entries of every segment, in code order)."""
+        if name not in self._dicts:
+            self._dicts[name] = [json.loads(x) for seg in self.meta["segments"] for x in self._column(seg, name)]
+        return self._dicts[name]
+
+    def scan(self, columns: Sequence[str] = SCAN_COLUMNS, module: Optional[str] = None, ids: Optional[Sequence[str]] = None,
+             path: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, List[Any]]:
+        """
+        Rows matching the filters, in append order, as {column: values}. Only the filter columns and
+        the requested ones are read, and only for segments whose snapshot range / modules can match.
+        value is None on removal rows (op 1).
+        """
+        snaps = self.snapshots
+        lo = next((i for i, s in enumerate(snaps) if since is None or s >= since), len(snaps))
+        hi = max((i for i, s in enumerate(snaps) if until is None or s <= until), default=-1)
+        mod_code = self.meta["modules"].index(module) if module in self.meta["modules"] else None
+        out: Dict[str, List[Any]] = {c: [] for c in columns}
+        if module is not None and mod_code is None:
+            return out
+        id_codes = None
+        if ids is not None:
+            wanted = set(ids)
+            id_codes = np.array([i for i, x in enumerate(self.dictionary("ids")) if x in wanted], dtype=np.uint32)
+            if not len(id_codes):
+                return out
+        path_codes = None
+        if path is not None:
+            match = path_matcher(path)
+            path_codes = np.array([i for i, p in enumerate(self.dictionary("paths")) if match(p)], dtype=np.uint32)
+            if not len(path_codes):
+                return out
+        for seg in self.meta["segments"]:
+            if seg["last"] < lo or seg["first"] > hi or (mod_code is not None and mod_code not in seg["modules"]):
+                continue
+            def col(name: str, seg: Dict[str, Any] = seg) -> Any:
+                return self._column(seg, name)
+
+            mask = np.ones(seg["rows"], dtype=bool)
+            if seg["first"] < lo or seg["last"] > hi:
+                mask &= (col("snap") >= lo) & (col("snap") <= hi)
+            if mod_code is not None:
+                mask &= col("module") == mod_code
+            if id_codes is not None and mask.any():
+                mask &= np.isin(col("id"), id_codes)
+            if path_codes is not None and mask.any():
+                mask &= np.isin(col("path"), path_codes)
+            rows = np.nonzero(mask)[0]
+            if not len(rows):
+                continue
+            for c in columns:
+                if c == "snapshot":
+                    out[c] += [snaps[i] for i in col("snap")[rows]]
+                elif c == "module":
+                    out[c] += [self.meta["modules"][i] for i in col("module")[rows]]
+                elif c in ("id", "path"):
+                    d = self.dictionary(c + "s")
+                    out[c] += [d[i] for i in col(c)[rows]]
+                elif c == "op":
+                    out[c] += col("op")[rows].tolist()
+                elif c == "value":
+                    num, op = col("num")[rows], col("op")[rows]
+                    text = col("json") if (np.isnan(num) & (op == OP_SET)).any() else None
+                    out[c] += [None if o == OP_REMOVED else (float(n) if not math.isnan(n) else json.loads(text[r]))
+                               for r, n, o in zip(rows.tolist(), num.tolist(), op.tolist())]
+                else:
+                    raise KeyError(f"unknown column: {c}")
+        return out
+
+    def series(self, module: str, rid: str, path: str, since: Optional[str] = None,
+               until: Optional[str] = None) -> List[Tuple[str, Any]]:
+        """[(snapshot id, value)] each time the field was set or changed (value None: removed)."""
+        rows = self.scan(("snapshot", "value"), module, [rid], path, since, until)
+        return list(zip(rows["snapshot"], rows["value"]))
+
+    # --- writing
+
+    def _tip(self) -> Dict[str, Any]:
+        """Tip of the last committed segment (empty before the first append)."""
+        if not self.meta["segments"]:
+            return {"manifest": {}, "records": {}}
+        p = self.root / self.meta["segments"][-1].get("tip", LEGACY_TIP)
+        return json.loads(gzip.decompress(p.read_bytes()).decode("utf-8"))
+
+    def append(self, store: SnapshotStore) -> int:
+        """Append every snapshot of `store` newer than the last one appended, as one segment. Returns rows added."""
+        last = self.snapshots[-1] if self.snapshots else None
+        tip = self._tip()
+        prev_manifest: Manifest = tip["manifest"]
+        prev_records: Dict[str, Dict[str, Any]] = tip["records"]
+        ids = {x: i for i, x in enumerate(self.dictionary("ids"))}
+        paths = {x: i for i, x in enumerate(self.dictionary("paths"))}
+        n_ids, n_paths = len(ids), len(paths)
+        modules = list(self.meta["modules"])
+        snaps = list(self.snapshots)
+        cols: Dict[str, List[Any]] = {c: [] for c in ("snap", "module", "id", "path", "op", "num", "json")}
+
+        def emit(snap: int, mod: int, rid: int, p: str, op: int, v: Any = None) -> None:
+            cols["snap"].append(snap)
+            cols["module"].append(mod)
+            cols["id"].append(rid)
+            cols["path"].append(paths.setdefault(p, len(paths)))
+            cols["op"].append(op)
+            num = op == OP_SET and _is_num(v)
+            cols["num"].append(float(v) if num else math.nan)
+            cols["json"].append("" if num or op == OP_REMOVED else json.dumps(v, ensure_ascii=False))
+
+        first = len(snaps)
+        for sid, manifest, get in snapshot_sources(store, last):
+            snap = len(snaps)
+            snaps.append(sid)
+            for module in dict.fromkeys([*prev_manifest, *manifest]):
+                if module not in modules:
+                    modules.append(module)
+                mod = modules.index(module)
+                old_m, new_m = prev_manifest.get(module) or {}, manifest.get(module) or {}
+                old_r = prev_records.setdefault(module, {})
+                for rid in dict.fromkeys([*old_m, *new_m]):
+                    h = new_m.get(rid)
+                    if h == old_m.get(rid):
+                        continue
+                    code = ids.setdefault(rid, len(ids))
+                    old = flatten(old_r[rid]) if rid in old_r else {}
+                    if h is None:
+                        for p in old:
+                            emit(snap, mod, code, p, OP_REMOVED)
+                        old_r.pop(rid, None)
+                        continue
+                    rec = get(module, rid, h)
+                    new = flatten(rec)
+                    for p, v in new.items():
+                        if p not in old or not _same(old[p], v):
+                            emit(snap, mod, code, p, OP_SET, v)
+                    for p in old:
+                        if p not in new:
+                            emit(snap, mod, code, p, OP_REMOVED)
+                    old_r[rid] = rec
+            prev_manifest = manifest
+        if len(snaps) == first:
+            return 0
+        rows = len(cols["snap"])
+        if not rows:
+            # nothing changed: the tip's records still hold, only the snapshot ids are new
+            self.meta["snapshots"], self.meta["modules"] = snaps, modules
+            self.root.mkdir(parents=True, exist_ok=True)
+            write_json(self.root / "history.json", self.meta, indent=2)
+            return 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        segments = self.meta["segments"]
+        texts = {"json": cols["json"], "ids": [json.dumps(x, ensure_ascii=False) for x in list(ids)[n_ids:]],
+                 "paths": [json.dumps(x, ensure_ascii=False) for x in list(paths)[n_paths:]]}
+        arrays = {c: np.asarray(cols[c], dtype=np.dtype(dtype).newbyteorder("<")) for c, dtype in COLUMNS.items()}
+        merged = segments[-1] if segments and segments[-1]["rows"] < SEGMENT_MIN_ROWS else None
+        if merged is not None:
+            # the tail is the last segment, so its dictionary entries come right before the new ones
+            arrays = {c: np.concatenate([self._column(merged, c), a]) for c, a in arrays.items()}
+            old_json = self._column(merged, "json")
+            if len(old_json) < merged["rows"]:  # a single "" row reads back as no row
+                old_json = [""] * merged["rows"]
+            texts = {"json": list(old_json) + texts["json"], "ids": self._column(merged, "ids") + texts["ids"],
+                     "paths": self._column(merged, "paths") + texts["paths"]}
+            first = merged["first"]
+        seg = f"seg_{int(segments[-1]['name'][4:]) + 1 if segments else 1:05d}"
+        sizes = {}
+        for c in COLUMNS:
+            data = gzip_bytes(arrays[c].tobytes())
+            (self.root / f"{seg}.{c}.gz").write_bytes(data)
+            sizes[c] = len(data)
+        for c in TEXT_COLUMNS:
+            data = gzip_bytes("\n".join(texts[c]).encode("utf-8"))
+            (self.root / f"{seg}.{c}.gz").write_bytes(data)
+            sizes[c] = len(data)
+        tip = f"{seg}.tip.json.gz"
+        write_json(self.root / tip, {"snapshot": snaps[-1], "manifest": prev_manifest, "records": prev_records},
+                   separators=(",", ":"), compress=True)
+        old_tip = segments[-1].get("tip", LEGACY_TIP) if segments else None
+        if merged is not None:
+            segments.pop()
+        segments.append({"name": seg, "rows": len(arrays["snap"]), "first": first, "last": len(snaps) - 1,
+                         "modules": sorted(set(arrays["module"].tolist())), "bytes": sizes, "tip": tip})
+        self.meta["snapshots"], self.meta["modules"] = snaps, modules
+        write_json(self.root / "history.json", self.meta, indent=2)
+        stale = [old_tip] if old_tip else []
+        if merged is not None:
+            stale += [f"{merged['name']}.{c}.gz" for c in (*COLUMNS, *TEXT_COLUMNS)]
+        for name in stale:
+            (self.root / name).unlink(missing_ok=True)
+        self._dicts, self._cols = {}, {}
+        return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", type=Path, default=HISTORY_DIR)
+    ap.add_argument("--snapshots", type=Path, default=SNAP_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("append")
+    sub.add_parser("info")
+    sp = sub.add_parser("series")
+    sp.add_argument("module")
+    sp.add_argument("id")
+    sp.add_argument("path")
+    sc = sub.add_parser("scan")
+    sc.add_argument("--module", default=None)
+    sc.add_argument("--id", action="append", default=None)
+    sc.add_argument("--path", default=None, help="Field path, * as wildcard.")
+    sc.add_argument("--since", default=None)
+    sc.add_argument("--until", default=None)
+    sc.add_argument("--limit", type=int, default=50)
+    args = ap.parse_args()
+
+    table = HistoryTable(args.dir)
+    t0 = time.perf_counter()
+    if args.cmd == "append":
+        rows = table.append(SnapshotStore(args.snapshots))
+        print(f"+{rows} rows, {len(table.snapshots)} snapshots, {len(table)} rows in {len(table.meta['segments'])} segments "
+              f"({1000 * (time.perf_counter() - t0):.0f} ms)")
+    elif args.cmd == "info":
+        total = sum(sum(s["bytes"].values()) for s in table.meta["segments"])
+        print(f"{len(table.snapshots)} snapshots ({table.snapshots[0] if table.snapshots else '-'} .. "
+              f"{table.snapshots[-1] if table.snapshots else '-'}), {len(table)} rows, {len(table.meta['segments'])} segments, "
+              f"{total // 1024} KB")
+        for s in table.meta["segments"]:
+            print(f"  {s['name']}  {s['rows']:8} rows  {table.snapshots[s['first']]} .. {table.snapshots[s['last']]}  "
+                  + "  ".join(f"{c} {n // 1024}K" for c, n in s["bytes"].items()))
+    elif args.cmd == "series":
+        points = table.series(args.module, args.id, args.path)
+        for sid, v in points:
+            print(f"  {sid}  {'(removed)' if v is None else json.dumps(v, ensure_ascii=False)}")
+        print(f"{len(points)} changes, {table.bytes_read / 1024:.0f} KB read ({1000 * (time.perf_counter() - t0):.1f} ms)")
+    else:
+        rows = table.scan(SCAN_COLUMNS, args.module, args.id, args.path, args.since, args.until)
+        n = len(rows["snapshot"])
+        for i in range(min(n, args.limit)):
+            v = "(removed)" if rows["op"][i] == OP_REMOVED else json.dumps(rows["value"][i], ensure_ascii=False)
+            print(f"  {rows['snapshot'][i]}  {rows['module'][i]:10} {rows['id'][i]:18} {rows['path'][i]:40} {v[:60]}")
+        print(f"{n} rows, {table.bytes_read / 1024:.0f} KB read ({1000 * (time.perf_counter() - t0):.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — JS value semantics
+
+Number coercions of the site (src/core/utils.js), shared by the tools that read scraped DB values.
+Standard library only, so light consumers (tools/sqlite_export.py) do not pull in NumPy or the
+damage engine:
+
+- js_num(v, d)          toNum(): Number(v) when finite, else d (null -> 0, missing -> d)
+- js_round(x)           Math.round(): halves round up
+- substat_value(v)      a weapon's substat_value as scraped ("6.3%", "21", 4.4), 0 when not a number
+"""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+_MISSING = object()
+
+
+def js_num(v: Any, d: float = 0.0) -> float:
+    """toNum() of src/core/utils.js: Number(v) when finite, else d (null -> 0, missing -> d)."""
+    if v is _MISSING:
+        return d
+    if v is None or v is False:
+        return 0.0
+    if v is True:
+        return 1.0
+    if isinstance(v, str):
+        s = v.strip()
+        if not s:
+            return 0.0
+        try:
+            n = float(s)
+        except ValueError:
+            return d
+    elif isinstance(v, (int, float)):
+        n = float(v)
+    else:
+        return d
+    return n if math.isfinite(n) else d
+
+
+def js_round(x: float) -> int:
+    """Math.round(): halves round up (Python's round() rounds them to even)."""
+    return math.floor(x + 0.5)
+
+
+def substat_value(v: Any) -> float:
+    """substat_value as scraped ("6.3%", "21", 4.4); 0 when not a number."""
+    if isinstance(v, str):
+        v = v.strip().rstrip("%").strip()
+    n = js_num(v, math.nan)
+    return n if math.isfinite(n) else 0.0
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Streaming JSON writer
+
+iter_json() serializes a DB container by container down to STREAM_DEPTH (top level -> modules ->
+module -> record) and dumps each record on its own, so a write never holds more than one record's
+text in memory. Output is byte-identical to json.dumps(obj, ensure_ascii=False, indent=...,
+separators=...), which keeps db.json diffs and snapshot sha1s unchanged.
+
+atomic_write() writes through a temp file in the target directory and swaps it in with
+os.replace() only once the whole document is written: a crash mid-write leaves the previous
+file intact, never a truncated db.json / db_live.js.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple, Union
+
+STREAM_DEPTH = 3
+CHUNK_CHARS = 1 << 16
+
+
+def _key(k: Any) -> str:
+    if isinstance(k, str):
+        return k
+    return json.dumps(k)  # same coercion as json.dumps for int/float/bool/None keys
+
+
+def iter_json(obj: Any, indent: Optional[int] = None, separators: Optional[Tuple[str, str]] = None,
+              depth: int = STREAM_DEPTH, _level: int = 0) -> Iterator[str]:
+    if separators is None:
+        separators = (",", ": ") if indent is not None else (", ", ": ")
+    if _level >= depth or not isinstance(obj, (dict, list)) or not obj:
+        text = json.dumps(obj, ensure_ascii=False, indent=indent, separators=separators)
+        if indent is not None and _level:
+            text = text.replace("\n", "\n" + " " * (indent * _level))
+        yield text
+        return
+
+    item_sep, key_sep = separators
+    if indent is not None:
+        inner, close = "\n" + " " * (indent * (_level + 1)), "\n" + " " * (indent * _level)
+    else:
+        inner = close = ""
+    is_dict = isinstance(obj, dict)
+    yield "{" if is_dict else "["
+    for i, item in enumerate(obj.items() if is_dict else obj):
+        yield inner if i == 0 else item_sep + inner
+        if is_dict:
+            k, item = item
+            yield json.dumps(_key(k), ensure_ascii=False) + key_sep
+        yield from iter_json(item, indent, separators, depth, _level + 1)
+    yield close + ("}" if is_dict else "]")
+
+
+class _HashingWriter:
+    """Text (or bytes) sink that buffers chunks, hashes the utf-8 bytes and forwards them to a binary stream."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha1 = hashlib.sha1()
+        self.size = 0
+        self._buf = []
+        self._buf_len = 0
+
+    def write(self, s: Union[str, bytes]) -> int:
+        if isinstance(s, bytes):
+            self.flush()
+            self.sha1.update(s)
+            self.size += len(s)
+            self.raw.write(s)
+            return len(s)
+        self._buf.append(s)
+        self._buf_len += len(s)
+        if self._buf_len >= CHUNK_CHARS:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buf:
+            data = "".join(self._buf).encode("utf-8")
+            self.sha1.update(data)
+            self.size += len(data)
+            self.raw.write(data)
+            self._buf, self._buf_len = [], 0
+
+
+@contextmanager
+def atomic_write(path: Path, compress: bool = False):
+    """
+    Text (or bytes) writer on a temp file next to `path`, moved over `path` when the block exits
+    cleanly (gzip -9, mtime 0 when `compress`). The writer exposes .sha1 / .size of the uncompressed bytes.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600; published files must stay world-readable
+        with os.fdopen(fd, "wb") as f:
+            raw = gzip.GzipFile(fileobj=f, mode="wb", compresslevel=9, mtime=0) if compress else f
+            out = _HashingWriter(raw)
+            yield out
+            out.flush()
+            if compress:
+                raw.close()
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path: Path, obj: Any, indent: Optional[int] = None, separators: Optional[Tuple[str, str]] = None,
+               prefix: str = "", suffix: str = "", compress: bool = False) -> str:
+    """Stream `prefix + JSON + suffix` to `path` atomically. Returns the sha1 hex of the written text."""
+    with atomic_write(path, compress) as out:
+        out.write(prefix)
+        for chunk in iter_json(obj, indent, separators):
+            out.write(chunk)
+        out.write(suffix)
+    return out.sha1.hexdigest()
+
+
+def json_sha1(obj: Any, indent: Optional[int] = None, separators: Optional[Tuple[str, str]] = None,
+              prefix: str = "", suffix: str = "") -> str:
+    """sha1 of what write_json() would write, without materializing the document."""
+    h = hashlib.sha1(prefix.encode("utf-8"))
+    for chunk in iter_json(obj, indent, separators):
+        h.update(chunk.encode("utf-8"))
+    h.update(suffix.encode("utf-8"))
+    return h.hexdigest()
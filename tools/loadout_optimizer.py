@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Weapon loadout optimizer
+
+Best weapons of modules.weapons per character (and rotation), scored with tools/damage_engine.py:
+
+- index         WeaponCatalog: the catalogue as arrays (equipment ATK, damage substat, value) plus
+                weapon_type -> weapon indices, built once
+- pruning       within a weapon type, weapon j dominates weapon i when it has at least i's
+                equipment ATK and the same substat at a value at least as high, or when i's
+                substat adds no damage (healing, accuracy...) and j has at least its ATK. Expected
+                damage never decreases with ATK, ATK%, crit rate or crit damage, so a weapon never
+                scores above the ones dominating it: for a top-K search, a weapon is dropped only
+                when K others dominate it (K-skyband, cached per K in the catalogue)
+- scoring       loadout = build + weapon (equipment_attack added to ATK, substat to its stat),
+                as BuildTable.from_stat_deltas() rows: every candidate of a character / weapon
+                type in one batch, expected DPS of the rotation (sweep_engine.cast_plan(), one
+                schedule per character / weapon type) against the scenario enemy
+- top-K         per character, across its weapon_types
+
+The rotation is kit_rotation() of the character's skills for each weapon type (characters
+without skills in the DB are skipped), or one rotation of the site defaults for everybody.
+The build's stats are taken as the character without weapon.
+
+CLI:
+  python tools/loadout_optimizer.py [--character NAME|ID] [--profile cbt_v1] [--top 3] [--rotation ID] [--scenario ID]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+import damage_engine as de
+import sweep_engine as sw
+from js_values import substat_value
+
+# substat_name (lowercase) -> build stat; other substats (healing, accuracy...) add no damage
+SUBSTAT_STATS = {"crit damage": "crit_dmg_pct", "crit rate": "crit_rate_pct", "attack increase": "atk_pct"}
+SUBSTAT_FIELDS = ("crit_dmg_pct", "crit_rate_pct", "atk_pct")
+NO_SUBSTAT = -1
+DEFAULT_TOP = 3
+
+
+def loadout_build(build: Mapping[str, Any], weapon: Mapping[str, Any]) -> Dict[str, Any]:
+    """The build with the weapon equipped (what from_stat_deltas() scores), for export / checks."""
+    b = copy.deepcopy(dict(build))
+    stats = b["stats"] = dict(b.get("stats") or {})
+    stats["atk"] = de._num(stats, "atk", 0) + de._num(weapon, "equipment_attack", 0)
+    stat = SUBSTAT_STATS.get(str(weapon.get("substat_name") or "").strip().lower())
+    if stat == "atk_pct":
+        b["buffs"] = list(b.get("buffs") or []) + [{"id": "weapon_substat", "stat": "atk_pct", "type": "add", "scope": "all",
+                                                      "value": substat_value(weapon.get("substat_value")), "enabled": True}]
+    elif stat:
+        stats[stat] = de._num(stats, stat, 0) + substat_value(weapon.get("substat_value"))
+    b["weapon_type"] = weapon.get("weapon_type")
+    b["source"] = {**(b.get("source") or {}), "weapon_id": weapon.get("id")}
+    return b
+
+
+@dataclass
+class WeaponCatalog:
+    ids: List[str]
+    names: List[str]
+    weapon_types: List[str]
+    atk: np.ndarray  # equipment_attack
+    substat: np.ndarray  # int8 index into SUBSTAT_FIELDS, NO_SUBSTAT when it adds no damage
+    value: np.ndarray  # substat value (pct points)
+    by_type: Dict[str, np.ndarray]  # weapon_type -> weapon indices
+    fronts: Dict[int, Dict[str, np.ndarray]] = field(default_factory=dict)  # K -> weapon_type -> K-skyband
+
+    @classmethod
+    def from_weapons(cls, weapons: Sequence[Mapping[str, Any]]) -> "WeaponCatalog":
+        codes = {f: i for i, f in enumerate(SUBSTAT_FIELDS)}
+        ids = [str(w.get("id")) for w in weapons]
+        wts = [str(w.get("weapon_type") or "") for w in weapons]
+        atk = np.array([de._num(w, "equipment_attack", 0) for w in weapons])
+        sub = np.array([codes.get(SUBSTAT_STATS.get(str(w.get("substat_name") or "").strip().lower()), NO_SUBSTAT)
+                        for w in weapons], dtype=np.int8)
+        value = np.array([substat_value(w.get("substat_value")) for w in weapons])
+        value[sub == NO_SUBSTAT] = 0.0
+        order = np.argsort(np.array(wts, dtype=object), kind="stable")
+        names, starts = np.unique(np.array(wts, dtype=object)[order], return_index=True)
+        by_type = {str(n): g for n, g in zip(names, np.split(order, starts[1:]))} if len(order) else {}
+        return cls(ids, [str(w.get("name") or w.get("id")) for w in weapons], wts, atk, sub, value, by_type)
+
+    def front(self, k: int = 1) -> Dict[str, np.ndarray]:
+        """weapon_type -> weapons dominated by fewer than k others (k=1: the Pareto front)."""
+        k = max(1, int(k))
+        if k not in self.fronts:
+            self.fronts[k] = {wt: pareto_front(self.atk, self.substat, self.value, idx, k) for wt, idx in self.by_type.items()}
+        return self.fronts[k]
+
+    def candidates(self, weapon_type: str, prune: bool = True, top: int = 1) -> np.ndarray:
+        """Weapons of the type that can rank in a top-`top` search (all of them without pruning)."""
+        return (self.front(top) if prune else self.by_type).get(weapon_type, np.zeros(0, dtype=np.intp))
+
+    def deltas(self, idx: np.ndarray) -> Dict[str, np.ndarray]:
+        """BuildTable.from_stat_deltas() input of weapons idx."""
+        out = {"atk": self.atk[idx]}
+        for code, f in enumerate(SUBSTAT_FIELDS):
+            out[f] = np.where(self.substat[idx] == code, self.value[idx], 0.0)
+        return out
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def pareto_front(atk: np.ndarray, substat: np.ndarray, value: np.ndarray, idx: np.ndarray, k: int = 1) -> np.ndarray:
+    """
+    Weapons among idx (sorted indices) dominated by fewer than k others. Per substat, by ATK desc,
+    value desc, index asc, the weapons dominating one are exactly those before it with a value at
+    least as high: it is kept when its value beats the k-th highest value before it (exact
+    duplicates: the first k kept). A no-damage weapon is dominated by every damaging weapon with at
+    least its ATK and by the no-damage ones before it.
+    """
+    k = max(1, int(k))
+    keep = []
+    dmg_atk = np.sort(atk[idx[substat[idx] != NO_SUBSTAT]])
+    for code in np.unique(substat[idx]):
+        g = idx[substat[idx] == code]
+        g = g[np.lexsort((g, -value[g], -atk[g]))]
+        if code == NO_SUBSTAT:
+            above = len(dmg_atk) - np.searchsorted(dmg_atk, atk[g], side="left")
+            keep.append(g[above + np.arange(len(g)) < k])
+            continue
+        best: List[float] = []  # min-heap of the k highest values so far
+        mask = np.zeros(len(g), dtype=bool)
+        for j, v in enumerate(value[g].tolist()):
+            if len(best) < k:
+                mask[j] = True
+                heapq.heappush(best, v)
+            elif v > best[0]:
+                mask[j] = True
+                heapq.heapreplace(best, v)
+        keep.append(g[mask])
+    return np.sort(np.concatenate(keep)) if keep else np.zeros(0, dtype=np.intp)
+
+
+def optimize_loadouts(dbx: Mapping[str, Any], build: Mapping[str, Any], enemy: Mapping[str, Any],
+                      settings: Mapping[str, Any], top: int = DEFAULT_TOP, rotation: Optional[Mapping[str, Any]] = None,
+                      duration: float = sw.DEFAULT_DURATION, catalog: Optional[WeaponCatalog] = None,
+                      character_ids: Optional[Sequence[str]] = None, prune: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    """{character id: top loadouts, best first}; a loadout is {weapon_id, weapon, weapon_type, dps, ...}."""
+    mods = dbx.get("modules") or {}
+    catalog = catalog if catalog is not None else WeaponCatalog.from_weapons(list((mods.get("weapons") or {}).values()))
+    skills = list((mods.get("skills") or {}).values())
+    engine = de.DamageEngine(settings)
+    enemies = de.EnemyTable.from_enemies([enemy], settings)
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    skipped = []
+    for cid, ch in (mods.get("characters") or {}).items():
+        if character_ids is not None and cid not in character_ids:
+            continue
+        parts = []
+        for wt in dict.fromkeys(str(t) for t in ch.get("weapon_types") or []):
+            idx = catalog.candidates(wt, prune, top)
+            if not len(idx):
+                continue
+            kit = [de.normalize_skill(sk) for sk in de.select_skills(skills, cid, wt)]
+            rot = rotation if rotation is not None else sw.kit_rotation(kit, cid, wt)
+            plan = sw.cast_plan(rot, settings, duration, kit)
+            if not len(plan.table):
+                continue
+            builds = de.BuildTable.from_stat_deltas({**build, "character_id": cid, "weapon_type": wt}, catalog.deltas(idx), settings)
+            parts.append((idx, plan.dps(engine, builds, enemies)[:, 0]))
+        if not parts:
+            skipped.append(str(ch.get("name") or cid))
+            continue
+        idx = np.concatenate([p[0] for p in parts])
+        dps = np.concatenate([p[1] for p in parts])
+        best = np.argsort(-dps, kind="stable")[:max(1, top)]
+        out[cid] = [{
+            "weapon_id": catalog.ids[i],
+            "weapon": catalog.names[i],
+            "weapon_type": catalog.weapon_types[i],
+            "dps": float(dps[j]),
+            "equipment_attack": float(catalog.atk[i]),
+            "substat": SUBSTAT_FIELDS[catalog.substat[i]] if catalog.substat[i] != NO_SUBSTAT else None,
+            "substat_value": float(catalog.value[i]),
+        } for j, i in ((int(j), int(idx[j])) for j in best)]
+    if skipped:
+        print(f"[WARN] loadouts: no candidate weapon or damaging skill for {len(skipped)} character(s): {', '.join(skipped)}",
+              file=sys.stderr)
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=de.DB_JSON)
+    ap.add_argument("--character", default=None, help="Character id or name (default: every character).")
+    ap.add_argument("--profile", default=None, help="Formula profile of data/formula_profiles.js (default: site defaults).")
+    ap.add_argument("--build", default=None, help="Build id/name of the site defaults, stats without weapon (default: first).")
+    ap.add_argument("--rotation", default=None, help="Rotation id/name of the site defaults (default: kit rotation per character).")
+    ap.add_argument("--scenario", default=None, help="Scenario id/name of the site defaults (default: first).")
+    ap.add_argument("--duration", type=float, default=sw.DEFAULT_DURATION)
+    ap.add_argument("--top", type=int, default=DEFAULT_TOP)
+    ap.add_argument("--no-prune", action="store_true", help="Score every weapon of the weapon types (no K-dominance pruning).")
+    args = ap.parse_args()
+
+    defaults = de.load_site_defaults()
+    settings = de.profile_settings(args.profile, defaults=defaults)
+    build = sw._find(defaults["builds"], args.build, "build")
+    enemy = sw._find(defaults["scenarios"], args.scenario, "scenario").get("enemy") or {}
+    rotation = sw._find(defaults["rotations"], args.rotation, "rotation") if args.rotation else None
+    dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    chars = (dbx.get("modules") or {}).get("characters") or {}
+    ids = None
+    if args.character:
+        ids = [sw._find(list(chars.values()), args.character, "character")["id"]]
+
+    t0 = time.perf_counter()
+    catalog = WeaponCatalog.from_weapons(list(((dbx.get("modules") or {}).get("weapons") or {}).values()))
+    t1 = time.perf_counter()
+    result = optimize_loadouts(dbx, build, enemy, settings, args.top, rotation, max(1.0, args.duration), catalog, ids,
+                               prune=not args.no_prune)
+    t2 = time.perf_counter()
+    kept = sum(len(v) for v in catalog.front(args.top).values())
+    print(f"{len(catalog)} weapons, {len(catalog.by_type)} weapon types, {kept} after pruning ({1000 * (t1 - t0):.1f} ms); "
+          f"{len(result)} characters scored in {1000 * (t2 - t1):.1f} ms")
+    for cid, loadouts in result.items():
+        print(chars[cid].get("name") or cid)
+        for rank, lo in enumerate(loadouts, 1):
+            sub = f"{lo['substat']} +{lo['substat_value']:g}" if lo["substat"] else "—"
+            print(f"  {rank}. {lo['weapon'][:34]:34} {lo['weapon_type']:12} ATK+{lo['equipment_attack']:<5g} {sub:22} {lo['dps']:10.1f} DPS")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
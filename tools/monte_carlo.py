@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Batched Monte-Carlo crit simulation (NumPy)
+
+Python counterpart of the Monte-Carlo mode of the site (runSimulation(), mode "mc"): one run is
+an ordered list of actions (build, skill, enemy rows of tools/damage_engine.py), i.e. a list of
+M hits; every hit crits on its own. N runs are drawn as a batch (N x M crit rolls) and reduced to
+the site's statistics: mean, std, min/max, P05/P10/P50/P90/P95 and the hist_bins histogram.
+
+RNG (rng=...):
+- "js"     the site's stream, bit for bit: run i is seeded like runSimulation() does
+           ((floor(base()*1e9) ^ (i*2654435761)) >>> 0 with base = makeRng(mc_seed || 12345)), and
+           its hits draw makeRng(seed)() in order. All runs of a chunk step their LCG state together
+           (one uint64 vector op per hit column), and a roll crits when the 32-bit state is below
+           ceil(crit_chance * 2^32), which is exactly `rng() < critChance`.
+- "pcg64"  numpy.random.PCG64(mc_seed): one (chunk x M) uniform matrix per chunk compared with the
+           per-hit crit chances at once; same distribution, different draws.
+
+Runs are processed CHUNK_RUNS at a time, so memory stays O(chunk x M) whatever the run count
+(10^7 runs included): a first pass collects count / mean / variance / min / max and a fine
+histogram over the theoretical damage range, a second pass replays the same draws to build the
+hist_bins histogram (on the observed min/max, like renderHistogram()) and to gather the runs whose
+rank is needed by the percentiles, which are then exact (quantile() of src/core/utils.js).
+
+Agreement with the site for the same seed and inputs (tools/bench/bench_montecarlo.py --js):
+same crit pattern run by run; totals, mean, std and percentiles within relative 1e-9 (the JS sums
+hit by hit, std is computed in one sorted pass here it is merged chunk by chunk); histogram counts
+equal except for a run lying on a bin edge within that tolerance.
+
+CLI (kit of one character, each skill once per run):
+  python tools/monte_carlo.py [--character NAME|ID] [--runs 1000000] [--profile cbt_v1] [--rng js|pcg64]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+import damage_engine as de
+
+LCG_A = 1664525
+LCG_C = 1013904223
+SEED_MIX = 2654435761
+MASK32 = 0xFFFFFFFF
+TWO32 = 4294967296.0
+
+CHUNK_RUNS = 1 << 18
+FINE_BINS = 1 << 16
+PERCENTILES = (("p05", 0.05), ("p10", 0.10), ("p50", 0.50), ("p90", 0.90), ("p95", 0.95))
+RNG_KINDS = ("js", "pcg64")
+
+
+# ---------------------------------------------------------------------------
+# makeRng() of src/app.js, vectorized
+
+def to_uint32(x: float) -> int:
+    """ToUint32 (x >>> 0)."""
+    if not math.isfinite(x):
+        return 0
+    return int(math.trunc(x)) % (1 << 32)
+
+
+@lru_cache(maxsize=4)
+def _lcg_jump(n: int):
+    """(A_k, C_k) for k = 1..n: state after k steps = A_k * s + C_k (mod 2^32)."""
+    a = np.full(n, LCG_A, dtype=np.uint64)
+    a[0] = 1
+    powers = np.cumprod(a)  # a^0 .. a^(n-1), wrapping mod 2^64 keeps the low 32 bits right
+    c = np.cumsum(powers * np.uint64(LCG_C))
+    return (powers * np.uint64(LCG_A)) & np.uint64(MASK32), c & np.uint64(MASK32)
+
+
+def run_seeds(mc_seed: Any, start: int, count: int, state: Optional[int] = None) -> np.ndarray:
+    """
+    Seeds of runs start..start+count-1 as runSimulation() derives them. `state` is the base
+    generator state before run `start` (defaults to stepping from makeRng(mc_seed || 12345)).
+    """
+    if state is None:
+        state = base_state(mc_seed, start)
+    mul, add = _lcg_jump(count)
+    states = (mul * np.uint64(state) + add) & np.uint64(MASK32)
+    draws = np.floor((states.astype(np.float64) / TWO32) * 1e9).astype(np.uint64)
+    mix = (np.arange(start, start + count, dtype=np.float64) * float(SEED_MIX)).astype(np.uint64) & np.uint64(MASK32)
+    return draws ^ mix
+
+
+def base_state(mc_seed: Any, runs_before: int = 0) -> int:
+    s = to_uint32(de.js_num(mc_seed, 0) or 12345) or 1
+    if runs_before:
+        mul, add = _lcg_jump(runs_before)
+        s = int((mul[-1] * np.uint64(s) + add[-1]) & np.uint64(MASK32))
+    return s
+
+
+# ---------------------------------------------------------------------------
+# Hit plans
+
+@dataclass
+class HitPlan:
+    """The M hits of one run, in cast order: damage without / with a crit and crit chance."""
+    base: np.ndarray
+    crit: np.ndarray
+    crit_chance: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @property
+    def thresholds(self) -> np.ndarray:
+        """rng() < chance  <=>  32-bit state < ceil(chance * 2^32)."""
+        return np.ceil(np.clip(self.crit_chance, 0, 1) * TWO32).astype(np.uint64)
+
+    def bounds(self):
+        """Smallest / largest total a run can reach."""
+        sure = self.crit_chance >= 1
+        never = self.crit_chance <= 0
+        lo = np.where(sure, self.crit, np.where(never, self.base, np.minimum(self.base, self.crit)))
+        hi = np.where(sure, self.crit, np.where(never, self.base, np.maximum(self.base, self.crit)))
+        return float(lo.sum()), float(hi.sum())
+
+    def expected(self) -> float:
+        cc = self.crit_chance
+        return float((self.base * (1 - cc) + self.crit * cc).sum())
+
+
+def hit_plan(terms: de.RowTerms) -> HitPlan:
+    """Flatten RowTerms rows (one action each, in order) into their hits, as actionDamage() rolls them."""
+    base, crit, chance = [], [], []
+    for r in range(len(terms.unit)):
+        if terms.repeat[r] > 1:
+            mults = np.full(int(terms.repeat[r]), terms.hit_mults[r, 0])
+        else:
+            mults = terms.hit_mults[r, :int(terms.n_hits[r])]
+        hit = terms.unit[r] * mults
+        base.append(hit)
+        crit.append(hit * (1 + terms.crit_dmg[r]))
+        chance.append(np.full(len(mults), terms.crit_chance[r]))
+    cat = (lambda xs: np.concatenate(xs) if xs else np.zeros(0))
+    return HitPlan(cat(base), cat(crit), cat(chance))
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+
+def iter_totals(plan: HitPlan, runs: int, seed: Any = 12345, rng: str = "js", chunk: int = CHUNK_RUNS,
+                scale: float = 1.0) -> Iterator[np.ndarray]:
+    """Totals of runs 0..runs-1 (times `scale`, e.g. 1/duration for DPS), `chunk` runs at a time."""
+    if rng not in RNG_KINDS:
+        raise ValueError(f"unknown rng: {rng} (expected one of {', '.join(RNG_KINDS)})")
+    thresholds, chance = plan.thresholds, plan.crit_chance
+    gen = np.random.Generator(np.random.PCG64(to_uint32(de.js_num(seed, 0) or 12345))) if rng == "pcg64" else None
+    state = base_state(seed)
+    a, c, mask = np.uint64(LCG_A), np.uint64(LCG_C), np.uint64(MASK32)
+    for start in range(0, runs, chunk):
+        n = min(chunk, runs - start)
+        if gen is not None:
+            total = np.where(gen.random((n, len(plan))) < chance, plan.crit, plan.base).sum(axis=1)
+        else:
+            s = run_seeds(seed, start, n, state)
+            mul, add = _lcg_jump(n)
+            state = int((mul[-1] * np.uint64(state) + add[-1]) & mask)
+            s[s == 0] = 1  # makeRng(seed): (seed >>> 0) || 1
+            total = np.zeros(n)
+            for k in range(len(plan)):
+                s = (s * a + c) & mask
+                total += np.where(s < thresholds[k], plan.crit[k], plan.base[k])
+        yield total * scale if scale != 1.0 else total
+
+
+def js_quantile(sorted_values: Sequence[float], q: float) -> float:
+    """quantile() of src/core/utils.js."""
+    if not len(sorted_values):
+        return math.nan
+    pos = (len(sorted_values) - 1) * q
+    base = math.floor(pos)
+    rest = pos - base
+    if base + 1 >= len(sorted_values):
+        return float(sorted_values[base])
+    return float(sorted_values[base] + rest * (sorted_values[base + 1] - sorted_values[base]))
+
+
+def js_histogram(samples: np.ndarray, lo: float, hi: float, bins: Any, counts: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Bin counts of renderHistogram() (None where the site draws no histogram), accumulated into `counts`."""
+    b = int(min(max(de.js_num(bins, 0) or 24, 5), 60))
+    if hi <= lo + 1e-9:
+        return None
+    idx = np.clip(np.floor((samples - lo) / (hi - lo) * b), 0, b - 1).astype(np.intp)
+    add = np.bincount(idx, minlength=b)
+    return add if counts is None else counts + add
+
+
+class _Moments:
+    """Count, mean, M2 (Chan et al. parallel merge), min, max."""
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = math.inf, -math.inf
+
+    def add(self, x: np.ndarray) -> None:
+        n = len(x)
+        if not n:
+            return
+        mean = float(x.mean())
+        m2 = float(((x - mean) ** 2).sum())
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+def _summary(m: _Moments, pct: Dict[str, float], hist: Optional[np.ndarray], runs: int, hits: int) -> Dict[str, Any]:
+    return {
+        "runs": runs, "hits": hits, "mean": m.mean, "std": m.std, "min": m.min, "max": m.max, **pct,
+        "hist": None if hist is None else {"min": m.min, "max": m.max, "counts": hist.tolist()},
+    }
+
+
+def simulate(plan: HitPlan, runs: int, seed: Any = 12345, hist_bins: Any = 24, rng: str = "js",
+             chunk: int = CHUNK_RUNS, scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Monte-Carlo statistics of `runs` runs of `plan` (see the module docstring). At most one chunk of
+    totals is held at a time; a run count up to `chunk` is summarized directly from the sorted totals.
+    """
+    runs = max(1, int(runs))
+    m = _Moments()
+    if runs <= chunk:
+        totals = next(iter_totals(plan, runs, seed, rng, chunk, scale))
+        m.add(totals)
+        ordered = np.sort(totals)
+        pct = {name: js_quantile(ordered, q) for name, q in PERCENTILES}
+        return _summary(m, pct, js_histogram(totals, m.min, m.max, hist_bins) if runs > 1 else None, runs, len(plan))
+
+    # pass 1: moments + fine histogram over the reachable range
+    lo, hi = (v * scale for v in plan.bounds())
+    lo, hi = min(lo, hi), max(lo, hi)
+    width = (hi - lo) / FINE_BINS
+    fine = np.zeros(FINE_BINS, dtype=np.int64)
+
+    def fine_index(x: np.ndarray) -> np.ndarray:
+        if width <= 0:
+            return np.zeros(len(x), dtype=np.intp)
+        return np.clip(((x - lo) / width).astype(np.intp), 0, FINE_BINS - 1)
+
+    for totals in iter_totals(plan, runs, seed, rng, chunk, scale):
+        m.add(totals)
+        fine += np.bincount(fine_index(totals), minlength=FINE_BINS)
+
+    # ranks each percentile reads (sorted[base], sorted[base + 1]) and the fine bins holding them
+    cum = np.cumsum(fine)
+    ranks = sorted({r for _, q in PERCENTILES for r in (math.floor((runs - 1) * q), math.floor((runs - 1) * q) + 1)
+                    if r < runs})
+    wanted = {int(np.searchsorted(cum, r, side="right")) for r in ranks}
+
+    # pass 2: site histogram on the observed range + values of the wanted fine bins
+    hist = None
+    values: Dict[int, Dict[float, int]] = {b: {} for b in wanted}
+    wanted_arr = np.array(sorted(wanted), dtype=np.intp)
+    for totals in iter_totals(plan, runs, seed, rng, chunk, scale):
+        hist = js_histogram(totals, m.min, m.max, hist_bins, hist)
+        idx = fine_index(totals)
+        sel = np.isin(idx, wanted_arr)
+        for b in np.unique(idx[sel]):
+            vals, counts = np.unique(totals[sel][idx[sel] == b], return_counts=True)
+            acc = values[int(b)]
+            for v, c in zip(vals.tolist(), counts.tolist()):
+                acc[v] = acc.get(v, 0) + c
+
+    def order_stat(r: int) -> float:
+        b = int(np.searchsorted(cum, r, side="right"))
+        k = r - (int(cum[b - 1]) if b else 0)
+        for v in sorted(values[b]):
+            k -= values[b][v]
+            if k < 0:
+                return v
+        raise AssertionError("rank outside its fine bin")
+
+    stats = {r: order_stat(r) for r in ranks}
+    pct = {}
+    for name, q in PERCENTILES:
+        pos = (runs - 1) * q
+        base = math.floor(pos)
+        pct[name] = stats[base] if base + 1 >= runs else stats[base] + (pos - base) * (stats[base + 1] - stats[base])
+    return _summary(m, pct, hist, runs, len(plan))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+
+def _find(items: Sequence[Mapping[str, Any]], key: Optional[str]) -> Optional[Mapping[str, Any]]:
+    if key is None:
+        return items[0] if items else None
+    return next((x for x in items if key in (str(x.get("id")), str(x.get("name")))), None)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--profile", default=None, help="Formula profile of data/formula_profiles.js (default: site defaults).")
+    ap.add_argument("--db", type=Path, default=de.DB_JSON)
+    ap.add_argument("--character", default=None, help="Character id or name (default: first character of the DB).")
+    ap.add_argument("--weapon-type", default=None)
+    ap.add_argument("--build", default=None, help="Build id of the site defaults (default: first).")
+    ap.add_argument("--scenario", default=None, help="Scenario id of the site defaults (default: first).")
+    ap.add_argument("--runs", type=int, default=100000)
+    ap.add_argument("--seed", type=int, default=None, help="Default: mc_seed of the settings.")
+    ap.add_argument("--rng", choices=RNG_KINDS, default="js")
+    ap.add_argument("--burst", action="store_true", help="Every action under Burst.")
+    ap.add_argument("--chunk", type=int, default=CHUNK_RUNS)
+    args = ap.parse_args()
+
+    defaults = de.load_site_defaults()
+    settings = de.profile_settings(args.profile, defaults=defaults)
+    characters = list(((json.loads(Path(args.db).read_text(encoding="utf-8")).get("modules") or {}).get("characters") or {}).values())
+    ch = _find(characters, args.character)
+    build = _find(defaults.get("builds") or [], args.build)
+    scen = _find(defaults.get("scenarios") or [], args.scenario)
+    if ch is None or build is None or scen is None:
+        print("Unknown character / build / scenario.", file=sys.stderr)
+        return 1
+    skills = de.load_skills(args.db, ch["id"], args.weapon_type)
+    if not skills:
+        print(f"No skills for {ch.get('name')}.", file=sys.stderr)
+        return 1
+
+    engine = de.DamageEngine(settings)
+    bt = de.BuildTable.from_builds([build], settings)
+    st = de.SkillTable.from_records(skills, settings)
+    et = de.EnemyTable.from_scenarios([scen], settings)
+    n = len(st)
+    plan = hit_plan(engine.row_terms(bt, st, et, np.zeros(n, dtype=np.intp), np.arange(n), np.zeros(n, dtype=np.intp), args.burst))
+    seed = args.seed if args.seed is not None else settings.get("mc_seed")
+    t0 = time.perf_counter()
+    res = simulate(plan, args.runs, seed, settings.get("hist_bins"), args.rng, args.chunk)
+    dt = time.perf_counter() - t0
+
+    print(f"{ch.get('name')} ({len(skills)} skills, {res['hits']} hits/run) · {build.get('id')} vs {scen.get('id')} · "
+          f"{res['runs']} runs, rng {args.rng}, seed {seed} · {dt:.2f} s ({dt * 1e9 / (res['runs'] * max(1, res['hits'])):.1f} ns/hit)")
+    print(f"expected {plan.expected():.1f}  mean {res['mean']:.1f}  std {res['std']:.1f}  min {res['min']:.1f}  max {res['max']:.1f}")
+    print("  ".join(f"{name.upper()} {res[name]:.1f}" for name, _ in PERCENTILES))
+    if res["hist"]:
+        counts = res["hist"]["counts"]
+        top = max(counts)
+        for i, c in enumerate(counts):
+            print(f"  {i:3} {'#' * round(40 * c / top):40} {c}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
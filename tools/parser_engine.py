@@ -10,9 +10,21 @@ Design goals:
 """
 from __future__ import annotations
 
+import os
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Bump on any change to the parsing rules: cached results (update_db ParseMemo) are keyed on it.
+PARSER_VERSION = "1"
+
+# parse_many(): unique texts below POOL_MIN_TEXTS are parsed in-process (a pool costs more to
+# start than it saves); larger batches are split into POOL_CHUNK-sized chunks over the pool.
+POOL_MIN_TEXTS = 2000
+POOL_CHUNK = 500
 
 
 def _to_float(x: str) -> Optional[float]:
@@ -26,12 +38,87 @@ def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
-@dataclass
+# Effect types and the Python type of their value. An effect is stored as its index in this table
+# (a one-byte code) plus a float value: codes are persisted nowhere, but only append to keep them stable.
+EFFECT_TYPES: Tuple[Tuple[str, type], ...] = (
+    ("dmg_bonus_pct", float),
+    ("bonus_if_debuffed", float),
+    ("cond_if_debuffed", bool),
+    ("ignore_def_pct", float),
+    ("res_pen_pct", float),
+    ("true_damage", bool),
+    ("crit_dmg_bonus_pct", float),
+    ("crit_rate_bonus_pct", float),
+    ("enemy_crit_resist_down_pct", float),
+    ("cond_hp_below_pct", float),
+    ("per_stack_bonus_pct", float),
+    ("max_stacks", int),
+    ("atk_pct", float),
+    ("def_pct", float),
+    ("hp_pct", float),
+    ("crit_rate_pct", float),
+    ("crit_dmg_pct", float),
+)
+EFFECT_CODES: Dict[str, int] = {name: code for code, (name, _) in enumerate(EFFECT_TYPES)}
+
+
+class EffectList:
+    """
+    Parsed effects as two parallel arrays (type codes, values) instead of one dict per effect.
+    Most descriptions have none: the arrays are only allocated on the first add().
+    Adding an effect already present with the same value is a no-op (the former dedupe).
+    to_list() gives the {"type", "value"} dicts written to JSON.
+    """
+    __slots__ = ("codes", "values")
+
+    def __init__(self):
+        self.codes = self.values = ()
+
+    def add(self, name: str, value: Any) -> None:
+        code, value = EFFECT_CODES[name], float(value)
+        if not self.codes:
+            self.codes, self.values = array("B"), array("d")
+        for c, v in zip(self.codes, self.values):
+            if c == code and v == value:
+                return
+        self.codes.append(code)
+        self.values.append(value)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self):
+        for code, value in zip(self.codes, self.values):
+            name, kind = EFFECT_TYPES[code]
+            yield name, kind(value)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Value of the first effect of this type, or None."""
+        code = EFFECT_CODES[name]
+        for c, v in zip(self.codes, self.values):
+            if c == code:
+                return EFFECT_TYPES[code][1](v)
+        return None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [{"type": name, "value": value} for name, value in self]
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, EffectList) and list(self.codes) == list(other.codes) and list(self.values) == list(other.values)
+
+    def __getstate__(self):
+        return self.codes, self.values
+
+    def __setstate__(self, state) -> None:
+        self.codes, self.values = state
+
+
+@dataclass(slots=True)
 class ParseResult:
     multiplier_pct: Optional[float] = None
     hits: Optional[int] = None
     scaling: Optional[str] = None  # "ATK" / "HP" / "MIXED" / None
-    parsed_effects: List[Dict[str, Any]] = None
+    parsed_effects: EffectList = field(default_factory=EffectList)
     confidence_score: float = 0.0
     description_raw: str = ""
 
@@ -40,12 +127,226 @@ class ParseResult:
             "parsed_multiplier_pct": self.multiplier_pct,
             "parsed_hits": self.hits,
             "parsed_scaling": self.scaling,
-            "parsed_effects": self.parsed_effects or [],
+            "parsed_effects": self.parsed_effects.to_list(),
+            "confidence_score": self.confidence_score,
+            "description_raw": self.description_raw,
+        }
+
+    def to_potential_dict(self) -> Dict[str, Any]:
+        return {
+            "parsed_effects": self.parsed_effects.to_list(),
             "confidence_score": self.confidence_score,
             "description_raw": self.description_raw,
         }
 
 
+# ---------------------------------------------------------------------------
+# Single-pass scanner
+#
+# Every rule of SkillParser / PotentialParser is a token of one combined regex, walked once per
+# description with finditer; each match is dispatched to a token builder that records what the
+# rules need (percents with their unit, words, conditions, positions and line numbers). The
+# effect builders then apply the historical rule semantics on those records (first match per
+# rule, "if ... debuff" and "per stack ... N%" on the same line, dedupe), so results are
+# identical to the former one-regex-per-rule implementation (tools/bench/bench_parser.py checks it).
+#
+# Backtracking is bounded: no token contains .* — the former line-spanning rules are resolved
+# from token positions — and every quantifier is a whitespace run before a fixed word.
+# Units after a percent are a lookahead (never consumed), so "5% HP is below 30%" still sees both.
+
+_NUM = r"[0-9]+(?:\.[0-9]+)?"
+
+
+def _pct(name: str) -> str:
+    return rf"(?P<{name}>{_NUM})%(?:(?=\s*(?:of\s*)?(?P<{name}_unit>ATK|Attack|HP)\b)|)"
+
+
+# (token, pattern) — order only matters between tokens that can start at the same offset
+_TOKEN_RULES: List[Tuple[str, str]] = [
+    ("inc", r"increases?\s+(?:(?P<inc_dmg>damage(?:\s+dealt)?)|(?P<inc_cdmg>crit(?:ical)?\s+damage)"
+            r"|(?P<inc_crate>crit(?:ical)?\s+(?:rate|chance))|(?P<inc_stat>ATK|DEF|HP))\s+by\s+" + _pct("inc_n")),
+    ("ign", r"(?P<ign_verb>ignore|penetrate)s?\s+(?:" + _pct("ign_n") + r"\s*(?P<ign_tail>DEF\b|resistance\b|res\b)"
+            r"|(?P<ign_defense>defense\b))"),
+    ("red", r"reduces?\s+enemy\s+crit(?:ical)?\s+resist(?:ance)?\s+by\s+" + _pct("red_n")),
+    ("hpb", r"HP\s+is\s+below\s+" + _pct("hpb_n")),
+    ("true", r"\btrue damage\b"),
+    ("stack", r"per\s+stack\b"),
+    ("maxst", r"max(?:imum)?\s+(?P<maxst_n>[0-9]+)\s+stacks\b"),
+    ("num", _pct("num_n")),
+    ("hits", r"(?P<hits_n>\d+)\s*(?:hits|hit|times)\b"),
+    ("if", r"\bif\b"),
+    ("debuff", r"\bdebuff(?:ed)?\b"),
+    ("word", r"\b(?P<word>HP|ATK|Attack)\b"),
+]
+
+# Cheap gates in front of the alternation: the first character, then the first two characters any
+# token can start with. They let the engine reject almost every offset without trying the
+# alternatives, and stay outside the case-insensitive group so they compile to plain char classes
+# (hence the explicit \u0130/\u0131, which re.I folds onto "i").
+_TOKEN_GATE = (r"(?=[iI\u0130\u0131pPrRhHtTmMdDaA]|\d)"
+               r"(?=[iI\u0130\u0131][nNgGfF]|[pP][eE]|[rR][eE]|[hH][pP]|[tT][rR]|[mM][aA]|[dD][eE]|[aA][tT]|\d)")
+_SCANNER = re.compile(_TOKEN_GATE + "(?i:" + "|".join(f"(?P<t_{name}>{pat})" for name, pat in _TOKEN_RULES) + ")")
+
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _is_word_char(text: str, i: int) -> bool:
+    return i >= 0 and _WORD_CHAR.match(text, i) is not None
+
+
+class _Scan:
+    """Everything the rules need from one description, collected in a single pass."""
+    __slots__ = ("pcts", "inc", "ign_def", "ign_defense", "res_pen", "enemy_crit_res", "hp_below",
+                 "true_damage", "stacks", "max_stacks", "hits", "ifs", "debuffs", "hp_word", "atk_word")
+
+    def __init__(self):
+        self.pcts: List[Tuple[int, int, float, bool, Optional[str]]] = []  # (start, line, value, %\b, unit)
+        self.inc: List[Tuple[str, int, int, float, bool]] = []  # (kind, end, end line, value, %\b)
+        self.ign_def: List[Tuple[float, bool]] = []
+        self.ign_defense = False
+        self.res_pen: List[Tuple[float, bool]] = []
+        self.enemy_crit_res: List[Tuple[float, bool]] = []
+        self.hp_below: List[Tuple[float, bool]] = []
+        self.true_damage = False
+        self.stacks: List[Tuple[int, int]] = []  # (end, line) of "per stack"
+        self.max_stacks: Optional[int] = None
+        self.hits: Optional[int] = None
+        self.ifs: List[Tuple[int, int]] = []  # (start, line)
+        self.debuffs: List[Tuple[int, int]] = []
+        self.hp_word = False
+        self.atk_word = False
+
+
+def _line_at(text: str, m: "re.Match", line: int, pos: int) -> int:
+    """Line of `pos` inside a match starting on `line` (\\s+ may span newlines)."""
+    return line + text.count("\n", m.start(), pos)
+
+
+def _record_pct(scan: _Scan, text: str, m: "re.Match", name: str, line: int) -> Tuple[float, bool]:
+    line = _line_at(text, m, line, m.start(name))
+    value = float(m.group(name))
+    valid = _is_word_char(text, m.end(name) + 1)  # "%\b": a word char right after the %
+    unit = m.group(name + "_unit")
+    scan.pcts.append((m.start(name), line, value, valid, unit.upper() if unit else None))
+    return value, valid
+
+
+def _tok_inc(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    value, valid = _record_pct(scan, text, m, "inc_n", line)
+    if m.group("inc_dmg"):
+        kind = "dmg"
+    elif m.group("inc_cdmg"):
+        kind = "crit_dmg"
+    elif m.group("inc_crate"):
+        kind = "crit_rate"
+    else:
+        kind = m.group("inc_stat").upper()
+        if kind == "HP":
+            scan.hp_word = True
+        elif kind == "ATK":
+            scan.atk_word = True
+    end = m.end("inc_n") + 1
+    scan.inc.append((kind, end, _line_at(text, m, line, end), value, valid))
+
+
+def _tok_ign(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    is_ignore = m.group("ign_verb").lower() == "ignore"
+    if m.group("ign_defense"):
+        if is_ignore and not _is_word_char(text, m.start() - 1):
+            scan.ign_defense = True
+        return
+    value, valid = _record_pct(scan, text, m, "ign_n", line)
+    if m.group("ign_tail").upper() == "DEF":
+        if is_ignore:
+            scan.ign_def.append((value, True))
+    else:
+        scan.res_pen.append((value, True))
+
+
+def _tok_red(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    scan.enemy_crit_res.append(_record_pct(scan, text, m, "red_n", line))
+
+
+def _tok_hpb(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    if not _is_word_char(text, m.start() - 1):
+        scan.hp_word = True
+    scan.hp_below.append(_record_pct(scan, text, m, "hpb_n", line))
+
+
+def _tok_true(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    scan.true_damage = True
+
+
+def _tok_stack(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    scan.stacks.append((m.end(), _line_at(text, m, line, m.end())))
+
+
+def _tok_maxst(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    if scan.max_stacks is None:
+        scan.max_stacks = int(m.group("maxst_n"))
+
+
+def _tok_num(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    _record_pct(scan, text, m, "num_n", line)
+
+
+def _tok_hits(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    if scan.hits is None:
+        scan.hits = int(m.group("hits_n"))
+
+
+def _tok_if(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    scan.ifs.append((m.start(), line))
+
+
+def _tok_debuff(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    scan.debuffs.append((m.start(), line))
+
+
+def _tok_word(scan: _Scan, text: str, m: "re.Match", line: int) -> None:
+    if m.group("word").upper() == "HP":
+        scan.hp_word = True
+    else:
+        scan.atk_word = True
+
+
+_TOKEN_BUILDERS = {
+    f"t_{name}": fn for name, fn in (
+        ("inc", _tok_inc), ("ign", _tok_ign), ("red", _tok_red), ("hpb", _tok_hpb), ("true", _tok_true),
+        ("stack", _tok_stack), ("maxst", _tok_maxst), ("num", _tok_num), ("hits", _tok_hits),
+        ("if", _tok_if), ("debuff", _tok_debuff), ("word", _tok_word),
+    )
+}
+
+
+def scan_text(text: str) -> _Scan:
+    scan = _Scan()
+    line, last = 0, 0
+    for m in _SCANNER.finditer(text):
+        start = m.start()
+        line += text.count("\n", last, start)
+        last = start
+        _TOKEN_BUILDERS[m.lastgroup](scan, text, m, line)
+    return scan
+
+
+def _first_valid(items: List[Tuple[float, bool]]) -> Optional[float]:
+    return next((v for v, valid in items if valid), None)
+
+
+def _first_inc(scan: _Scan, kind: str) -> Optional[float]:
+    return next((v for k, _, _, v, valid in scan.inc if k == kind and valid), None)
+
+
+def _if_debuff_same_line(scan: _Scan) -> bool:
+    """\\bif\\b.*\\b(debuffed|debuff)\\b: an "if" followed by a debuff word on the same line."""
+    first_if: Dict[int, int] = {}
+    for start, line in scan.ifs:
+        first_if.setdefault(line, start)
+    return any(line in first_if and first_if[line] < start for start, line in scan.debuffs)
+
+
 class SkillParser:
     """
     Extracts:
@@ -54,141 +355,114 @@ class SkillParser:
     - scaling (ATK/HP)
     - parsed effects
     """
-    _MULT_PATTERNS = [
-        re.compile(r"([0-9]+(?:\.[0-9]+)?)%\s*(?:of\s*)?(ATK|Attack)\b", re.I),
-        re.compile(r"([0-9]+(?:\.[0-9]+)?)%\s*(?:of\s*)?HP\b", re.I),
-        re.compile(r"damage\s+equal\s+to\s*([0-9]+(?:\.[0-9]+)?)%\s*(?:of\s*)?(ATK|Attack|HP)\b", re.I),
-    ]
-    _HITS_PATTERNS = [
-        re.compile(r"(\d+)\s*(?:hits|hit|times)\b", re.I),
-    ]
 
     def parse(self, text: str) -> Dict[str, Any]:
+        return self.parse_compact(text).to_dict()
+
+    def parse_compact(self, text: str) -> ParseResult:
         t = (text or "").strip()
-        res = ParseResult(parsed_effects=[], description_raw=t)
+        res = ParseResult(description_raw=t)
+        scan = scan_text(t)
 
         # multiplier + scaling
-        mult, scaling = self._extract_multiplier_and_scaling(t)
+        mult, scaling = self._multiplier_and_scaling(scan)
         res.multiplier_pct = mult
         res.scaling = scaling
 
         # hits
-        res.hits = self._extract_hits(t)
+        res.hits = scan.hits
 
         # effects
-        res.parsed_effects = self._extract_effects(t)
+        self._effects(scan, res.parsed_effects)
 
         # confidence
         res.confidence_score = self._compute_confidence(res)
-        return res.to_dict()
-
-    def _extract_multiplier_and_scaling(self, text: str) -> Tuple[Optional[float], Optional[str]]:
-        best = None
-        best_scale = None
-        for pat in self._MULT_PATTERNS:
-            m = pat.search(text)
-            if not m:
-                continue
-            val = _to_float(m.group(1))
-            if val is None:
-                continue
-            scale = None
-            if len(m.groups()) >= 2:
-                s = (m.group(2) or "").upper()
-                if "HP" in s:
-                    scale = "HP"
-                elif "ATK" in s or "ATTACK" in s:
-                    scale = "ATK"
-            # prefer first strong match
-            best = val
-            best_scale = scale
-            break
+        return res
+
+    def parse_many(self, texts: Iterable[Optional[str]], workers: Optional[int] = None, compact: bool = False) -> List[Any]:
+        return parse_many(texts, "skill", workers, compact)
+
+    def _multiplier_and_scaling(self, scan: _Scan) -> Tuple[Optional[float], Optional[str]]:
+        # "N% (of) ATK|Attack" first, else "N% (of) HP" (which historically carries no scaling)
+        atk = next((v for _, _, v, _, unit in scan.pcts if unit in ("ATK", "ATTACK")), None)
+        if atk is not None:
+            return atk, "ATK"
+        hp = next((v for _, _, v, _, unit in scan.pcts if unit == "HP"), None)
+        if hp is not None:
+            return hp, None
 
         # fallback if mentions HP but no explicit "x% HP"
-        if best is None:
-            if re.search(r"\bHP\b", text, re.I):
-                best_scale = "HP"
-            elif re.search(r"\bATK\b|\bAttack\b", text, re.I):
-                best_scale = "ATK"
-        return best, best_scale
-
-    def _extract_hits(self, text: str) -> Optional[int]:
-        for pat in self._HITS_PATTERNS:
-            m = pat.search(text)
-            if m:
-                try:
-                    return int(m.group(1))
-                except Exception:
-                    return None
-        return None
+        if scan.hp_word:
+            return None, "HP"
+        if scan.atk_word:
+            return None, "ATK"
+        return None, None
 
     def _extract_effects(self, text: str) -> List[Dict[str, Any]]:
-        effects: List[Dict[str, Any]] = []
+        effects = EffectList()
+        self._effects(scan_text(text), effects)
+        return effects.to_list()
 
+    def _effects(self, scan: _Scan, effects: EffectList) -> None:
         # Damage bonus patterns
-        for m in re.finditer(r"increase(?:s)?\s+damage(?:\s+dealt)?\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", text, re.I):
-            effects.append({"type": "dmg_bonus_pct", "value": float(m.group(1))})
+        for kind, _, _, value, valid in scan.inc:
+            if kind == "dmg" and valid:
+                effects.add("dmg_bonus_pct", value)
 
         # Conditional on debuff
-        if re.search(r"\bif\b.*\b(debuffed|debuff)\b", text, re.I):
-            m = re.search(r"increase(?:s)?\s+damage(?:\s+dealt)?\s+by\s+([0-9]+(?:\.[0-9]+)?)%.*\b(debuffed|debuff)\b", text, re.I)
-            if m:
-                effects.append({"type": "bonus_if_debuffed", "value": float(m.group(1))})
+        if _if_debuff_same_line(scan):
+            bonus = None
+            # leftmost "increase damage by N%" (no %\b here) with a debuff word after it on its line
+            for kind, end, line, value, _ in scan.inc:
+                if kind == "dmg":
+                    if any(ln == line and pos >= end for pos, ln in scan.debuffs):
+                        bonus = value
+                        break
+            if bonus is not None:
+                effects.add("bonus_if_debuffed", bonus)
             else:
-                effects.append({"type": "cond_if_debuffed", "value": True})
+                effects.add("cond_if_debuffed", True)
 
         # Ignore DEF
-        m = re.search(r"ignore(?:s)?\s+([0-9]+(?:\.[0-9]+)?)%\s*DEF\b", text, re.I)
-        if m:
-            effects.append({"type": "ignore_def_pct", "value": float(m.group(1))})
-        elif re.search(r"\bignore(?:s)?\s+defense\b", text, re.I):
-            effects.append({"type": "ignore_def_pct", "value": 100.0})
+        v = _first_valid(scan.ign_def)
+        if v is not None:
+            effects.add("ignore_def_pct", v)
+        elif scan.ign_defense:
+            effects.add("ignore_def_pct", 100.0)
 
         # Penetrate resistance
-        m = re.search(r"(?:penetrate|ignore)(?:s)?\s+([0-9]+(?:\.[0-9]+)?)%\s*(?:resistance|res)\b", text, re.I)
-        if m:
-            effects.append({"type": "res_pen_pct", "value": float(m.group(1))})
+        v = _first_valid(scan.res_pen)
+        if v is not None:
+            effects.add("res_pen_pct", v)
 
         # True damage
-        if re.search(r"\btrue damage\b", text, re.I):
-            effects.append({"type": "true_damage", "value": True})
+        if scan.true_damage:
+            effects.add("true_damage", True)
 
         # Crit modifiers
-        m = re.search(r"increase(?:s)?\s+crit(?:ical)?\s+damage\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", text, re.I)
-        if m:
-            effects.append({"type": "crit_dmg_bonus_pct", "value": float(m.group(1))})
-
-        m = re.search(r"increase(?:s)?\s+crit(?:ical)?\s+(?:rate|chance)\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", text, re.I)
-        if m:
-            effects.append({"type": "crit_rate_bonus_pct", "value": float(m.group(1))})
-
-        m = re.search(r"reduce(?:s)?\s+enemy\s+crit(?:ical)?\s+resist(?:ance)?\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", text, re.I)
-        if m:
-            effects.append({"type": "enemy_crit_resist_down_pct", "value": float(m.group(1))})
+        v = _first_inc(scan, "crit_dmg")
+        if v is not None:
+            effects.add("crit_dmg_bonus_pct", v)
+        v = _first_inc(scan, "crit_rate")
+        if v is not None:
+            effects.add("crit_rate_bonus_pct", v)
+        v = _first_valid(scan.enemy_crit_res)
+        if v is not None:
+            effects.add("enemy_crit_resist_down_pct", v)
 
         # HP threshold condition
-        m = re.search(r"HP\s+is\s+below\s+([0-9]+(?:\.[0-9]+)?)%\b", text, re.I)
-        if m:
-            effects.append({"type": "cond_hp_below_pct", "value": float(m.group(1))})
-
-        # Stacks
-        m = re.search(r"per\s+stack\b.*?([0-9]+(?:\.[0-9]+)?)%\b", text, re.I)
-        if m:
-            effects.append({"type": "per_stack_bonus_pct", "value": float(m.group(1))})
-        m = re.search(r"max(?:imum)?\s+([0-9]+)\s+stacks\b", text, re.I)
-        if m:
-            effects.append({"type": "max_stacks", "value": int(m.group(1))})
-
-        # Clean duplicates
-        uniq = []
-        seen = set()
-        for e in effects:
-            sig = (e.get("type"), e.get("value"))
-            if sig in seen:
-                continue
-            seen.add(sig)
-            uniq.append(e)
-        return uniq
+        v = _first_valid(scan.hp_below)
+        if v is not None:
+            effects.add("cond_hp_below_pct", v)
+
+        # Stacks: first "per stack" followed by a N%\b on the same line
+        for end, line in scan.stacks:
+            v = next((v for pos, ln, v, valid, _ in scan.pcts if valid and pos >= end and ln == line), None)
+            if v is not None:
+                effects.add("per_stack_bonus_pct", v)
+                break
+        if scan.max_stacks is not None:
+            effects.add("max_stacks", scan.max_stacks)
 
     def _compute_confidence(self, res: ParseResult) -> float:
         score = 0.0
@@ -209,43 +483,85 @@ class PotentialParser:
     Potentials are usually short bonuses; we parse common stat mods and conditions.
     """
     def parse(self, text: str) -> Dict[str, Any]:
+        return self.parse_compact(text).to_potential_dict()
+
+    def parse_compact(self, text: str) -> ParseResult:
         t = (text or "").strip()
-        effects: List[Dict[str, Any]] = []
+        scan = scan_text(t)
+        res = ParseResult(description_raw=t)
+        effects = res.parsed_effects
 
         # ATK/DEF/HP bonuses
         for stat in ("ATK", "DEF", "HP"):
-            m = re.search(rf"increase(?:s)?\s+{stat}\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", t, re.I)
-            if m:
-                effects.append({"type": f"{stat.lower()}_pct", "value": float(m.group(1))})
+            v = _first_inc(scan, stat)
+            if v is not None:
+                effects.add(f"{stat.lower()}_pct", v)
 
         # Damage dealt
-        m = re.search(r"increase(?:s)?\s+damage(?:\s+dealt)?\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", t, re.I)
-        if m:
-            effects.append({"type": "dmg_bonus_pct", "value": float(m.group(1))})
+        v = _first_inc(scan, "dmg")
+        if v is not None:
+            effects.add("dmg_bonus_pct", v)
 
         # Crit stats
-        m = re.search(r"increase(?:s)?\s+crit(?:ical)?\s+(?:rate|chance)\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", t, re.I)
-        if m:
-            effects.append({"type": "crit_rate_pct", "value": float(m.group(1))})
-
-        m = re.search(r"increase(?:s)?\s+crit(?:ical)?\s+damage\s+by\s+([0-9]+(?:\.[0-9]+)?)%\b", t, re.I)
-        if m:
-            effects.append({"type": "crit_dmg_pct", "value": float(m.group(1))})
+        v = _first_inc(scan, "crit_rate")
+        if v is not None:
+            effects.add("crit_rate_pct", v)
+        v = _first_inc(scan, "crit_dmg")
+        if v is not None:
+            effects.add("crit_dmg_pct", v)
 
         # Simple conditions
-        if re.search(r"\bif\b.*\b(debuffed|debuff)\b", t, re.I):
-            effects.append({"type": "cond_if_debuffed", "value": True})
+        if _if_debuff_same_line(scan):
+            effects.add("cond_if_debuffed", True)
 
-        m = re.search(r"HP\s+is\s+below\s+([0-9]+(?:\.[0-9]+)?)%\b", t, re.I)
-        if m:
-            effects.append({"type": "cond_hp_below_pct", "value": float(m.group(1))})
+        v = _first_valid(scan.hp_below)
+        if v is not None:
+            effects.add("cond_hp_below_pct", v)
 
         # confidence
         conf = 0.25
         if effects:
             conf = min(1.0, 0.35 + 0.15 * len(effects))
-        return {
-            "parsed_effects": effects,
-            "confidence_score": conf,
-            "description_raw": t,
-        }
+        res.confidence_score = conf
+        return res
+
+    def parse_many(self, texts: Iterable[Optional[str]], workers: Optional[int] = None, compact: bool = False) -> List[Any]:
+        return parse_many(texts, "potential", workers, compact)
+
+
+# ---------------------------------------------------------------------------
+# Batch API
+
+_PARSERS = {"skill": SkillParser, "potential": PotentialParser}
+
+
+def _parse_chunk(kind: str, texts: List[str], compact: bool = False) -> List[Any]:
+    parser = _PARSERS[kind]()
+    parse = parser.parse_compact if compact else parser.parse
+    return [parse(t) for t in texts]
+
+
+def parse_many(texts: Iterable[Optional[str]], kind: str = "skill", workers: Optional[int] = None,
+               compact: bool = False) -> List[Any]:
+    """
+    Parse a batch of descriptions; results come back in input order, as dicts (JSON form) or,
+    with `compact`, as ParseResult objects.
+    Texts identical once stripped are parsed once and share the same result (treat it as
+    read-only). Batches of at least POOL_MIN_TEXTS unique texts fan out over a process pool of
+    `workers` processes (default: os.cpu_count(); 0 or 1 parses in-process).
+    """
+    texts = [(t or "").strip() for t in texts]
+    unique = list(dict.fromkeys(texts))
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    results: Optional[List[Dict[str, Any]]] = None
+    if workers > 1 and len(unique) >= POOL_MIN_TEXTS:
+        chunks = [unique[i:i + POOL_CHUNK] for i in range(0, len(unique), POOL_CHUNK)]
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                results = [r for part in pool.map(_parse_chunk, [kind] * len(chunks), chunks, [compact] * len(chunks)) for r in part]
+        except (OSError, RuntimeError) as e:  # no fork/semaphores in this environment, broken pool
+            print(f"[WARN] parse_many: process pool unavailable, parsing in-process: {e}", file=sys.stderr)
+    if results is None:
+        results = _parse_chunk(kind, unique, compact)
+    by_text = dict(zip(unique, results))
+    return [by_text[t] for t in texts]
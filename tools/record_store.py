@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Content-addressed record store
+
+Every record of modules.* (characters, weapons, skills, ...) is stored once under its content
+hash and shared by every snapshot and DB build. A snapshot or a build is then just a manifest
+{module: {id: hash}}: writing one costs only the records that changed, and comparing two
+builds is a manifest comparison (no JSON re-serialization of records).
+
+Layout (data/db_snapshots/objects/):
+- <pack>.json.gz   {"format": 1, "objects": {hash: record}}
+  One append-only pack per write, holding only hashes not stored yet; packs are named by
+  their content so rewriting the same pack is a no-op.
+
+gc() drops objects no manifest references any more, by repacking the live ones into a
+single pack once dead objects pass GC_DEAD_RATIO (avoids rewriting packs on every prune).
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from json_stream import write_json
+
+OBJECTS_FORMAT = 1
+HASH_LEN = 20
+GC_DEAD_RATIO = 0.25
+
+Manifest = Dict[str, Dict[str, str]]  # module -> {id: hash}, insertion order = record order
+
+
+def record_hash(rec: Any) -> str:
+    """
+    Content hash of one record. Key order is part of the content (no sort_keys),
+    so a record rebuilt from its hash keeps the exact field order.
+    """
+    raw = json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:HASH_LEN]
+
+
+def module_records(db: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """db["modules"] when it has the expected {module: {id: record}} shape, else None."""
+    mods = db.get("modules")
+    if isinstance(mods, dict) and all(isinstance(m, dict) for m in mods.values()):
+        return mods
+    return None
+
+
+def manifest_of(db: Dict[str, Any]) -> Manifest:
+    mods = module_records(db) or {}
+    return {module: {rid: record_hash(rec) for rid, rec in recs.items()} for module, recs in mods.items()}
+
+
+def diff_manifests(old: Manifest, new: Manifest, modules: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, List[str]]]:
+    """added / removed / changed ids per module, from hashes alone."""
+    diff: Dict[str, Dict[str, List[str]]] = {"added": {}, "removed": {}, "changed": {}}
+    for module in (modules if modules is not None else list(dict.fromkeys([*old, *new]))):
+        a = old.get(module) or {}
+        b = new.get(module) or {}
+        diff["added"][module] = sorted(k for k in b if k not in a)
+        diff["removed"][module] = sorted(k for k in a if k not in b)
+        diff["changed"][module] = sorted(k for k in b if k in a and a[k] != b[k])
+    return diff
+
+
+class RecordStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._objects: Optional[Dict[str, Any]] = None
+        self._pack_of: Dict[str, str] = {}
+
+    def _pack_paths(self) -> List[Path]:
+        return sorted(self.root.glob("*.json.gz")) if self.root.exists() else []
+
+    def _loaded(self) -> Dict[str, Any]:
+        if self._objects is None:
+            self._objects = {}
+            for p in self._pack_paths():
+                objs = json.loads(gzip.decompress(p.read_bytes()).decode("utf-8")).get("objects") or {}
+                self._objects.update(objs)
+                for h in objs:
+                    self._pack_of[h] = p.name
+        return self._objects
+
+    def __contains__(self, h: str) -> bool:
+        return h in self._loaded()
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    def get(self, h: str) -> Any:
+        return self._loaded()[h]
+
+    def hashes(self) -> set:
+        return set(self._loaded())
+
+    def _write(self, objects: Dict[str, Any]) -> Path:
+        name = hashlib.sha1("\n".join(sorted(objects)).encode("utf-8")).hexdigest()[:16] + ".json.gz"
+        path = self.root / name
+        write_json(path, {"format": OBJECTS_FORMAT, "objects": objects}, separators=(",", ":"), compress=True)
+        return path
+
+    def put_many(self, objects: Dict[str, Any]) -> int:
+        """Store the records whose hash is not stored yet (one new pack). Returns how many were new."""
+        known = self._loaded()
+        new = {h: rec for h, rec in objects.items() if h not in known}
+        if not new:
+            return 0
+        path = self._write(new)
+        known.update(new)
+        for h in new:
+            self._pack_of[h] = path.name
+        return len(new)
+
+    def gc(self, live: set) -> int:
+        """Repack live objects into one pack when enough are dead. Returns objects dropped."""
+        objs = self._loaded()
+        dead = [h for h in objs if h not in live]
+        if not objs or len(dead) / len(objs) < GC_DEAD_RATIO:
+            return 0
+        old_packs = self._pack_paths()
+        kept = {h: rec for h, rec in objs.items() if h in live}
+        path = self._write(kept) if kept else None
+        for p in old_packs:
+            if path is None or p != path:
+                p.unlink(missing_ok=True)
+        self._objects = kept
+        self._pack_of = {h: path.name for h in kept} if path else {}
+        return len(dead)
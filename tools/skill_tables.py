@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Precomputed skill damage tables
+
+Per character and weapon type, one columnar table over the kit's skills (modules.skills), so the
+site and other consumers read the numbers instead of re-deriving them from raw hits/multipliers:
+
+- skills          skill ids (same order as every other column)
+- kind            skill / normal / tag / ultimate / passive (as the site classifies skill.type)
+- hits            hits per use (countHitsFromCtx)
+- total_mult_pct  multiplier of one use: sum of the per-hit multipliers, else multiplier x hits
+- hit_sum_pct     sum of the structured per-hit multipliers of the record (`hits`), null without any
+                  or when a hit has no multiplier_pct
+- cooldown_sec    record cooldown, null when unknown
+- hits_per_sec    hits / cooldown_sec, null when the cooldown is unknown
+- dmg             {formula profile: expected damage of one use at the reference stats}
+
+Reference stats (REFERENCE_BUILD vs REFERENCE_ENEMY): 1000 ATK, 5% crit rate, 50% crit damage, no
+buff, neutral element, against 1000 DEF and no resistance. dmg is tools/damage_engine.py in
+expected mode with the site defaults + that profile, parsed effects included; it scales linearly
+with ATK, so dmg / 1000 is the damage per point of ATK.
+
+Written by tools/update_db.py as data/skill_tables.json (+ .gz/.br) and as one lazy live shard
+"tables.<character id>" per character (loadSkillTable() of src/core/livedb.js).
+
+CLI (print the table of one character):
+  python tools/skill_tables.py [--character NAME|ID] [data/db.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import damage_engine as de
+
+SKILL_TABLES_FORMAT = 1
+REFERENCE_BUILD = {"id": "reference", "stats": {"atk": 1000, "crit_rate_pct": 5, "crit_dmg_pct": 50, "element": "neutral"}, "buffs": []}
+REFERENCE_ENEMY = {"def": 1000, "resistance_pct": 0, "dmg_reduction_pct": 0, "burst_resist": 0, "element": "neutral"}
+PCT_DIGITS = 4
+DMG_DIGITS = 2
+
+
+def _round(x: Optional[float], digits: int) -> Optional[float]:
+    if x is None or not math.isfinite(x):
+        return None
+    return round(float(x), digits)
+
+
+def _hit_sum_pct(sk: Dict[str, Any]) -> Optional[float]:
+    """Sum of the hits' multiplier_pct; None without hits or when one of them has no number."""
+    total = 0.0
+    hits = [h for h in (sk.get("hits") or []) if isinstance(h, dict)]
+    for h in hits:
+        raw = h.get("multiplier_pct")
+        p = de.js_num(raw, math.nan) if raw is not None and raw != "" else math.nan  # js_num(None / "") is 0
+        if not math.isfinite(p):
+            return None
+        total += p
+    return total if hits else None
+
+
+def build_skill_tables(dbx: Dict[str, Any], profiles: Optional[Dict[str, Any]] = None,
+                       defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """{"format", "generated_at", "reference", "profiles", "characters": {cid: {weapon type: table}}}."""
+    profiles = profiles if profiles is not None else de.load_formula_profiles()
+    defaults = defaults if defaults is not None else de.load_site_defaults()
+    skills = [sk for sk in ((dbx.get("modules") or {}).get("skills") or {}).values() if sk.get("character_id")]
+
+    dmg: Dict[str, np.ndarray] = {}
+    table = None
+    zeros = np.zeros(len(skills), dtype=np.intp)
+    for name in profiles:
+        settings = de.profile_settings(name, profiles, defaults)
+        engine = de.DamageEngine(settings)
+        table = de.SkillTable.from_records(skills, settings)
+        dmg[name] = engine.expected(de.BuildTable.from_builds([REFERENCE_BUILD], settings), table,
+                                    de.EnemyTable.from_enemies([REFERENCE_ENEMY], settings), zeros, np.arange(len(skills)), zeros)
+    if table is None:
+        table = de.SkillTable.from_records(skills, de.profile_settings(None, profiles, defaults))
+
+    total = (table.hit_mults.sum(axis=1) * table.repeat * 100).tolist()
+    groups: Dict[str, Dict[str, List[int]]] = {}
+    for i, sk in enumerate(skills):
+        groups.setdefault(str(sk["character_id"]), {}).setdefault(str(sk.get("weapon_type") or ""), []).append(i)
+
+    characters: Dict[str, Dict[str, Any]] = {}
+    for cid, by_wt in groups.items():
+        characters[cid] = {}
+        for wt, idx in by_wt.items():
+            cds = [de.js_num(skills[i].get("cooldown_sec"), math.nan) if skills[i].get("cooldown_sec") is not None else math.nan
+                   for i in idx]
+            cds = [cd if cd > 0 else math.nan for cd in cds]
+            characters[cid][wt] = {
+                "skills": [skills[i]["id"] for i in idx],
+                "kind": [de.KINDS[table.kinds[i]] for i in idx],
+                "hits": [int(table.n_hits[i]) for i in idx],
+                "total_mult_pct": [_round(total[i], PCT_DIGITS) for i in idx],
+                "hit_sum_pct": [_round(_hit_sum_pct(skills[i]), PCT_DIGITS) for i in idx],
+                "cooldown_sec": [_round(cd, PCT_DIGITS) for cd in cds],
+                "hits_per_sec": [_round(int(table.n_hits[i]) / cd, PCT_DIGITS) for i, cd in zip(idx, cds)],
+                "dmg": {name: [_round(float(d[i]), DMG_DIGITS) for i in idx] for name, d in dmg.items()},
+            }
+    return {
+        "format": SKILL_TABLES_FORMAT,
+        "generated_at": dbx.get("generated_at"),
+        "reference": {"build": REFERENCE_BUILD, "enemy": REFERENCE_ENEMY},
+        "profiles": {name: (p or {}).get("label") or name for name, p in profiles.items()},
+        "characters": characters,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("db", nargs="?", type=Path, default=de.DB_JSON)
+    ap.add_argument("--character", default=None, help="Character id or name (default: first character of the DB).")
+    args = ap.parse_args()
+
+    dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    tables = build_skill_tables(dbx)
+    chars = ((dbx.get("modules") or {}).get("characters") or {})
+    ch = next((c for c in chars.values() if args.character in (None, c.get("id"), c.get("name"))), None)
+    if ch is None or ch["id"] not in tables["characters"]:
+        print(f"No skill table for {args.character or 'the first character'}.", file=sys.stderr)
+        return 1
+    names = {sid: sk.get("name") for sid, sk in (dbx["modules"].get("skills") or {}).items()}
+    profiles = list(tables["profiles"])
+    for wt, t in tables["characters"][ch["id"]].items():
+        print(f"{ch.get('name')} · {wt or '(no weapon type)'}")
+        print(f"  {'skill':28} {'kind':9} {'hits':>4} {'mult %':>8} {'cd s':>6} {'hits/s':>7} " + " ".join(f"{p[:14]:>14}" for p in profiles))
+        for j, sid in enumerate(t["skills"]):
+            cd, hps = t["cooldown_sec"][j], t["hits_per_sec"][j]
+            print(f"  {str(names.get(sid))[:28]:28} {t['kind'][j]:9} {t['hits'][j]:>4} {t['total_mult_pct'][j]:>8.1f} "
+                  f"{cd if cd is not None else '—':>6} {hps if hps is not None else '—':>7} "
+                  + " ".join(f"{t['dmg'][p][j]:>14.1f}" for p in profiles))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
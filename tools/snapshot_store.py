@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Snapshot store (delta-compressed DB history)
+
+Replaces one full indent=2 JSON copy per run with gzipped packs in data/db_snapshots/:
+
+- db_<ts>.base.json.gz   full manifest (module -> {id: record hash}) + top-level keys
+- db_<ts>.delta.json.gz  changes vs the previous snapshot of the chain:
+                         top-level keys that changed, per-module set/del of id -> record hash
+- db_<ts>.raw.json.gz    verbatim fallback (a snapshot that would not round-trip), outside the chain
+- objects/               shared content-addressed record store (tools/record_store.py)
+
+Packs only hold manifests: records live once in objects/, whatever the number of snapshots
+referencing them, so a write costs only the records whose content is new. Reading snapshot k
+replays the chain from the latest base at or before k. Every snapshot rebuilds byte-for-byte:
+each pack stores the sha1 of the exact serialized bytes and write() verifies the round-trip
+before trusting a delta.
+
+A new base is cut every BASE_EVERY snapshots (bounds replay length) and when pruning makes a
+delta the oldest kept snapshot.
+
+CLI:
+  python tools/snapshot_store.py list
+  python tools/snapshot_store.py export <snapshot_id> [out.json]
+  python tools/snapshot_store.py manifest <snapshot_id>
+  python tools/snapshot_store.py verify
+  python tools/snapshot_store.py migrate      # import legacy db_*.json files, then delete them
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from json_stream import json_sha1, write_json
+from record_store import Manifest, RecordStore, manifest_of, module_records
+
+PACK_FORMAT = 2
+SNAPSHOT_KEEP = 365
+BASE_EVERY = 30
+
+KINDS = ("base", "delta", "raw")
+
+
+SNAPSHOT_INDENT = 2
+
+
+def dumps_snapshot(db: Dict[str, Any]) -> bytes:
+    """Exact bytes of a snapshot file (same serialization as the historical db_*.json)."""
+    return json.dumps(db, ensure_ascii=False, indent=SNAPSHOT_INDENT).encode("utf-8")
+
+
+class _ChainState:
+    """Replay state: top-level doc and per-module ordered manifest."""
+
+    def __init__(self):
+        self.doc_keys: List[str] = []
+        self.doc: Dict[str, Any] = {}
+        self.module_names: Optional[List[str]] = None
+        self.manifest: Manifest = {}  # module -> {id: hash} (insertion order = record order)
+
+    def apply(self, pack: Dict[str, Any]) -> None:
+        if pack["kind"] == "base":
+            self.__init__()
+        self.doc_keys = pack["doc_keys"]
+        self.doc.update(pack.get("doc") or {})
+        for k in list(self.doc):
+            if k not in self.doc_keys:
+                del self.doc[k]
+        self.module_names = pack.get("module_names")
+        for module, ops in (pack.get("modules") or {}).items():
+            cur = self.manifest.get(module, {})
+            for rid in ops.get("del") or []:
+                cur.pop(rid, None)
+            cur.update(ops.get("set") or {})
+            if ops.get("order") is not None:
+                cur = {rid: cur[rid] for rid in ops["order"]}
+            self.manifest[module] = cur
+        if self.module_names is not None:
+            self.manifest = {m: self.manifest.get(m, {}) for m in self.module_names}
+
+    def materialize(self, objects: RecordStore) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for k in self.doc_keys:
+            if k == "modules" and self.module_names is not None:
+                out[k] = {m: {rid: objects.get(h) for rid, h in self.manifest[m].items()} for m in self.module_names}
+            else:
+                out[k] = self.doc[k]
+        return out
+
+
+class SnapshotStore:
+    def __init__(self, root: Path, base_every: int = BASE_EVERY):
+        self.root = Path(root)
+        self.base_every = base_every
+        self.objects = RecordStore(self.root / "objects")
+
+    # --- listing
+
+    def _packs(self) -> List[Tuple[str, str, Path]]:
+        out = []
+        if not self.root.exists():
+            return out
+        for p in self.root.glob("db_*.json.gz"):
+            sid, _, rest = p.name.partition(".")
+            kind = rest.split(".", 1)[0]
+            if kind in KINDS:
+                out.append((sid, kind, p))
+        out.sort()
+        return out
+
+    def ids(self) -> List[str]:
+        return [sid for sid, _, _ in self._packs()]
+
+    def legacy_files(self) -> List[Path]:
+        return sorted(self.root.glob("db_*.json")) if self.root.exists() else []
+
+    def _load(self, p: Path) -> Dict[str, Any]:
+        return json.loads(gzip.decompress(p.read_bytes()).decode("utf-8"))
+
+    def _write_pack(self, sid: str, kind: str, pack: Dict[str, Any]) -> Path:
+        path = self.root / f"{sid}.{kind}.json.gz"
+        write_json(path, pack, separators=(",", ":"), compress=True)
+        for other in KINDS:
+            if other != kind:
+                stale = self.root / f"{sid}.{other}.json.gz"
+                if stale.exists():
+                    stale.unlink()
+        return path
+
+    # --- reading
+
+    def _chain_state(self, upto: Optional[str] = None) -> Tuple[_ChainState, int]:
+        """Replay the chain ending at `upto` (or the last chain snapshot). Returns (state, chain length)."""
+        packs = [(sid, kind, p) for sid, kind, p in self._packs() if kind != "raw" and (upto is None or sid <= upto)]
+        start = max((i for i, (_, kind, _) in enumerate(packs) if kind == "base"), default=None)
+        state = _ChainState()
+        if start is None:
+            return state, 0
+        for _, _, p in packs[start:]:
+            state.apply(self._load(p))
+        return state, len(packs) - start
+
+    def read_bytes(self, sid: str) -> bytes:
+        packs = {s: (kind, p) for s, kind, p in self._packs()}
+        if sid not in packs:
+            raise KeyError(f"unknown snapshot: {sid}")
+        kind, p = packs[sid]
+        if kind == "raw":
+            return self._load(p)["raw"].encode("utf-8")
+        state, _ = self._chain_state(sid)
+        return dumps_snapshot(state.materialize(self.objects))
+
+    def read(self, sid: str) -> Dict[str, Any]:
+        return json.loads(self.read_bytes(sid).decode("utf-8"))
+
+    def sha1(self, sid: str) -> str:
+        """sha1 of the bytes snapshot `sid` rebuilds to, streamed (the document is never serialized whole)."""
+        packs = {s: (kind, p) for s, kind, p in self._packs()}
+        if sid not in packs:
+            raise KeyError(f"unknown snapshot: {sid}")
+        kind, p = packs[sid]
+        if kind == "raw":
+            return hashlib.sha1(self._load(p)["raw"].encode("utf-8")).hexdigest()
+        state, _ = self._chain_state(sid)
+        return json_sha1(state.materialize(self.objects), indent=SNAPSHOT_INDENT)
+
+    def export(self, sid: str, out: Path) -> None:
+        """Stream snapshot `sid` to `out` (same bytes as read_bytes)."""
+        packs = {s: (kind, p) for s, kind, p in self._packs()}
+        if sid not in packs:
+            raise KeyError(f"unknown snapshot: {sid}")
+        if packs[sid][0] == "raw":
+            Path(out).write_bytes(self.read_bytes(sid))
+            return
+        state, _ = self._chain_state(sid)
+        write_json(out, state.materialize(self.objects), indent=SNAPSHOT_INDENT)
+
+    def manifest(self, sid: str) -> Manifest:
+        """module -> {id: record hash} of snapshot `sid`, without loading any record (raw packs excepted)."""
+        packs = {s: (kind, p) for s, kind, p in self._packs()}
+        if sid not in packs:
+            raise KeyError(f"unknown snapshot: {sid}")
+        if packs[sid][0] == "raw":
+            return manifest_of(self.read(sid))
+        state, _ = self._chain_state(sid)
+        return state.manifest
+
+    def live_hashes(self) -> set:
+        """Record hashes referenced by at least one chain snapshot (one replay over all packs)."""
+        live: set = set()
+        state = _ChainState()
+        for _, kind, p in self._packs():
+            if kind == "raw":
+                continue
+            state.apply(self._load(p))
+            live.update(h for m in state.manifest.values() for h in m.values())
+        return live
+
+    def expected_sha1(self, sid: str) -> str:
+        for s, _, p in self._packs():
+            if s == sid:
+                return self._load(p)["sha1"]
+        raise KeyError(f"unknown snapshot: {sid}")
+
+    # --- writing
+
+    def write(self, db: Dict[str, Any], sid: str, expected: Optional[bytes] = None,
+              manifest: Optional[Manifest] = None) -> Path:
+        """
+        Append snapshot `sid` (ids must sort after existing ones).
+        `expected` = exact bytes the snapshot must rebuild to (defaults to dumps_snapshot(db)).
+        `manifest` = manifest_of(db) when the caller already has it (avoids hashing every record twice).
+        Without `expected`, the snapshot is hashed and verified as a stream, never serialized whole.
+        """
+        existing = self.ids()
+        if existing and sid == existing[-1]:
+            # same id as the tip (two runs in the same second): overwrite it, nothing depends on it
+            for kind in KINDS:
+                (self.root / f"{sid}.{kind}.json.gz").unlink(missing_ok=True)
+        elif existing and sid < existing[-1]:
+            raise ValueError(f"snapshot id {sid} does not sort after {existing[-1]}")
+        sha1 = hashlib.sha1(expected).hexdigest() if expected is not None else json_sha1(db, indent=SNAPSHOT_INDENT)
+
+        prev, chain_len = self._chain_state()
+        kind = "base" if chain_len == 0 or chain_len >= self.base_every else "delta"
+        path = self._write_pack(sid, kind, self._make_pack(db, sid, sha1, prev if kind == "delta" else None, manifest))
+        if self.sha1(sid) != sha1:
+            # would not round-trip byte-for-byte: keep it verbatim, outside the chain
+            raw = expected if expected is not None else dumps_snapshot(db)
+            path = self._write_pack(sid, "raw", {"format": PACK_FORMAT, "id": sid, "kind": "raw", "sha1": sha1,
+                                                 "raw": raw.decode("utf-8")})
+        return path
+
+    def _make_pack(self, db: Dict[str, Any], sid: str, sha1: str, prev: Optional[_ChainState],
+                   manifest: Optional[Manifest] = None) -> Dict[str, Any]:
+        """Manifest pack for `db`; records not in the object store yet are stored first."""
+        kind = "delta" if prev is not None else "base"
+        mods = module_records(db)
+        doc_keys = list(db.keys())
+        doc = {k: v for k, v in db.items() if not (k == "modules" and mods is not None)}
+        if prev is not None:
+            doc = {k: v for k, v in doc.items() if k not in prev.doc or prev.doc[k] != v}
+        pack: Dict[str, Any] = {
+            "format": PACK_FORMAT, "id": sid, "kind": kind, "sha1": sha1,
+            "doc_keys": doc_keys, "doc": doc,
+            "module_names": list(mods.keys()) if mods is not None else None,
+            "modules": {},
+        }
+        if mods is None:
+            return pack
+
+        manifest = manifest if manifest is not None else manifest_of(db)
+        new_objects: Dict[str, Any] = {}
+        for module, recs in mods.items():
+            old = prev.manifest.get(module, {}) if prev is not None else {}
+            new = manifest[module]
+            ops: Dict[str, Any] = {}
+            dels = [rid for rid in old if rid not in new]
+            sets = {rid: h for rid, h in new.items() if old.get(rid) != h}
+            if dels:
+                ops["del"] = dels
+            if sets:
+                ops["set"] = sets
+            replayed = [rid for rid in old if rid in new] + [rid for rid in new if rid not in old]
+            if replayed != list(new):
+                ops["order"] = list(new)
+            if ops:
+                pack["modules"][module] = ops
+            for rid, h in sets.items():
+                if h not in self.objects:
+                    new_objects[h] = recs[rid]
+        self.objects.put_many(new_objects)
+        return pack
+
+    def prune(self, keep: int = SNAPSHOT_KEEP) -> int:
+        """
+        Keep the newest `keep` snapshots. The oldest kept chain snapshot is rebased first,
+        then records no kept snapshot references are collected from the object store.
+        """
+        packs = self._packs()
+        if len(packs) <= keep:
+            return 0
+        dropped, kept = packs[:-keep], packs[-keep:]
+        first_chain = next(((sid, kind) for sid, kind, _ in kept if kind != "raw"), None)
+        if first_chain and first_chain[1] == "delta":
+            sid = first_chain[0]
+            state, _ = self._chain_state(sid)
+            db = state.materialize(self.objects)
+            self._write_pack(sid, "base", self._make_pack(db, sid, self.expected_sha1(sid), None, state.manifest))
+        for _, _, p in dropped:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+        self.objects.gc(self.live_hashes())
+        return len(dropped)
+
+    def migrate_legacy(self) -> int:
+        """Import historical db_*.json snapshots (oldest first), verify, then delete them."""
+        n = 0
+        for p in self.legacy_files():
+            sid = p.name[:-len(".json")]
+            raw = p.read_bytes()
+            existing = self.ids()
+            if sid not in existing:
+                if existing and sid < existing[-1]:
+                    sha1 = hashlib.sha1(raw).hexdigest()
+                    self._write_pack(sid, "raw", {"format": PACK_FORMAT, "id": sid, "kind": "raw", "sha1": sha1,
+                                                  "raw": raw.decode("utf-8")})
+                else:
+                    self.write(json.loads(raw.decode("utf-8")), sid, expected=raw)
+            if self.read_bytes(sid) != raw:
+                raise RuntimeError(f"snapshot migration mismatch: {p.name}")
+            p.unlink()
+            n += 1
+        return n
+
+    def verify(self) -> List[str]:
+        bad = []
+        for sid in self.ids():
+            if self.sha1(sid) != self.expected_sha1(sid):
+                bad.append(sid)
+        return bad
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", type=Path, default=Path(__file__).resolve().parents[1] / "data" / "db_snapshots")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    ex = sub.add_parser("export")
+    ex.add_argument("snapshot_id")
+    ex.add_argument("out", nargs="?", type=Path)
+    mf = sub.add_parser("manifest")
+    mf.add_argument("snapshot_id")
+    sub.add_parser("verify")
+    sub.add_parser("migrate")
+    args = ap.parse_args()
+
+    store = SnapshotStore(args.dir)
+    if args.cmd == "list":
+        for sid, kind, p in store._packs():
+            print(f"{sid}  {kind:5}  {p.stat().st_size:>8} B")
+        print(f"objects: {len(store.objects)} records")
+    elif args.cmd == "export":
+        if args.out:
+            store.export(args.snapshot_id, args.out)
+        else:
+            sys.stdout.write(store.read_bytes(args.snapshot_id).decode("utf-8"))
+    elif args.cmd == "manifest":
+        print(json.dumps(store.manifest(args.snapshot_id), indent=2))
+    elif args.cmd == "verify":
+        bad = store.verify()
+        for sid in bad:
+            print(f"[FAIL] {sid}", file=sys.stderr)
+        print(f"{len(store.ids()) - len(bad)}/{len(store.ids())} snapshots rebuild byte-for-byte")
+        return 1 if bad else 0
+    elif args.cmd == "migrate":
+        print(f"migrated {store.migrate_legacy()} legacy snapshots")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
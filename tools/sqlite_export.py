@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — SQLite export
+
+The normalized DB as relational tables for ad-hoc SQL (cross-roster questions without walking
+the nested JSON), written by tools/update_db.py --sqlite:
+
+- meta                 key / value (format, schema_version, generated_at)
+- characters           id, name, description, image_url
+- character_weapons    character_id, weapon_type, position (order of weapon_types)
+- weapons              id, name, weapon_type, equipment_attack, substat_name, substat_value (number,
+                       substat_value_raw as scraped), passive_text, image_url
+- skills               modules.skills: id, character_id, weapon_type, slot, name, type, key,
+                       cooldown_sec, description, parsed_multiplier_pct / parsed_hits / parsed_scaling /
+                       confidence_score (null when the DB was not enriched by the parser)
+- hits                 skill_id, hit, multiplier_pct, scaling (structured per-hit multipliers)
+- multipliers          skill_id, position, value_pct, scaling, context (multipliers found in the text)
+- potentials           id, character_id, weapon_type, tier, text
+- skill_effects        skill_id, type, value (parsed_effects)
+- potential_effects    potential_id, type, value
+- conflicts            module, record_id, field, a, b, sources (JSON text; merge conflicts of the build)
+- skill_totals (view)  skill_id, hit_count, hit_sum_pct, text_mult_pct, total_mult_pct (hit sum,
+                       else the text multipliers)
+
+Indexes on character_id, weapon_type and skill type (plus the skill_id / potential_id / effect type
+columns the tables are joined or filtered on). The file is written to a temp file next to the
+target in one transaction, indexes created after the bulk inserts, then moved over the target.
+
+CLI:
+  python tools/sqlite_export.py [data/db.json] [--out data/db.sqlite] [--sql "SELECT ..."]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from js_values import substat_value
+
+ROOT = Path(__file__).resolve().parents[1]
+DB_JSON = ROOT / "data" / "db.json"
+DB_SQLITE = ROOT / "data" / "db.sqlite"
+SQLITE_FORMAT = 1
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE characters (id TEXT PRIMARY KEY, name TEXT, description TEXT, image_url TEXT);
+CREATE TABLE character_weapons (character_id TEXT NOT NULL, weapon_type TEXT NOT NULL, position INTEGER NOT NULL,
+    PRIMARY KEY (character_id, weapon_type));
+CREATE TABLE weapons (id TEXT PRIMARY KEY, name TEXT, weapon_type TEXT, equipment_attack REAL, substat_name TEXT,
+    substat_value REAL, substat_value_raw TEXT, passive_text TEXT, image_url TEXT);
+CREATE TABLE skills (id TEXT PRIMARY KEY, character_id TEXT, weapon_type TEXT, slot INTEGER, name TEXT, type TEXT, key TEXT,
+    cooldown_sec REAL, description TEXT, parsed_multiplier_pct REAL, parsed_hits INTEGER, parsed_scaling TEXT,
+    confidence_score REAL);
+CREATE TABLE hits (skill_id TEXT NOT NULL, hit INTEGER, multiplier_pct REAL, scaling TEXT);
+CREATE TABLE multipliers (skill_id TEXT NOT NULL, position INTEGER NOT NULL, value_pct REAL, scaling TEXT, context TEXT);
+CREATE TABLE potentials (id INTEGER PRIMARY KEY, character_id TEXT NOT NULL, weapon_type TEXT, tier INTEGER, text TEXT);
+CREATE TABLE skill_effects (skill_id TEXT NOT NULL, type TEXT NOT NULL, value REAL);
+CREATE TABLE potential_effects (potential_id INTEGER NOT NULL, type TEXT NOT NULL, value REAL);
+CREATE TABLE conflicts (module TEXT, record_id TEXT, field TEXT, a TEXT, b TEXT, sources TEXT);
+CREATE VIEW skill_totals AS
+    SELECT s.id AS skill_id, h.n AS hit_count, h.pct AS hit_sum_pct, m.pct AS text_mult_pct,
+           COALESCE(h.pct, m.pct) AS total_mult_pct
+    FROM skills s
+    LEFT JOIN (SELECT skill_id, COUNT(*) AS n, SUM(multiplier_pct) AS pct FROM hits GROUP BY skill_id) h ON h.skill_id = s.id
+    LEFT JOIN (SELECT skill_id, SUM(value_pct) AS pct FROM multipliers GROUP BY skill_id) m ON m.skill_id = s.id;
+"""
+
+INDEXES = """
+CREATE INDEX idx_character_weapons_weapon_type ON character_weapons (weapon_type);
+CREATE INDEX idx_weapons_weapon_type ON weapons (weapon_type);
+CREATE INDEX idx_skills_character_id ON skills (character_id);
+CREATE INDEX idx_skills_weapon_type ON skills (weapon_type);
+CREATE INDEX idx_skills_type ON skills (type);
+CREATE INDEX idx_hits_skill_id ON hits (skill_id);
+CREATE INDEX idx_multipliers_skill_id ON multipliers (skill_id);
+CREATE INDEX idx_potentials_character_id ON potentials (character_id);
+CREATE INDEX idx_potentials_weapon_type ON potentials (weapon_type);
+CREATE INDEX idx_skill_effects_skill_id ON skill_effects (skill_id);
+CREATE INDEX idx_skill_effects_type ON skill_effects (type);
+CREATE INDEX idx_potential_effects_potential_id ON potential_effects (potential_id);
+CREATE INDEX idx_potential_effects_type ON potential_effects (type);
+CREATE INDEX idx_conflicts_record ON conflicts (module, record_id);
+"""
+
+# Highest total multiplier Ultimate per weapon type (the README example)
+TOP_ULTIMATES_SQL = """
+SELECT s.weapon_type, c.name AS character, s.name AS skill, MAX(t.total_mult_pct) AS total_mult_pct
+FROM skills s JOIN skill_totals t ON t.skill_id = s.id LEFT JOIN characters c ON c.id = s.character_id
+WHERE s.type = 'Ultimate Move' AND t.total_mult_pct IS NOT NULL
+GROUP BY s.weapon_type ORDER BY s.weapon_type
+"""
+
+
+def _real(v: Any) -> Optional[float]:
+    if isinstance(v, bool) or v is None:
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(v: Any) -> Optional[int]:
+    f = _real(v)
+    return int(f) if f is not None and f.is_integer() else None
+
+
+def _text(v: Any) -> Optional[str]:
+    if v is None:
+        return None
+    return v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+
+
+def _effects(parsed: Any) -> Iterable[tuple]:
+    for e in parsed or []:
+        if isinstance(e, dict) and e.get("type"):
+            yield str(e["type"]), _real(e.get("value"))
+
+
+def table_rows(dbx: Dict[str, Any], conflicts: Sequence[Dict[str, Any]] = ()) -> Dict[str, List[tuple]]:
+    """{table: rows}, in SCHEMA column order."""
+    mods = dbx.get("modules") or {}
+    rows: Dict[str, List[tuple]] = {t: [] for t in ("meta", "characters", "character_weapons", "weapons", "skills", "hits",
+                                                    "multipliers", "potentials", "skill_effects", "potential_effects", "conflicts")}
+    rows["meta"] = [("format", str(SQLITE_FORMAT)), ("schema_version", _text(dbx.get("schema_version"))),
+                    ("generated_at", _text(dbx.get("generated_at")))]
+    for cid, c in (mods.get("characters") or {}).items():
+        rows["characters"].append((cid, c.get("name"), c.get("description"), c.get("image_url")))
+        for pos, wt in enumerate(dict.fromkeys(str(t) for t in c.get("weapon_types") or [])):
+            rows["character_weapons"].append((cid, wt, pos))
+        for wt, tiers in (c.get("potential_by_weapon") or {}).items():
+            for t in tiers or []:
+                pid = len(rows["potentials"]) + 1
+                rows["potentials"].append((pid, cid, wt, _int(t.get("tier")), t.get("text")))
+                rows["potential_effects"] += [(pid, kind, value) for kind, value in _effects(t.get("parsed_effects"))]
+    for wid, w in (mods.get("weapons") or {}).items():
+        raw = w.get("substat_value")
+        rows["weapons"].append((wid, w.get("name"), w.get("weapon_type"), _real(w.get("equipment_attack")), w.get("substat_name"),
+                                substat_value(raw) if raw is not None else None, _text(raw), w.get("passive_text"), w.get("image_url")))
+    for sid, sk in (mods.get("skills") or {}).items():
+        rows["skills"].append((sid, sk.get("character_id"), sk.get("weapon_type"), _int(sk.get("slot")), sk.get("name"), sk.get("type"),
+                               _text(sk.get("key")), _real(sk.get("cooldown_sec")), sk.get("description"),
+                               _real(sk.get("parsed_multiplier_pct")), _int(sk.get("parsed_hits")), sk.get("parsed_scaling"),
+                               _real(sk.get("confidence_score"))))
+        for h in sk.get("hits") or []:
+            if isinstance(h, dict):
+                rows["hits"].append((sid, _int(h.get("hit")), _real(h.get("multiplier_pct")), h.get("scaling")))
+        for pos, m in enumerate(sk.get("multipliers") or []):
+            if isinstance(m, dict):
+                rows["multipliers"].append((sid, pos, _real(m.get("value_pct")), m.get("scaling"), m.get("context")))
+        rows["skill_effects"] += [(sid, kind, value) for kind, value in _effects(sk.get("parsed_effects"))]
+    for c in conflicts:
+        rows["conflicts"].append((c.get("module"), c.get("id"), c.get("field"), _text(c.get("a")), _text(c.get("b")),
+                                  _text(c.get("sources"))))
+    return rows
+
+
+def export_sqlite(dbx: Dict[str, Any], path: Path = DB_SQLITE, conflicts: Sequence[Dict[str, Any]] = ()) -> Dict[str, int]:
+    """Write the SQLite file (atomically, one transaction). Returns {table: row count}."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = table_rows(dbx, conflicts)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        os.chmod(tmp, 0o644)
+        con = sqlite3.connect(tmp, isolation_level=None)
+        try:
+            # a fresh temp file: no rollback journal needed, the rename is the commit point
+            con.execute("PRAGMA journal_mode=OFF")
+            con.execute("PRAGMA synchronous=OFF")
+            con.execute("BEGIN")
+            for stmt in filter(str.strip, SCHEMA.split(";\n")):
+                con.execute(stmt)
+            for table, values in rows.items():
+                if values:
+                    con.executemany(f"INSERT INTO {table} VALUES ({','.join('?' * len(values[0]))})", values)
+            for stmt in filter(str.strip, INDEXES.split(";\n")):
+                con.execute(stmt)
+            con.execute("COMMIT")
+            con.execute("ANALYZE")
+        finally:
+            con.close()
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return {table: len(values) for table, values in rows.items()}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("db", nargs="?", type=Path, default=DB_JSON)
+    ap.add_argument("--out", type=Path, default=DB_SQLITE)
+    ap.add_argument("--sql", default=None, help="Query to run on the exported file (default: best Ultimate per weapon type).")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    counts = export_sqlite(json.loads(args.db.read_text(encoding="utf-8")), args.out)
+    print(f"{args.out} ({args.out.stat().st_size // 1024} KB, {1000 * (time.perf_counter() - t0):.0f} ms): "
+          + ", ".join(f"{t} {n}" for t, n in counts.items() if t != "meta"))
+    con = sqlite3.connect(f"file:{args.out}?mode=ro", uri=True)
+    try:
+        cur = con.execute(args.sql or TOP_ULTIMATES_SQL)
+    except sqlite3.Error as e:
+        print(f"SQL error: {e}", file=sys.stderr)
+        return 1
+    cols = [d[0] for d in cur.description or []]
+    print(" | ".join(cols))
+    for row in cur:
+        print(" | ".join("" if v is None else str(v) for v in row))
+    con.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Stat-scaling and boss-level sweeps
+
+Batch version of "Impact des stats" (runScaling(): DPS vs Δ% on one stat) and "Boss scaling
+infini" (runBossScaling(): DPS / TTK vs boss level) of src/app.js, in "expected" mode, over full
+grids (stat x Δ% x boss level) for one or more formula profiles:
+
+- schedule      simulateOnce() without the damage: timeline or priority rotation, cooldowns,
+                orbs, tag gauge and Burst windows. None of it depends on the build or the enemy,
+                so it runs once per (rotation, profile) and reduces to a cast count per
+                (action, Burst on/off)
+- damage        tools/damage_engine.py over every (stat variant, cast action, boss level) in one
+                batch; DPS = sum(casts x expected damage) / duration, TTK = boss HP / DPS
+- variants      scaled_build(): stat x (1 + Δ%/100), ATK from 100 when the build has none
+                (runScaling()); boss_enemy(): DEF and HP grow linearly with the level on top of
+                the scenario enemy (runBossScaling(), same defaults)
+- jobs          one per (build, profile, stat); batches of POOL_MIN_JOBS jobs or more fan out
+                over a process pool (same fallback as parser_engine.parse_many())
+- roster        roster_cases(): every character of the DB (first weapon type, kit_rotation()
+                over its kit), swept across every profile of data/formula_profiles.js as one job
+
+Results are compact columnar tables (DPS rounded to DPS_DIGITS, first level past TTK_WALL_SEC
+per curve), written to data/sweeps.json (offline reference tables for the whole roster; the site
+computes its own curves for the selected build) or to a .js path defining window.__SWEEPS__, both
+with .gz/.br. Builds are swept as given (potentials are applied by the browser).
+
+CLI:
+  python tools/sweep_engine.py --roster [--levels 1:200:10] [--deltas -10:20:13] [--workers N] [--out data/sweeps.json]
+  python tools/sweep_engine.py [--build ID] [--rotation ID | --character NAME|ID] [--scenario ID] [--profile P ...]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+import damage_engine as de
+from artifacts import MIN_SEPARATORS, precompress
+from json_stream import write_json
+
+SWEEPS_FORMAT = 1
+SWEEPS_JSON = de.ROOT / "data" / "sweeps.json"
+SCALING_STATS = ("atk", "crit_rate_pct", "crit_dmg_pct", "dmg_bonus_pct")  # stat choices of "Impact des stats"
+DEFAULT_DURATION = 30.0
+DEFAULT_DELTAS = (-10.0, 20.0, 13)  # from %, to %, points
+DEFAULT_LEVELS = (1, 200, 1)  # from, to, step
+ROSTER_LEVELS = (1, 200, 10)  # keeps the roster table compact (DPS is smooth in the level)
+BOSS_DEFAULTS = {"def_base": 1200.0, "def_per": 35.0, "hp_base": 500000.0, "hp_per": 25000.0}
+TTK_WALL_SEC = 300.0
+IDLE_DT = 0.25
+MAX_ORBS = 7
+KIT_ORDER = ("ultimate", "tag", "skill", "normal")
+KIT_DEFAULT_CD = {"ultimate": 30, "tag": 8, "skill": 8}  # addRotAction() defaults, for records without cooldown
+POOL_MIN_JOBS = 8
+DPS_DIGITS = 1
+
+
+# ---------------------------------------------------------------------------
+# Grid
+
+def delta_pcts(from_pct: float, to_pct: float, steps: int) -> List[float]:
+    """runScaling() points: `steps` evenly spaced Δ% from from_pct to to_pct."""
+    steps = max(1, int(steps))
+    return [from_pct + (to_pct - from_pct) * (0 if steps == 1 else i / (steps - 1)) for i in range(steps)]
+
+
+def scaled_build(build: Mapping[str, Any], stat: str, pct: float) -> Dict[str, Any]:
+    b = copy.deepcopy(dict(build))
+    b["stats"] = dict(b.get("stats") or {})
+    v0 = b["stats"].get(stat) or 0
+    if stat == "atk":
+        b["stats"]["atk"] = (100 if v0 == 0 else v0) * (1 + pct / 100)
+    else:
+        b["stats"][stat] = v0 * (1 + pct / 100)
+    return b
+
+
+def boss_enemy(base: Mapping[str, Any], level: int, boss: Optional[Mapping[str, float]] = None) -> Dict[str, Any]:
+    """Scenario enemy at a boss level (burst_resist, dmg_reduction_pct... kept)."""
+    boss = {**BOSS_DEFAULTS, **(boss or {})}
+    return {**base, "def": boss["def_base"] + (level - 1) * boss["def_per"],
+            "hp": boss["hp_base"] + (level - 1) * boss["hp_per"]}
+
+
+@dataclass
+class SweepGrid:
+    stats: Tuple[str, ...] = SCALING_STATS
+    deltas: List[float] = field(default_factory=lambda: delta_pcts(*DEFAULT_DELTAS))
+    levels: List[int] = field(default_factory=lambda: list(range(DEFAULT_LEVELS[0], DEFAULT_LEVELS[1] + 1, DEFAULT_LEVELS[2])))
+    boss: Dict[str, float] = field(default_factory=lambda: dict(BOSS_DEFAULTS))
+    duration: float = DEFAULT_DURATION
+
+    def hp(self) -> np.ndarray:
+        boss = {**BOSS_DEFAULTS, **self.boss}
+        return boss["hp_base"] + (np.asarray(self.levels, dtype=float) - 1) * boss["hp_per"]
+
+    def shape(self) -> Tuple[int, int, int]:
+        return len(self.stats), len(self.deltas), len(self.levels)
+
+
+# ---------------------------------------------------------------------------
+# Rotation schedule (simulateOnce())
+
+def rotation_actions(rot: Mapping[str, Any]) -> List[Mapping[str, Any]]:
+    return list((rot.get("timeline") if rot.get("type") == "timeline" else rot.get("actions")) or [])
+
+
+def resolve_skill(action: Mapping[str, Any], kit: Sequence[Mapping[str, Any]]) -> Optional[Mapping[str, Any]]:
+    """resolveSkillForAction(): kit[skill_index], kit being getSkillsForCharacter() (normalize_skill() records)."""
+    si = action.get("skill_index")
+    if si is None or isinstance(si, bool):
+        return None
+    i = de.js_num(si, math.nan)
+    return kit[int(i)] if i.is_integer() and 0 <= i < len(kit) else None
+
+
+def cooldown_key(a: Mapping[str, Any]) -> str:
+    base = a.get("label") or a.get("kind") or "skill"
+    si = a.get("skill_index")
+    return f"{base}#{si}" if si is not None else base
+
+
+def _cooldown_sec(a: Mapping[str, Any], ctx: Mapping[str, Any]) -> float:
+    cd = de._num(a, "cd", math.nan)
+    if math.isfinite(cd) and cd > 0:
+        return cd
+    sk_cd = de._num(ctx["skill"], "cooldown_sec", math.nan) if ctx["skill"] else math.nan
+    return sk_cd if math.isfinite(sk_cd) and sk_cd > 0 else 0.0
+
+
+def _cast_time_sec(a: Mapping[str, Any], ctx: Mapping[str, Any], settings: Mapping[str, Any]) -> float:
+    v = de._num(a, "cast_time", math.nan)
+    if math.isfinite(v) and v > 0:
+        return v
+    kind = ctx["kind"] or a.get("kind") or "skill"
+    default = {"ultimate": 1.0, "normal": 0.4, "tag": 0.7, "wait": 0.2}.get(kind, 0.6)
+    key = f"cast_time_{kind}" if kind in ("ultimate", "normal", "tag", "wait") else "cast_time_skill"
+    return max(0.05, de._num(settings, key, default))
+
+
+def schedule(rot: Mapping[str, Any], settings: Mapping[str, Any], duration: float,
+             ctxs: Sequence[Mapping[str, Any]]) -> List[Tuple[int, bool]]:
+    """
+    Casts of simulateOnce(), in order: (index into rotation_actions(rot), Burst active).
+    ctxs[i] is action_context() of action i.
+    """
+    actions = rotation_actions(rot)
+    plan = rot.get("burstPlan") or {}
+    mode = settings.get("burst_mode") or "auto"
+    res = {"orbs": settings.get("initial_orbs") or 0, "gauge": settings.get("initial_tag_gauge") or 0, "burst_until": 0.0}
+    cds: Dict[str, float] = {}
+    casts: List[Tuple[int, bool]] = []
+
+    def burst_active(t: float) -> bool:
+        if mode == "on":
+            return True
+        if mode == "off":
+            return False
+        if plan.get("enabled"):
+            start = de._num(plan, "start", 0)
+            return start <= t < start + max(0.0, de._num(plan, "duration", 0))
+        return t < res["burst_until"]
+
+    def trigger_burst(t: float) -> None:
+        dur = max(0.0, de._num(settings, "burst_duration_sec", 7))
+        if dur > 0:
+            res["burst_until"] = max(res["burst_until"] or 0, t + dur)
+
+    def update_resources(a: Mapping[str, Any], ctx: Mapping[str, Any], t: float) -> None:
+        kind, req = ctx["kind"], de._num(a, "requiresOrbs", 0)
+        if kind == "ultimate":
+            if req > 0:
+                res["orbs"] = max(0, res["orbs"] - req)
+        elif kind not in ("wait", "passive"):
+            res["orbs"] = min(MAX_ORBS, res["orbs"] + (settings.get("orb_gain_per_skill") or 0))
+        gain = max(0.0, de._num(settings, "tag_gauge_gain_per_hit", 0))
+        if gain > 0 and kind not in ("wait", "passive"):
+            res["gauge"] = max(0.0, de.js_num(res["gauge"], 0)) + ctx["hits"] * gain
+        if settings.get("combined_attack_triggers_burst") and kind == "tag":
+            trigger_burst(t)
+            res["gauge"] = 0
+            return
+        if mode == "auto" and not plan.get("enabled"):
+            if de.js_num(res["gauge"], 0) >= max(1.0, de._num(settings, "burst_gauge_threshold", 1000)):
+                trigger_burst(t)
+                res["gauge"] = 0
+
+    def execute(i: int, t: float) -> Optional[float]:
+        """executeAction(): cast time, or None when on cooldown / short of orbs."""
+        a, ctx = actions[i], ctxs[i]
+        if ctx["kind"] == "wait":
+            return max(0.05, de._num(a, "cd", 1))
+        key = cooldown_key(a)
+        if t < cds.get(key, 0):
+            return None
+        req = de._num(a, "requiresOrbs", 0)
+        if req > 0 and res["orbs"] < req:
+            return None
+        casts.append((i, bool(a.get("burstEligible")) and burst_active(t)))
+        update_resources(a, ctx, t)
+        cds[key] = t + max(0.0, _cooldown_sec(a, ctx))
+        return _cast_time_sec(a, ctx, settings)
+
+    if rot.get("type") == "timeline":
+        period = rot.get("period")
+        period = duration if period is None else period
+        if not period > 0:
+            raise ValueError(f"timeline rotation {rot.get('id')!r}: period must be > 0")
+        loop = rot.get("loop")
+        loops = math.ceil(duration / period) if (True if loop is None else loop) else 1
+        events = [((ev.get("t") or 0) + k * period, i) for k in range(loops) for i, ev in enumerate(actions)]
+        events = sorted((e for e in events if e[0] <= duration + 1e-9), key=lambda e: e[0])
+        for t, i in events:
+            if t > duration:
+                break
+            execute(i, t)
+        return casts
+
+    t = 0.0
+    while t <= duration + 1e-9:
+        dt, soon, wait = None, math.inf, None
+        for i, a in enumerate(actions):
+            if (a.get("kind") or "skill") == "wait" and wait is None:
+                wait = i
+                continue
+            ready_at = cds.get(cooldown_key(a), 0)
+            if t < ready_at < soon:
+                soon = ready_at
+            req = de._num(a, "requiresOrbs", 0)
+            if t >= ready_at and (req <= 0 or res["orbs"] >= req):
+                dt = execute(i, t)
+                if dt is not None:
+                    break
+        if dt is None and wait is not None:
+            dt = execute(wait, t)
+        if dt is not None:
+            t += dt
+        else:
+            t = min(soon, t + IDLE_DT) if t < soon < math.inf else t + IDLE_DT
+    return casts
+
+
+def cast_counts(casts: Sequence[Tuple[int, bool]], n_actions: int) -> np.ndarray:
+    """(actions, 2 = Burst off/on) cast counts."""
+    counts = np.zeros((n_actions, 2))
+    for i, burst in casts:
+        counts[i, int(burst)] += 1
+    return counts
+
+
+def kit_rotation(kit: Sequence[Mapping[str, Any]], character_id: Optional[str] = None,
+                 weapon_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Default priority rotation over a kit (getSkillsForCharacter() order): ultimate (7 orbs), tag,
+    skills, then normal attacks, every damaging record once by skill_index, all Burst-eligible.
+    Record cooldowns apply; records without one get the addRotAction() cooldown, except normal
+    attacks (filler). Passives and adventure (exploration) skills are left out.
+    """
+    actions = []
+    for kind in KIT_ORDER:
+        for i, sk in enumerate(kit):
+            ctx = de.action_context(None, sk)
+            if ctx["kind"] != kind or "adventure" in str(sk.get("type") or "").lower():
+                continue
+            if not any(ctx["hit_mults"] or [ctx["mult"]]):
+                continue
+            a: Dict[str, Any] = {"kind": kind, "label": sk.get("name") or f"Skill {i}", "skill_index": i, "burstEligible": True}
+            if _cooldown_sec({}, ctx) <= 0 and kind in KIT_DEFAULT_CD:
+                a["cd"] = KIT_DEFAULT_CD[kind]
+            if kind == "ultimate":
+                a["requiresOrbs"] = MAX_ORBS
+            actions.append(a)
+    return {"id": f"kit.{character_id}", "name": "Kit (priorité auto)", "type": "priority",
+            "character_id": character_id, "weapon_type": weapon_type, "actions": actions}
+
+
+# ---------------------------------------------------------------------------
+# Sweeps
+
+@dataclass
+class CastPlan:
+    """A scheduled rotation as damage rows: one SkillTable row per cast (action, Burst) pair."""
+    table: de.SkillTable
+    burst: np.ndarray  # bool per row
+    casts: np.ndarray  # casts per row
+    duration: float
+
+    def dps(self, engine: de.DamageEngine, builds: de.BuildTable, enemies: de.EnemyTable) -> np.ndarray:
+        """Expected DPS for every (build, enemy): array of shape (builds, enemies)."""
+        if not len(self.table):
+            return np.zeros((len(builds), len(enemies)))
+        b, k, e = np.meshgrid(np.arange(len(builds)), np.arange(len(self.table)), np.arange(len(enemies)), indexing="ij")
+        k = k.ravel()
+        dmg = engine.expected(builds, self.table, enemies, b.ravel(), k, e.ravel(), self.burst[k]).reshape(b.shape)
+        return np.einsum("bke,k->be", dmg, self.casts) / self.duration
+
+
+def cast_plan(rot: Mapping[str, Any], settings: Mapping[str, Any], duration: float,
+              kit: Sequence[Mapping[str, Any]] = ()) -> CastPlan:
+    actions = rotation_actions(rot)
+    ctxs = [de.action_context(a, resolve_skill(a, kit)) for a in actions]
+    counts = cast_counts(schedule(rot, settings, duration, ctxs), len(actions))
+    slots = np.argwhere(counts > 0)  # (cast action, Burst) pairs
+    return CastPlan(de.SkillTable.from_contexts([ctxs[i] for i in slots[:, 0]], settings),
+                    slots[:, 1].astype(bool), counts[slots[:, 0], slots[:, 1]], duration)
+
+
+def sweep_dps(build: Mapping[str, Any], rot: Mapping[str, Any], enemy: Mapping[str, Any], settings: Mapping[str, Any],
+              grid: SweepGrid, kit: Sequence[Mapping[str, Any]] = ()) -> np.ndarray:
+    """Expected DPS of one build / rotation / profile over the grid: array of shape grid.shape()."""
+    plan = cast_plan(rot, settings, grid.duration, kit)
+    builds = de.BuildTable.from_builds([scaled_build(build, s, p) for s in grid.stats for p in grid.deltas], settings)
+    enemies = de.EnemyTable.from_enemies([boss_enemy(enemy, lvl, grid.boss) for lvl in grid.levels], settings)
+    return plan.dps(de.DamageEngine(settings), builds, enemies).reshape(grid.shape())
+
+
+def ttk_wall(dps: np.ndarray, grid: SweepGrid, wall_sec: float = TTK_WALL_SEC) -> List[List[Optional[int]]]:
+    """First level of each (stat, Δ%) curve with TTK > wall_sec (runBossScaling() hint), None when none."""
+    with np.errstate(divide="ignore"):
+        ttk = np.where(dps > 0, grid.hp() / np.where(dps > 0, dps, 1), math.inf)
+    past = ttk > wall_sec
+    first = past.argmax(axis=-1)
+    levels = np.asarray(grid.levels)
+    return [[int(levels[f]) if p[f] else None for f, p in zip(fr, pr)] for fr, pr in zip(first, past)]
+
+
+@dataclass
+class SweepCase:
+    key: str
+    build: Dict[str, Any]
+    rotation: Dict[str, Any]
+    kit: List[Dict[str, Any]] = field(default_factory=list)  # normalize_skill() records the rotation indexes into
+    weapon_type: Optional[str] = None
+
+
+def _sweep_job(job: Tuple[Any, ...]) -> np.ndarray:
+    return sweep_dps(*job)
+
+
+def run_jobs(jobs: Sequence[Tuple[Any, ...]], workers: Optional[int] = None) -> List[np.ndarray]:
+    """sweep_dps(*job) for every job, in order; POOL_MIN_JOBS jobs or more go through a process pool."""
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    results: Optional[List[np.ndarray]] = None
+    if workers > 1 and len(jobs) >= POOL_MIN_JOBS:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                results = list(pool.map(_sweep_job, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+        except (OSError, RuntimeError) as e:  # no fork/semaphores in this environment, broken pool
+            print(f"[WARN] sweep: process pool unavailable, sweeping in-process: {e}", file=sys.stderr)
+    if results is None:
+        results = [_sweep_job(j) for j in jobs]
+    return results
+
+
+def sweep_cases(cases: Sequence[SweepCase], enemy: Mapping[str, Any], grid: SweepGrid,
+                profiles: Optional[Sequence[str]] = None, workers: Optional[int] = None,
+                profile_defs: Optional[Dict[str, Any]] = None,
+                defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """{case key: {profile: DPS of shape grid.shape()}}; profiles default to every formula profile."""
+    profile_defs = profile_defs if profile_defs is not None else de.load_formula_profiles()
+    defaults = defaults if defaults is not None else de.load_site_defaults()
+    names = list(profile_defs) if profiles is None else list(profiles)
+    settings = {p: de.profile_settings(p, profile_defs, defaults) for p in names}
+    jobs, keys = [], []
+    for case in cases:
+        for p in names:
+            for stat in grid.stats:
+                jobs.append((case.build, case.rotation, dict(enemy), settings[p], replace(grid, stats=(stat,)), case.kit))
+                keys.append((case.key, p))
+    out: Dict[str, Dict[str, List[np.ndarray]]] = {}
+    for (key, p), dps in zip(keys, run_jobs(jobs, workers)):
+        out.setdefault(key, {}).setdefault(p, []).append(dps[0])
+    return {key: {p: np.stack(v) for p, v in by_p.items()} for key, by_p in out.items()}
+
+
+def roster_cases(dbx: Mapping[str, Any], build: Mapping[str, Any],
+                 character_ids: Optional[Sequence[str]] = None) -> List[SweepCase]:
+    """One case per character of the DB (or of character_ids): `build` on its first weapon type, with kit_rotation()."""
+    mods = dbx.get("modules") or {}
+    skills = list((mods.get("skills") or {}).values())
+    cases, skipped = [], []
+    for cid, ch in (mods.get("characters") or {}).items():
+        if character_ids is not None and cid not in character_ids:
+            continue
+        wt = next(iter(ch.get("weapon_types") or []), None)
+        kit = [de.normalize_skill(sk) for sk in de.select_skills(skills, cid, wt)]
+        rot = kit_rotation(kit, cid, wt)
+        if not rot["actions"]:
+            skipped.append(str(ch.get("name") or cid))
+            continue
+        cases.append(SweepCase(cid, {**build, "character_id": cid, "weapon_type": wt}, rot, kit, wt))
+    if skipped:
+        print(f"[WARN] sweep: no damaging skill in the DB for {len(skipped)} character(s), skipped: {', '.join(skipped)}",
+              file=sys.stderr)
+    return cases
+
+
+def sweep_table(results: Mapping[str, Mapping[str, np.ndarray]], cases: Sequence[SweepCase], grid: SweepGrid,
+                enemy: Mapping[str, Any], build: Mapping[str, Any], profile_defs: Mapping[str, Any],
+                generated_at: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Columnar result document: shared axes once, then per case {"weapon_type", "rotation" (action
+    labels, priority order), "dps": {profile: [stat][Δ%][level]}, "wall": {profile: [stat][Δ%]}}.
+    TTK at a level is grid HP (boss) / DPS.
+    """
+    by_key = {c.key: c for c in cases}
+    return {
+        "format": SWEEPS_FORMAT,
+        "generated_at": generated_at,
+        "duration": grid.duration,
+        "stats": list(grid.stats),
+        "deltas_pct": [round(p, 6) for p in grid.deltas],
+        "levels": list(grid.levels),
+        "boss": {**BOSS_DEFAULTS, **grid.boss},
+        "ttk_wall_sec": TTK_WALL_SEC,
+        "build": dict(build),
+        "enemy": dict(enemy),
+        "profiles": {p: (profile_defs.get(p) or {}).get("label") or p for p in next(iter(results.values()), {})},
+        "results": {
+            key: {
+                "weapon_type": by_key[key].weapon_type,
+                "rotation": [a.get("label") or a.get("kind") for a in rotation_actions(by_key[key].rotation)],
+                "dps": {p: np.round(dps, DPS_DIGITS).tolist() for p, dps in by_profile.items()},
+                "wall": {p: ttk_wall(dps, grid) for p, dps in by_profile.items()},
+            }
+            for key, by_profile in results.items()
+        },
+    }
+
+
+def write_sweeps(table: Dict[str, Any], path: Path = SWEEPS_JSON) -> Dict[str, int]:
+    """Minified .json, or a .js script defining window.__SWEEPS__; .gz/.br next to it."""
+    if path.suffix == ".js":
+        write_json(path, table, separators=MIN_SEPARATORS,
+                   prefix="// Auto-generated. Do not edit.\nwindow.__SWEEPS__=", suffix=";\n")
+    else:
+        write_json(path, table, separators=MIN_SEPARATORS)
+    return precompress(path)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+
+def _find(items: Sequence[Mapping[str, Any]], key: Optional[str], what: str) -> Mapping[str, Any]:
+    if key is None:
+        return items[0]
+    for it in items:
+        if key in (it.get("id"), it.get("name")):
+            return it
+    raise SystemExit(f"Unknown {what}: {key}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", type=Path, default=de.DB_JSON)
+    ap.add_argument("--roster", action="store_true", help="Every character of the DB (kit rotation) x every profile.")
+    ap.add_argument("--build", default=None, help="Build id/name of the site defaults (default: first).")
+    ap.add_argument("--rotation", default=None, help="Rotation id/name of the site defaults (default: first).")
+    ap.add_argument("--character", default=None, help="Sweep the kit rotation of this character (id or name).")
+    ap.add_argument("--scenario", default=None, help="Scenario whose enemy the boss levels start from (default: first).")
+    ap.add_argument("--profile", action="append", default=None, help="Formula profile (repeatable; default: all).")
+    ap.add_argument("--stats", default=",".join(SCALING_STATS))
+    ap.add_argument("--deltas", default=":".join(str(x) for x in DEFAULT_DELTAS), help="from%%:to%%:points")
+    ap.add_argument("--levels", default=None, help="first:last[:step] (default 1:200, every 10 levels with --roster)")
+    ap.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    ap.add_argument("--workers", type=int, default=None, help="Processes (default: cpu count; 0/1 = in-process).")
+    ap.add_argument("--out", type=Path, default=None, help=f"Result table (.js or .json; --roster default: {SWEEPS_JSON.relative_to(de.ROOT)}).")
+    args = ap.parse_args()
+
+    d_from, d_to, d_steps = (float(x) for x in args.deltas.split(":"))
+    lv = [int(x) for x in args.levels.split(":")] + [1] if args.levels else list(ROSTER_LEVELS if args.roster else DEFAULT_LEVELS)
+    grid = SweepGrid(stats=tuple(s for s in args.stats.split(",") if s), deltas=delta_pcts(d_from, d_to, int(d_steps)),
+                     levels=list(range(lv[0], lv[1] + 1, max(1, lv[2]))), duration=max(1.0, args.duration))
+    defaults = de.load_site_defaults()
+    profile_defs = de.load_formula_profiles()
+    for p in args.profile or []:
+        if p not in profile_defs:
+            raise SystemExit(f"Unknown formula profile: {p} (known: {', '.join(profile_defs)})")
+    build = _find(defaults["builds"], args.build, "build")
+    enemy = _find(defaults["scenarios"], args.scenario, "scenario").get("enemy") or {}
+
+    dbx: Dict[str, Any] = {}
+    if args.roster or args.character:
+        dbx = json.loads(args.db.read_text(encoding="utf-8"))
+    if args.roster:
+        cases = roster_cases(dbx, build)
+    elif args.character:
+        chars = list(((dbx.get("modules") or {}).get("characters") or {}).values())
+        ch = _find(chars, args.character, "character")
+        cases = roster_cases(dbx, build, [ch["id"]])
+    else:
+        rot = _find(defaults["rotations"], args.rotation, "rotation")
+        cases = [SweepCase(str(build.get("id")), dict(build), dict(rot))]
+
+    t0 = time.perf_counter()
+    results = sweep_cases(cases, enemy, grid, args.profile, args.workers, profile_defs, defaults)
+    dt = time.perf_counter() - t0
+    n = len(cases) * len(next(iter(results.values()), {})) * int(np.prod(grid.shape()))
+    print(f"{len(cases)} case(s) x {len(args.profile or profile_defs)} profile(s) x {len(grid.stats)} stats x "
+          f"{len(grid.deltas)} Δ% x {len(grid.levels)} levels = {n} points in {dt:.2f} s")
+
+    table = sweep_table(results, cases, grid, enemy, build, profile_defs, dbx.get("generated_at"))
+    if not args.roster:
+        i0 = int(np.argmin(np.abs(np.asarray(grid.deltas))))
+        for key, by_profile in results.items():
+            for p, dps in by_profile.items():
+                walls = table["results"][key]["wall"][p]
+                print(f"{key} · {p}: L{grid.levels[0]} {dps[0, i0, 0]:.1f} DPS · L{grid.levels[-1]} {dps[0, i0, -1]:.1f} DPS · "
+                      f"TTK>{TTK_WALL_SEC:.0f}s from L{walls[0][i0] if walls[0][i0] is not None else '—'}")
+                for s, stat in enumerate(grid.stats):
+                    best = int(np.argmax(dps[s, :, 0]))
+                    print(f"    {stat:14} Δ{grid.deltas[0]:+.0f}% {dps[s, 0, 0]:10.1f}  Δ{grid.deltas[-1]:+.0f}% {dps[s, -1, 0]:10.1f}  "
+                          f"best Δ{grid.deltas[best]:+.1f}%")
+    out = args.out or (SWEEPS_JSON if args.roster else None)
+    if out is not None:
+        sizes = write_sweeps(table, out)
+        print(f"Wrote {out} ({', '.join(f'{k} {v / 1024:.0f} KiB' for k, v in sizes.items())})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
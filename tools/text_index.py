@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Brave Hearts — Full-text index
+
+Inverted index over the free text of the DB, so "which kits mention ignore DEF / true damage /
+this buff" is answered from data/text_index.json alone instead of scanning data/db.json:
+
+- documents    skill descriptions (modules.skills), potential tiers (potential_by_weapon of each
+               character) and weapon passives (modules.weapons passive_text), numbered in that order
+- tokens       lowercase words / numbers of the text ("ignore", "def", "30", "6.3"), with their
+               positions for phrase queries, plus one "effect:<type>" token per parsed effect
+               (parsed_effects of tools/parser_engine.py, parsed here when the DB has none)
+- postings     per term: number of documents, then per document the gap to the previous document
+               id, the term frequency and the gaps between positions, all as LEB128 varints,
+               base64 in the JSON (gzip/brotli copies next to it); decoded lazily, per term
+
+Query syntax (TextIndex.search()): words are ANDed, OR (or |) separates alternatives, AND is
+optional, "double quotes" make a phrase, effect:<type> matches a parsed effect. A word that
+tokenizes into several tokens ("anti-air") is a phrase.
+  ignore def                       both words, anywhere in the text
+  "true damage" OR effect:true_damage
+  "crit damage" "attack increase"
+
+Written by tools/update_db.py (build_text_index()).
+
+CLI:
+  python tools/text_index.py '"ignore def" OR effect:ignore_def_pct' [--kind skill] [--index data/text_index.json]
+  python tools/text_index.py --build [data/db.json]      # (re)build the index from a DB
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from artifacts import MIN_SEPARATORS, precompress
+from json_stream import write_json
+from parser_engine import parse_many
+
+ROOT = Path(__file__).resolve().parents[1]
+DB_JSON = ROOT / "data" / "db.json"
+TEXT_INDEX_JSON = ROOT / "data" / "text_index.json"
+TEXT_INDEX_FORMAT = 1
+DOC_KINDS = ("skill", "potential", "weapon")
+EFFECT_PREFIX = "effect:"
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+QUERY_RE = re.compile(r'"([^"]*)"?|(\S+)')
+OR_WORDS = ("OR", "|")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def encode_varints(values: Iterable[int], out: bytearray) -> None:
+    for v in values:
+        while v >= 0x80:
+            out.append((v & 0x7F) | 0x80)
+            v >>= 7
+        out.append(v)
+
+
+def decode_postings(data: bytes) -> Tuple[List[int], List[List[int]]]:
+    """(document ids, positions per document) of one encoded posting list."""
+    vals: List[int] = []
+    v = shift = 0
+    for b in data:
+        v |= (b & 0x7F) << shift
+        if b & 0x80:
+            shift += 7
+        else:
+            vals.append(v)
+            v = shift = 0
+    docs: List[int] = []
+    positions: List[List[int]] = []
+    i, doc = 1, 0
+    for _ in range(vals[0]):
+        doc += vals[i]
+        tf = vals[i + 1]
+        pos, p = [], 0
+        for gap in vals[i + 2:i + 2 + tf]:
+            p += gap
+            pos.append(p)
+        docs.append(doc)
+        positions.append(pos)
+        i += 2 + tf
+    return docs, positions
+
+
+def _effect_types(parsed: Any) -> List[str]:
+    return [str(e["type"]) for e in parsed or [] if isinstance(e, dict) and e.get("type")]
+
+
+def collect_documents(dbx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Index documents: {kind, id, character_id, weapon_type, label, text, effects}, in document id order."""
+    mods = dbx.get("modules") or {}
+    chars = mods.get("characters") or {}
+    docs: List[Dict[str, Any]] = []
+    for sk in (mods.get("skills") or {}).values():
+        docs.append({"kind": "skill", "id": sk.get("id"), "character_id": sk.get("character_id"), "weapon_type": sk.get("weapon_type"),
+                     "label": sk.get("name"), "text": sk.get("description"), "parsed": sk.get("parsed_effects")})
+    for cid, ch in chars.items():
+        for wt, tiers in (ch.get("potential_by_weapon") or {}).items():
+            for t in tiers or []:
+                docs.append({"kind": "potential", "id": cid, "character_id": cid, "weapon_type": wt,
+                             "label": f"{ch.get('name') or cid} · {wt} · tier {t.get('tier')}", "text": t.get("text"),
+                             "parsed": t.get("parsed_effects")})
+    for w in (mods.get("weapons") or {}).values():
+        docs.append({"kind": "weapon", "id": w.get("id"), "character_id": None, "weapon_type": w.get("weapon_type"),
+                     "label": w.get("name"), "text": w.get("passive_text"), "parsed": []})
+    # records of a DB built before the parser enrichment: parse their text here
+    for kind in ("skill", "potential"):
+        todo = [d for d in docs if d["kind"] == kind and d["parsed"] is None]
+        for d, res in zip(todo, parse_many([d["text"] for d in todo], kind=kind, workers=0)):
+            d["parsed"] = res.get("parsed_effects")
+    for d in docs:
+        d["effects"] = list(dict.fromkeys(_effect_types(d.pop("parsed"))))
+    return docs
+
+
+def build_text_index(dbx: Dict[str, Any]) -> Dict[str, Any]:
+    """{"format", "generated_at", "docs": {column: [...]}, "terms": {term: [df, postings]}}, terms sorted."""
+    docs = collect_documents(dbx)
+    postings: Dict[str, List[Tuple[int, List[int]]]] = {}
+    for doc_id, d in enumerate(docs):
+        tokens = tokenize(d["text"])
+        # effect tokens after the text, one position apart from it so no phrase spans both
+        tokens += [""] + [EFFECT_PREFIX + e for e in d["effects"]] if d["effects"] else []
+        seen: Dict[str, List[int]] = {}
+        for pos, tok in enumerate(tokens):
+            if tok:
+                seen.setdefault(tok, []).append(pos)
+        for tok, pos in seen.items():
+            postings.setdefault(tok, []).append((doc_id, pos))
+    terms: Dict[str, List[Any]] = {}
+    for tok in sorted(postings):
+        plist = postings[tok]
+        buf = bytearray()
+        encode_varints([len(plist)], buf)
+        prev = 0
+        for doc_id, pos in plist:
+            encode_varints([doc_id - prev, len(pos)], buf)
+            encode_varints([p - q for p, q in zip(pos, [0] + pos[:-1])], buf)
+            prev = doc_id
+        terms[tok] = [len(plist), base64.b64encode(bytes(buf)).decode("ascii")]
+    return {
+        "format": TEXT_INDEX_FORMAT,
+        "generated_at": dbx.get("generated_at"),
+        "docs": {col: [d[col] for d in docs] for col in ("kind", "id", "character_id", "weapon_type", "label")},
+        "terms": terms,
+    }
+
+
+def write_text_index(index: Dict[str, Any], path: Path = TEXT_INDEX_JSON) -> None:
+    write_json(path, index, separators=MIN_SEPARATORS)
+    precompress(path)
+
+
+class TextIndex:
+    """Read side of data/text_index.json: posting lists are decoded on first use and kept."""
+
+    def __init__(self, index: Dict[str, Any]):
+        if index.get("format") != TEXT_INDEX_FORMAT:
+            raise ValueError(f"text index format {index.get('format')!r}, expected {TEXT_INDEX_FORMAT}")
+        self.docs = index["docs"]
+        self.terms = index["terms"]
+        self._cache: Dict[str, Tuple[List[int], List[List[int]]]] = {}
+
+    @classmethod
+    def load(cls, path: Path = TEXT_INDEX_JSON) -> "TextIndex":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def __len__(self) -> int:
+        return len(self.docs["kind"])
+
+    def postings(self, term: str) -> Tuple[List[int], List[List[int]]]:
+        hit = self._cache.get(term)
+        if hit is None:
+            entry = self.terms.get(term)
+            hit = self._cache[term] = decode_postings(base64.b64decode(entry[1])) if entry else ([], [])
+        return hit
+
+    def doc(self, doc_id: int) -> Dict[str, Any]:
+        return {col: values[doc_id] for col, values in self.docs.items()}
+
+    def phrase(self, tokens: Sequence[str]) -> List[int]:
+        """Documents where the tokens appear consecutively."""
+        if not tokens:
+            return []
+        lists = [self.postings(t) for t in tokens]
+        docs = set(lists[0][0])
+        for d, _ in lists[1:]:
+            docs.intersection_update(d)
+        if len(tokens) == 1 or not docs:
+            return sorted(docs)
+        out = []
+        where = [dict(zip(d, pos)) for d, pos in lists]
+        for doc_id in sorted(docs):
+            starts = set(where[0][doc_id])
+            for k, w in enumerate(where[1:], 1):
+                starts.intersection_update(p - k for p in w[doc_id])
+                if not starts:
+                    break
+            if starts:
+                out.append(doc_id)
+        return out
+
+    def search(self, query: str, kinds: Optional[Sequence[str]] = None) -> List[int]:
+        """Document ids matching the query (see the module docstring), ascending."""
+        hits: set = set()
+        for group in parse_query(query):
+            docs: Optional[set] = None
+            for tokens in sorted(group, key=lambda ts: min(self.terms.get(t, [0])[0] for t in ts)):
+                docs = set(self.phrase(tokens)) if docs is None else docs.intersection(self.phrase(tokens))
+                if not docs:
+                    break
+            hits |= docs or set()
+        kinds = set(kinds) if kinds else None
+        return [i for i in sorted(hits) if kinds is None or self.docs["kind"][i] in kinds]
+
+
+def parse_query(query: str) -> List[List[List[str]]]:
+    """OR groups of AND clauses; a clause is a token list (one token, or a phrase)."""
+    groups: List[List[List[str]]] = [[]]
+    for m in QUERY_RE.finditer(query):
+        quoted, word = m.group(1), m.group(2)
+        if word in OR_WORDS:
+            groups.append([])
+            continue
+        if word == "AND":
+            continue
+        if word is not None and word.lower().startswith(EFFECT_PREFIX):
+            tokens = [word.lower()]
+        else:
+            tokens = tokenize(quoted if quoted is not None else word)
+        if tokens:
+            groups[-1].append(tokens)
+    return [g for g in groups if g]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("query", nargs="?", default=None, help="Query (see the module docstring); with --build: the DB path.")
+    ap.add_argument("--index", type=Path, default=TEXT_INDEX_JSON)
+    ap.add_argument("--kind", action="append", choices=DOC_KINDS, default=None, help="Only these document kinds (repeatable).")
+    ap.add_argument("--limit", type=int, default=50, help="Documents printed (all are counted).")
+    ap.add_argument("--build", action="store_true", help="Build the index from a DB (default data/db.json) and write it.")
+    args = ap.parse_args()
+
+    if args.build:
+        db = Path(args.query) if args.query else DB_JSON
+        t0 = time.perf_counter()
+        index = build_text_index(json.loads(db.read_text(encoding="utf-8")))
+        write_text_index(index, args.index)
+        print(f"{len(index['docs']['kind'])} documents, {len(index['terms'])} terms -> {args.index} "
+              f"({args.index.stat().st_size // 1024} KB, {1000 * (time.perf_counter() - t0):.0f} ms)")
+        return 0
+    if not args.query:
+        ap.error("a query is required (or --build)")
+    if not args.index.exists():
+        print(f"No text index at {args.index} (python tools/text_index.py --build).", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    index = TextIndex.load(args.index)
+    t1 = time.perf_counter()
+    hits = index.search(args.query, args.kind)
+    t2 = time.perf_counter()
+    print(f"{len(hits)} of {len(index)} documents  (load {1000 * (t1 - t0):.2f} ms, query {1000 * (t2 - t1):.3f} ms)")
+    for i in hits[:args.limit]:
+        d = index.doc(i)
+        print(f"  {d['kind']:9} {str(d['id']):18} {str(d['weapon_type'] or ''):12} {d['label']}")
+    if len(hits) > args.limit:
+        print(f"  ... {len(hits) - args.limit} more")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
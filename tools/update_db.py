@@ -11,33 +11,70 @@ Optional secondary source (DISABLED by default):
 
 Outputs:
 - data/db.json (normalized, modular)
-- data/db_live.js (same DB embedded for the web app)
-- data/db_snapshots/<timestamp>.json (snapshot history)
-- data/db_diff_latest.json (diff between last two snapshots, if available)
+- data/db_live.js + data/live/*.js (same DB for the web app: small index script + content-hashed shards)
+- data/db.min.json(.gz/.br) + data/db_size_report.json (minified/precompressed artifacts, see tools/artifacts.py)
+- data/db_manifest.json (module -> {id: record hash} of this build, see tools/record_store.py)
+- data/skill_tables.json(.gz/.br) (per character / weapon type / formula profile skill tables, see tools/skill_tables.py)
+- data/text_index.json(.gz/.br) (inverted full-text index over skills, potentials and weapon passives, see tools/text_index.py)
+- data/db.sqlite with --sqlite (normalized tables + indexes for ad-hoc SQL, see tools/sqlite_export.py)
+- data/db_snapshots/db_<timestamp>.{base,delta}.json.gz (snapshot history, see tools/snapshot_store.py)
+- data/db_diff_latest.json (diff between last two snapshots with field-level paths, see tools/db_diff.py)
+- data/db_history/ (append-only columnar change history of every snapshot, see tools/history_table.py)
+
+Skills and potential tiers are enriched with tools/parser_engine.py output (parsed_* fields),
+memoized in .cache/parse/ by text hash + PARSER_VERSION.
 """
 from __future__ import annotations
 
 import argparse
+import gzip
 import hashlib
 import json
 import os
+import random
 import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from artifacts import MIN_SEPARATORS, artifact_names, is_precompressed, precompress, size_report
+from db_diff import diff_dbs, diff_snapshots
+from history_table import HISTORY_DIR, HistoryTable
+from json_stream import json_sha1, write_json
+from parser_engine import PARSER_VERSION, PotentialParser, SkillParser
+from record_store import Manifest, manifest_of
+from skill_tables import build_skill_tables
+from snapshot_store import SNAPSHOT_KEEP, SnapshotStore
+from sqlite_export import DB_SQLITE, export_sqlite
+from text_index import TEXT_INDEX_JSON, build_text_index, write_text_index
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
 SNAP_DIR = DATA_DIR / "db_snapshots"
 DB_JSON = DATA_DIR / "db.json"
 DB_LIVE_JS = DATA_DIR / "db_live.js"
 DB_DIFF_JSON = DATA_DIR / "db_diff_latest.json"
+DB_MANIFEST_JSON = DATA_DIR / "db_manifest.json"
+LIVE_DIR = DATA_DIR / "live"
+DB_MIN_JSON = DATA_DIR / "db.min.json"
+DB_SIZE_REPORT_JSON = DATA_DIR / "db_size_report.json"
+SKILL_TABLES_JSON = DATA_DIR / "skill_tables.json"
+HTTP_CACHE_DIR = ROOT / ".cache" / "http"
+PARSE_MEMO_PATH = ROOT / ".cache" / "parse" / "memo.json.gz"
+PAGE_HASHES_PATH = ROOT / ".cache" / "parse" / "page_hashes.json"
 
 GENSHIN_BASE = "https://genshin.gg"
 GENSHIN_CHAR_LIST = f"{GENSHIN_BASE}/7dso/"
@@ -49,6 +86,22 @@ SDSO_BASE = "https://7dsorigin.gg"
 USER_AGENT = "BraveHearts-7DSO-Theorycraft/1.0 (+https://github.com/)"
 TIMEOUT = 30
 
+# Fetch concurrency (see --workers / --per-host / --rate-limit)
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_RATE_LIMIT = 4.0  # request starts per second, per host (0 = unlimited)
+
+# Retries (see --retries): exponential backoff with jitter, Retry-After honoured
+DEFAULT_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_AFTER_MAX = 120.0
+
+# HTTP response cache (see --offline / --no-cache / --cache-*)
+DEFAULT_CACHE_MAX_MB = 200
+DEFAULT_CACHE_MAX_AGE_DAYS = 30
+
 WEAPON_TYPES = {
     "Axe","Book","Cudgel","Gauntlets","Lance","Rapier","Shield","Staff","Wand",
     "Dual Swords","Greatsword","Longsword","Grimoire","Nunchaku",
@@ -61,14 +114,315 @@ SKILL_TYPE_HINTS = {
 
 KEY_TOKENS = {"Left Click","Right Click","E","Q"}
 
+# Bump when page parsing changes its output: --incremental then re-parses every page once.
+PARSER_REV = "1"
+
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00","Z")
 
+class HostThrottle:
+    """
+    Polite per-host limiter shared by every fetch:
+    - at most `per_host` requests in flight per host
+    - request starts on a host spaced by 1/rate_limit seconds
+    Different hosts never wait on each other.
+    """
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, rate_limit: float = DEFAULT_RATE_LIMIT):
+        self.per_host = max(1, int(per_host))
+        self.interval = (1.0 / rate_limit) if rate_limit and rate_limit > 0 else 0.0
+        self._lock = threading.Lock()
+        self._sems: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    def _sem(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    @contextmanager
+    def slot(self, host: str):
+        sem = self._sem(host)
+        sem.acquire()
+        try:
+            if self.interval:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(host, 0.0))
+                    self._next_start[host] = start + self.interval
+                if start > now:
+                    time.sleep(start - now)
+            yield
+        finally:
+            sem.release()
+
+class HttpCache:
+    """
+    On-disk HTTP response cache keyed by URL.
+    One gzipped JSON entry per URL: {url, body, etag, last_modified, fetched_at}.
+    The file mtime is the "last used" time (refreshed on every hit / 304) and drives eviction.
+    """
+    def __init__(self, root: Path, max_bytes: int, max_age_sec: float):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+
+    def _path(self, url: str) -> Path:
+        return self.root / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json.gz")
+
+    def get(self, url: str) -> Optional[Dict[str,Any]]:
+        p = self._path(url)
+        try:
+            entry = json.loads(gzip.decompress(p.read_bytes()).decode("utf-8"))
+        except Exception:
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = {"url": url, "body": body, "etag": etag, "last_modified": last_modified, "fetched_at": utc_now_iso()}
+        data = gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), mtime=0)
+        # unique temp + atomic rename: concurrent workers never see a torn entry
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(url))
+
+    def touch(self, url: str) -> None:
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def evict(self) -> Tuple[int, int]:
+        """
+        Drop entries unused for longer than max_age, then least-recently-used entries
+        until the cache fits in max_bytes. Returns (entries_removed, bytes_removed).
+        """
+        if not self.root.exists():
+            return 0, 0
+        now = time.time()
+        entries = []
+        for p in self.root.glob("*.json.gz"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()  # oldest first
+        total = sum(e[1] for e in entries)
+        removed, removed_bytes = 0, 0
+        for mtime, size, p in entries:
+            too_old = self.max_age_sec > 0 and (now - mtime) > self.max_age_sec
+            too_big = self.max_bytes > 0 and total > self.max_bytes
+            if not (too_old or too_big):
+                continue
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            removed_bytes += size
+        return removed, removed_bytes
+
+class FetchStats:
+    """Thread-safe per-run network counters (printed at the end of the run)."""
+    FIELDS = ("requests", "not_modified", "cache_only", "retries", "failures", "wire_bytes", "body_bytes", "network_sec", "backoff_sec")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for f in self.FIELDS:
+            setattr(self, f, 0)
+
+    def add(self, **kw: float) -> None:
+        with self._lock:
+            for k, v in kw.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def as_dict(self) -> Dict[str,Any]:
+        with self._lock:
+            return {f: (round(getattr(self, f), 3) if f.endswith("_sec") else getattr(self, f)) for f in self.FIELDS}
+
+    def summary(self) -> str:
+        d = self.as_dict()
+        return (f"{d['requests']} requests ({d['not_modified']} not modified, {d['cache_only']} offline hits), "
+                f"{d['wire_bytes'] / 1024:.0f} KB on the wire / {d['body_bytes'] / 1024:.0f} KB decoded, "
+                f"{d['retries']} retries, {d['failures']} failures, "
+                f"{d['network_sec']:.2f}s in network, {d['backoff_sec']:.2f}s in backoff")
+
+def _accept_encoding() -> str:
+    # urllib3 only decodes brotli when a brotli module is importable
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+def make_session(pool_size: int) -> requests.Session:
+    """Shared keep-alive session; one connection pool per host, sized for the worker pool."""
+    sess = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(1, pool_size))
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    sess.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": _accept_encoding(),
+        "Connection": "keep-alive",
+    })
+    return sess
+
+def _retry_after_sec(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Exponential backoff with jitter (half fixed, half random); a server Retry-After wins when longer."""
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    delay = cap / 2 + random.uniform(0, cap / 2)
+    ra = _retry_after_sec(retry_after)
+    if ra is not None:
+        delay = max(delay, min(ra, RETRY_AFTER_MAX))
+    return delay
+
+_THROTTLE = HostThrottle()
+_WORKERS = DEFAULT_WORKERS
+_RETRIES = DEFAULT_RETRIES
+_SESSION: Optional[requests.Session] = None
+_CACHE: Optional[HttpCache] = None
+_OFFLINE = False
+_FETCHER: Optional[Callable[[str], str]] = None
+STATS = FetchStats()
+
+def configure_fetch(workers: int = DEFAULT_WORKERS, per_host: int = DEFAULT_PER_HOST, rate_limit: float = DEFAULT_RATE_LIMIT,
+                    retries: int = DEFAULT_RETRIES) -> None:
+    global _THROTTLE, _WORKERS, _RETRIES, _SESSION
+    _WORKERS = max(1, int(workers))
+    _THROTTLE = HostThrottle(per_host, rate_limit)
+    _RETRIES = max(0, int(retries))
+    if _SESSION is not None:
+        _SESSION.close()
+    _SESSION = make_session(max(_WORKERS, _THROTTLE.per_host))
+
+def configure_cache(cache_dir: Optional[Path] = HTTP_CACHE_DIR, offline: bool = False,
+                    max_mb: float = DEFAULT_CACHE_MAX_MB, max_age_days: float = DEFAULT_CACHE_MAX_AGE_DAYS) -> Optional[HttpCache]:
+    """cache_dir=None disables the cache. offline=True serves every request from the cache only."""
+    global _CACHE, _OFFLINE
+    if offline and cache_dir is None:
+        raise ValueError("--offline needs the HTTP cache")
+    _CACHE = HttpCache(cache_dir, int(max_mb * 1024 * 1024), max_age_days * 86400) if cache_dir is not None else None
+    _OFFLINE = offline
+    return _CACHE
+
+def _get_with_retries(url: str, headers: Dict[str,str]) -> requests.Response:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = make_session(max(_WORKERS, _THROTTLE.per_host))
+    host = urlparse(url).netloc
+    attempt = 0
+    while True:
+        retry_after = None
+        try:
+            with _THROTTLE.slot(host):
+                t0 = time.perf_counter()
+                r = _SESSION.get(url, headers=headers, timeout=TIMEOUT)
+                elapsed = time.perf_counter() - t0
+            wire = r.raw.tell() if hasattr(r.raw, "tell") else len(r.content)
+            STATS.add(requests=1, network_sec=elapsed, wire_bytes=wire, body_bytes=len(r.content))
+            if r.status_code not in RETRY_STATUSES or attempt >= _RETRIES:
+                return r
+            retry_after = r.headers.get("Retry-After")
+        except (requests.ConnectionError, requests.Timeout):
+            STATS.add(requests=1)
+            if attempt >= _RETRIES:
+                STATS.add(failures=1)
+                raise
+        delay = backoff_delay(attempt, retry_after)
+        STATS.add(retries=1, backoff_sec=delay)
+        time.sleep(delay)
+        attempt += 1
+
+def install_fetcher(fetcher: Optional[Callable[[str], str]]) -> None:
+    """
+    Route every http_get through fetcher(url) -> html (fixture corpus, benchmarks).
+    None restores the network path (fetch_url).
+    """
+    global _FETCHER
+    _FETCHER = fetcher
+
 def http_get(url: str) -> str:
-    r = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=TIMEOUT)
+    if _FETCHER is not None:
+        return _FETCHER(url)
+    return fetch_url(url)
+
+def fetch_url(url: str) -> str:
+    """Network path of http_get: cache + conditional GET + retries."""
+    cached = _CACHE.get(url) if _CACHE is not None else None
+    if _OFFLINE:
+        if cached is None:
+            raise RuntimeError(f"offline mode: not in cache: {url}")
+        _CACHE.touch(url)
+        STATS.add(cache_only=1)
+        return cached["body"]
+
+    headers: Dict[str,str] = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    r = _get_with_retries(url, headers)
+    if r.status_code == 304:
+        if cached and isinstance(cached.get("body"), str):
+            _CACHE.touch(url)
+            STATS.add(not_modified=1)
+            return cached["body"]
+        # 304 with nothing to reuse (entry evicted/unreadable, or a proxy answering on its own):
+        # never store the empty 304 body as the page; refetch once unconditionally.
+        r = _get_with_retries(url, {})
+        if r.status_code == 304:
+            STATS.add(failures=1)
+            raise RuntimeError(f"304 Not Modified without a cached copy: {url}")
+    if r.status_code >= 400:
+        STATS.add(failures=1)
     r.raise_for_status()
+    if _CACHE is not None:
+        _CACHE.put(url, r.text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
     return r.text
 
+def fetch_many(urls: List[str], workers: Optional[int] = None) -> List[Tuple[str, Optional[str], Optional[Exception]]]:
+    """
+    Fetch pages concurrently (bounded pool + per-host throttle).
+    Returns (url, html, error) in the *input* order, whatever order pages finish in,
+    so everything built from the result stays deterministic.
+    """
+    def one(url: str) -> Tuple[str, Optional[str], Optional[Exception]]:
+        try:
+            return url, http_get(url), None
+        except Exception as e:
+            return url, None, e
+
+    urls = list(urls)
+    n = min(workers or _WORKERS, len(urls))
+    if n <= 1:
+        return [one(u) for u in urls]
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="fetch") as ex:
+        return list(ex.map(one, urls))
+
 def abs_url(url: str) -> str:
     if not url:
         return url
@@ -90,6 +444,18 @@ def stable_id(kind: str, *parts: str) -> str:
     h = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
     return f"{kind}_{h}"
 
+_VOLATILE_HTML_RE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.I | re.S)
+_WS_RE = re.compile(r"\s+")
+
+def page_hash(html: str) -> str:
+    """
+    Content hash of a fetched page (kept by URL in PAGE_HASHES_PATH, never in the records).
+    Scripts/styles (build ids, analytics) and whitespace runs are ignored; PARSER_REV is folded in
+    so a parser change invalidates every stored record.
+    """
+    norm = _WS_RE.sub(" ", _VOLATILE_HTML_RE.sub("", html))
+    return hashlib.sha1(f"{PARSER_REV}\n{norm}".encode("utf-8")).hexdigest()
+
 def clean_lines(text: str) -> List[str]:
     out: List[str] = []
     for line in text.splitlines():
@@ -103,6 +469,8 @@ def extract_h2_section_lines(soup: BeautifulSoup, h2_title_prefix: str) -> List[
     """
     Get lines between an H2 whose text starts with h2_title_prefix and the next H2.
     Works with genshin.gg pages that use markdown-like headings rendered to H2.
+
+    Scans the whole document on every call; for several lookups on one page use SectionIndex.
     """
     h2 = None
     for cand in soup.find_all(["h2","h3"]):
@@ -122,6 +490,31 @@ def extract_h2_section_lines(soup: BeautifulSoup, h2_title_prefix: str) -> List[
                 lines.extend(clean_lines(t))
     return lines
 
+class SectionIndex:
+    """
+    Heading -> lines map built in one pass over the document (document order).
+    Same semantics as extract_h2_section_lines: a section is the text of every p/li/div
+    element after an H2/H3, up to the next H2/H3; lookups match the first heading
+    whose text starts with the given prefix.
+    """
+    def __init__(self, soup: BeautifulSoup):
+        self.sections: List[Tuple[str, List[str]]] = []
+        cur: Optional[List[str]] = None
+        for tag in soup.find_all(True):
+            if tag.name in ("h2","h3"):
+                cur = []
+                self.sections.append((tag.get_text(" ", strip=True), cur))
+            elif cur is not None and tag.name in ("p","li","div"):
+                t = tag.get_text(" ", strip=True)
+                if t:
+                    cur.extend(clean_lines(t))
+
+    def lines(self, title_prefix: str) -> List[str]:
+        for title, lines in self.sections:
+            if title.startswith(title_prefix):
+                return lines
+        return []
+
 def find_main_image_url(soup: BeautifulSoup, name: str) -> Optional[str]:
     # Prefer image whose alt matches the character name exactly
     for img in soup.find_all("img"):
@@ -309,8 +702,9 @@ def parse_potential_from_lines(lines: List[str]) -> List[Dict[str,Any]]:
         i += 1
     return tiers
 
-def parse_genshin_character_page(url: str) -> Tuple[Dict[str,Any], Dict[str,Any]]:
-    html = http_get(url)
+def parse_genshin_character_page(url: str, html: Optional[str] = None) -> Tuple[Dict[str,Any], Dict[str,Any]]:
+    if html is None:
+        html = http_get(url)
     soup = BeautifulSoup(html, "lxml")
 
     h1 = soup.find("h1")
@@ -350,16 +744,18 @@ def parse_genshin_character_page(url: str) -> Tuple[Dict[str,Any], Dict[str,Any]
                 break
         desc = " ".join(clean_lines("\n".join(parts))).strip()
 
+    sections = SectionIndex(soup)
+
     # Costumes
-    costumes_lines = extract_h2_section_lines(soup, f"{name} Costumes")
+    costumes_lines = sections.lines(f"{name} Costumes")
     costumes = parse_costumes_from_section(costumes_lines)
 
     # For each weapon type, parse skills & potential
     skills_by_weapon: Dict[str,List[Dict[str,Any]]] = {}
     potentials_by_weapon: Dict[str,List[Dict[str,Any]]] = {}
     for wt in weapons:
-        sk_lines = extract_h2_section_lines(soup, f"{name} {wt} Skills")
-        pt_lines = extract_h2_section_lines(soup, f"{name} {wt} Potential")
+        sk_lines = sections.lines(f"{name} {wt} Skills")
+        pt_lines = sections.lines(f"{name} {wt} Potential")
         if sk_lines:
             skills_by_weapon[wt] = parse_skills_from_lines(sk_lines)
         if pt_lines:
@@ -381,23 +777,27 @@ def parse_genshin_character_page(url: str) -> Tuple[Dict[str,Any], Dict[str,Any]
         }
     }
 
-    # Legacy flat record for the UI + build maker
-    legacy = {
-        "id": char_id,
-        "name": name,
+    return genshin_character_legacy(charx, url), charx
+
+def genshin_character_legacy(charx: Dict[str,Any], url: str) -> Dict[str,Any]:
+    """Legacy flat record for the UI + build maker (fully derived from the normalized record)."""
+    desc = charx.get("description") or ""
+    return {
+        "id": charx["id"],
+        "name": charx["name"],
         "element": None,
         "role": None,
-        "icon": img_url,
+        "icon": charx.get("image_url"),
         "base_stats": {"atk": 0, "crit_rate": 0, "crit_dmg": 0},
-        "weapon_types": weapons,
+        "weapon_types": charx.get("weapon_types") or [],
         "source": {"source_url": url, "patch_version": None, "last_seen": utc_now_iso()},
         # quick preview for UI
         "summary": desc[:220] + ("…" if len(desc) > 220 else "")
     }
-    return legacy, charx
 
-def parse_genshin_character_list() -> List[Tuple[str,str]]:
-    html = http_get(GENSHIN_CHAR_LIST)
+def parse_genshin_character_list(html: Optional[str] = None) -> List[Tuple[str,str]]:
+    if html is None:
+        html = http_get(GENSHIN_CHAR_LIST)
     soup = BeautifulSoup(html, "lxml")
     # The "Characters List" page is a React app shell, but contains links in the HTML.
     # We'll collect /7dso/characters/<slug>/ anchors.
@@ -424,8 +824,9 @@ def parse_genshin_character_list() -> List[Tuple[str,str]]:
         uniq.append((name, url))
     return uniq
 
-def parse_genshin_weapons_list() -> Tuple[List[Dict[str,Any]], Dict[str,Any]]:
-    html = http_get(GENSHIN_WEAPONS_LIST)
+def parse_genshin_weapons_list(html: Optional[str] = None) -> Tuple[List[Dict[str,Any]], Dict[str,Any]]:
+    if html is None:
+        html = http_get(GENSHIN_WEAPONS_LIST)
     soup = BeautifulSoup(html, "lxml")
     text_lines = clean_lines(soup.get_text("\n"))
 
@@ -471,17 +872,6 @@ def parse_genshin_weapons_list() -> Tuple[List[Dict[str,Any]], Dict[str,Any]]:
                 img_url = abs_url(img.get("src"))
 
             wid = stable_id("wp", name, wtype)
-            w_legacy = {
-                "id": wid,
-                "name": name,
-                "weapon_type": wtype,
-                "icon": img_url,
-                "atk_bonus": atk_val,
-                "substat": {"name": sub_name, "value": sub_value},
-                "passive": passive,
-                "source": {"source_url": GENSHIN_WEAPONS_LIST, "patch_version": None, "last_seen": utc_now_iso()},
-            }
-            weapons_legacy.append(w_legacy)
             weapons_x[wid] = {
                 "id": wid,
                 "name": name,
@@ -493,13 +883,26 @@ def parse_genshin_weapons_list() -> Tuple[List[Dict[str,Any]], Dict[str,Any]]:
                 "passive_text": passive,
                 "sources": {"genshin": {"source_url": GENSHIN_WEAPONS_LIST}},
             }
+            weapons_legacy.append(genshin_weapon_legacy(weapons_x[wid]))
             # advance until after sub_value (avoid O(n^2))
             i = max(i+1, i+ea+4)
             continue
         i += 1
     return weapons_legacy, weapons_x
 
-    
+def genshin_weapon_legacy(wx: Dict[str,Any]) -> Dict[str,Any]:
+    """Legacy flat weapon record (fully derived from the normalized record)."""
+    return {
+        "id": wx["id"],
+        "name": wx["name"],
+        "weapon_type": wx["weapon_type"],
+        "icon": wx.get("image_url"),
+        "atk_bonus": wx.get("equipment_attack", 0),
+        "substat": {"name": wx.get("substat_name"), "value": wx.get("substat_value")},
+        "passive": wx.get("passive_text"),
+        "source": {"source_url": GENSHIN_WEAPONS_LIST, "patch_version": None, "last_seen": utc_now_iso()},
+    }
+
 # ----------------------------
 # 7dsorigin.gg import (optional)
 # ----------------------------
@@ -612,8 +1015,9 @@ def _parse_number(s: str) -> Optional[float]:
     except:
         return None
 
-def parse_sdso_weapon_page(url: str) -> Tuple[Dict[str,Any], Dict[str,Any]]:
-    html = http_get(url)
+def parse_sdso_weapon_page(url: str, html: Optional[str] = None) -> Tuple[Dict[str,Any], Dict[str,Any]]:
+    if html is None:
+        html = http_get(url)
     soup = BeautifulSoup(html, "lxml")
     h1 = soup.find("h1")
     title = h1.get_text(" ", strip=True) if h1 else ""
@@ -785,8 +1189,9 @@ def parse_sdso_potential_section(section_lines: List[str]) -> Dict[str,List[Dict
         i += 1
     return pot_by_weapon
 
-def parse_sdso_character_page(url: str) -> Tuple[Dict[str,Any], Dict[str,Any]]:
-    html = http_get(url)
+def parse_sdso_character_page(url: str, html: Optional[str] = None) -> Tuple[Dict[str,Any], Dict[str,Any]]:
+    if html is None:
+        html = http_get(url)
     soup = BeautifulSoup(html, "lxml")
     h1 = soup.find("h1")
     title = h1.get_text(" ", strip=True) if h1 else ""
@@ -981,6 +1386,81 @@ def merge_sources_record(dst: Dict[str,Any], src: Dict[str,Any], source_name: st
 
 
 
+class ModuleStore:
+    """
+    One module's records behind a single id index:
+    - records: normalized records by id (insertion order = output order)
+    - legacy:  legacy flat records (list order = output order)
+    Both source merge paths look records up here in O(1) instead of scanning the lists.
+    """
+    def __init__(self, module: str, legacy: Optional[List[Dict[str,Any]]] = None, records: Optional[Dict[str,Any]] = None):
+        self.module = module
+        self.records: Dict[str,Any] = records if records is not None else {}
+        self.legacy: List[Dict[str,Any]] = []
+        self._legacy_by_id: Dict[str,Dict[str,Any]] = {}
+        for rec in legacy or []:
+            self.add_legacy(rec)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, rid: str) -> Optional[Dict[str,Any]]:
+        return self.records.get(rid)
+
+    def add(self, legacy: Dict[str,Any], rec: Dict[str,Any]) -> None:
+        self.records[rec["id"]] = rec
+        self.add_legacy(legacy)
+
+    def add_legacy(self, legacy: Dict[str,Any]) -> None:
+        self.legacy.append(legacy)
+        # first record wins on duplicate ids (same as a linear scan would)
+        self._legacy_by_id.setdefault(legacy.get("id"), legacy)
+
+    def legacy_get(self, rid: str) -> Optional[Dict[str,Any]]:
+        return self._legacy_by_id.get(rid)
+
+    def merge(self, rec: Dict[str,Any], source_name: str, conflicts: List[Dict[str,Any]]) -> Dict[str,Any]:
+        """Merge a secondary-source normalized record into the existing one, or insert it."""
+        rid = rec["id"]
+        if rid in self.records:
+            self.records[rid] = merge_sources_record(self.records[rid], rec, source_name, conflicts, self.module)
+        else:
+            self.records[rid] = rec
+        return self.records[rid]
+
+def merge_sdso_weapon(weapons: ModuleStore, w_legacy: Dict[str,Any], wx: Dict[str,Any], conflicts: List[Dict[str,Any]]) -> None:
+    weapons.merge(wx, "7dsorigin", conflicts)
+    # legacy merge (best effort)
+    existing = weapons.legacy_get(wx["id"])
+    if existing:
+        # fill missing legacy fields
+        if not existing.get("icon") and w_legacy.get("icon"):
+            existing["icon"] = w_legacy["icon"]
+        if existing.get("atk_bonus", 0) == 0 and w_legacy.get("atk_bonus", 0) > 0:
+            existing["atk_bonus"] = w_legacy["atk_bonus"]
+        existing.setdefault("sources", {})["7dsorigin"] = w_legacy.get("source")
+    else:
+        w_legacy["sources"] = {"7dsorigin": w_legacy.get("source")}
+        weapons.add_legacy(w_legacy)
+
+def merge_sdso_character(chars: ModuleStore, c_legacy: Dict[str,Any], cx: Dict[str,Any], conflicts: List[Dict[str,Any]]) -> None:
+    if cx["id"] not in chars:
+        # new character not present on genshin.gg
+        chars.add_legacy(c_legacy)
+    chars.merge(cx, "7dsorigin", conflicts)
+
+    # legacy merge
+    existing = chars.legacy_get(cx["id"])
+    if existing:
+        if not existing.get("icon") and c_legacy.get("icon"):
+            existing["icon"] = c_legacy["icon"]
+        if not existing.get("summary") and c_legacy.get("summary"):
+            existing["summary"] = c_legacy["summary"]
+        existing.setdefault("sources", {})["7dsorigin"] = c_legacy.get("source")
+
 def load_existing_db() -> Dict[str,Any]:
     if DB_JSON.exists():
         try:
@@ -989,85 +1469,244 @@ def load_existing_db() -> Dict[str,Any]:
             return {}
     return {}
 
+def load_page_hashes(dbx: Dict[str,Any], path: Path = PAGE_HASHES_PATH) -> Dict[str,str]:
+    """
+    url -> page_hash() of the pages behind `dbx` (the previous data/db.json).
+    Empty unless the file was written with that very build (same generated_at): a cache restored
+    from an older run must not vouch for newer records.
+    """
+    try:
+        doc = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not dbx.get("generated_at") or doc.get("generated_at") != dbx.get("generated_at"):
+        return {}
+    return dict(doc.get("pages") or {})
+
+def save_page_hashes(dbx: Dict[str,Any], pages: Dict[str,str], path: Path = PAGE_HASHES_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, {"generated_at": dbx.get("generated_at"), "pages": dict(sorted(pages.items()))}, indent=2)
+
 def compute_diff(old: Dict[str,Any], new: Dict[str,Any]) -> Dict[str,Any]:
-    def ids_in(module: str, db: Dict[str,Any]) -> set:
-        return set((db.get("modules", {}).get(module, {}) or {}).keys())
-
-    diff = {"added": {}, "removed": {}, "changed": {}}
-    for module in ("characters","weapons","skills"):
-        a = ids_in(module, old)
-        b = ids_in(module, new)
-        diff["added"][module] = sorted(list(b - a))
-        diff["removed"][module] = sorted(list(a - b))
-
-    # changed: hash compare for chars/weapons
-    for module in ("characters","weapons"):
-        oldm = old.get("modules", {}).get(module, {}) or {}
-        newm = new.get("modules", {}).get(module, {}) or {}
-        changed = []
-        for k in set(oldm.keys()) & set(newm.keys()):
-            if json.dumps(oldm[k], sort_keys=True) != json.dumps(newm[k], sort_keys=True):
-                changed.append(k)
-        diff["changed"][module] = sorted(changed)
-
-    return diff
-
-def write_snapshot(db: Dict[str,Any]) -> Path:
-    SNAP_DIR.mkdir(parents=True, exist_ok=True)
+    return diff_dbs(old, new)
+
+def write_snapshot(db: Dict[str,Any], manifest: Optional[Manifest] = None) -> Path:
+    store = SnapshotStore(SNAP_DIR)
+    # one-time migration of the historical full-copy db_*.json files
+    migrated = store.migrate_legacy()
+    if migrated:
+        print(f"[INFO] snapshots: migrated {migrated} legacy db_*.json files into the delta store", file=sys.stderr)
     ts = utc_now_iso().replace(":","").replace("-","")
-    path = SNAP_DIR / f"db_{ts}.json"
-    path.write_text(json.dumps(db, ensure_ascii=False, indent=2), encoding="utf-8")
-    return path
+    return store.write(db, f"db_{ts}", manifest=manifest)
 
-def keep_last_snapshots(limit: int = 30) -> None:
-    if not SNAP_DIR.exists():
-        return
-    snaps = sorted(SNAP_DIR.glob("db_*.json"))
-    if len(snaps) <= limit:
-        return
-    for p in snaps[:-limit]:
-        try:
-            p.unlink()
-        except:
-            pass
+def keep_last_snapshots(limit: int = SNAPSHOT_KEEP) -> None:
+    SnapshotStore(SNAP_DIR).prune(limit)
+
+def explode_genshin_skills(charx: Dict[str,Any], url: str) -> List[Dict[str,Any]]:
+    """One modules.skills record per (weapon type, slot) of a genshin.gg character."""
+    out: List[Dict[str,Any]] = []
+    for wt, skills in (charx.get("skills_by_weapon") or {}).items():
+        for idx, sk in enumerate(skills):
+            sid = stable_id("sk", charx["id"], wt, sk.get("name",""), sk.get("type",""), str(idx))
+            out.append({
+                "id": sid,
+                "character_id": charx["id"],
+                "weapon_type": wt,
+                "slot": idx,
+                **sk,
+                "sources": {"genshin": {"source_url": url}}
+            })
+    return out
 
-def build_db(enable_7dsorigin: bool) -> Tuple[Dict[str,Any], Dict[str,Any], Dict[str,Any]]:
+class ParseMemo:
+    """
+    parser_engine results keyed by sha1(kind, PARSER_VERSION, stripped text), saved gzipped.
+    A daily run only parses text it has not seen; bumping PARSER_VERSION re-parses everything once.
+    Entries a run did not use are dropped on save. path=None keeps the memo in memory only.
+    Returned dicts are shared between records with the same text: treat them as read-only.
+    """
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries: Dict[str,Dict[str,Any]] = {}
+        self.used: Dict[str,Dict[str,Any]] = {}
+        self.hits = self.misses = 0
+        if path is not None and path.exists():
+            try:
+                data = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+            except Exception as e:
+                print(f"[WARN] parse memo unreadable, starting empty: {e}", file=sys.stderr)
+                data = {}
+            if data.get("parser_version") == PARSER_VERSION:
+                self.entries = data.get("entries") or {}
+
+    def parse(self, kind: str, text: Optional[str], fn: Callable[[str], Dict[str,Any]]) -> Dict[str,Any]:
+        return self.parse_many(kind, [text], lambda texts: [fn(t) for t in texts])[0]
+
+    def parse_many(self, kind: str, texts: List[Optional[str]],
+                   fn_many: Callable[[List[str]], List[Dict[str,Any]]]) -> List[Dict[str,Any]]:
+        """Results for `texts` in order; texts not memoized yet go to fn_many in one batch."""
+        stripped = [(t or "").strip() for t in texts]
+        keys = [hashlib.sha1(f"{kind}\0{PARSER_VERSION}\0{t}".encode("utf-8")).hexdigest() for t in stripped]
+        missing: Dict[str,str] = {}
+        for key, t in zip(keys, stripped):
+            if key in self.used or key in self.entries:
+                continue
+            missing.setdefault(key, t)
+        if missing:
+            for key, res in zip(missing, fn_many(list(missing.values()))):
+                self.used[key] = {k: v for k, v in res.items() if k != "description_raw"}
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        out = []
+        for key in keys:
+            res = self.used.get(key) or self.entries[key]
+            self.used[key] = res
+            out.append(res)
+        return out
+
+    def save(self) -> None:
+        if self.path is not None:
+            write_json(self.path, {"parser_version": PARSER_VERSION, "entries": self.used},
+                       separators=MIN_SEPARATORS, compress=True)
+
+_PARSE_MEMO = ParseMemo(None)
+
+def configure_parse_memo(path: Optional[Path] = PARSE_MEMO_PATH) -> ParseMemo:
+    global _PARSE_MEMO
+    _PARSE_MEMO = ParseMemo(path)
+    return _PARSE_MEMO
+
+def enrich_parsed(skills: Dict[str,Any], characters: Dict[str,Any], memo: ParseMemo) -> None:
+    """parsed_* fields on every modules.skills record (SkillParser) and potential tier (PotentialParser)."""
+    recs = list(skills.values())
+    for sk, res in zip(recs, memo.parse_many("skill", [sk.get("description") for sk in recs], SkillParser().parse_many)):
+        sk.update(res)
+    tiers = [tier for c in characters.values() for ts in (c.get("potential_by_weapon") or {}).values() for tier in ts]
+    for tier, res in zip(tiers, memo.parse_many("potential", [t.get("text") for t in tiers], PotentialParser().parse_many)):
+        tier.update(res)
+
+class PreviousBuild:
+    """
+    Index over the last data/db.json for --incremental, with the page hashes it was built from
+    (load_page_hashes()). Only genshin-only records are reusable: a record already merged with
+    7dsorigin cannot be split back, so those pages are always re-parsed.
+    """
+    def __init__(self, dbx: Dict[str,Any], page_hashes: Dict[str,str]):
+        mods = (dbx or {}).get("modules") or {}
+        self.page_hashes = page_hashes
+        self.chars_by_url: Dict[str,Dict[str,Any]] = {}
+        for c in (mods.get("characters") or {}).values():
+            src = c.get("sources") or {}
+            if set(src) == {"genshin"} and src["genshin"].get("source_url") in page_hashes:
+                self.chars_by_url[src["genshin"]["source_url"]] = c
+        self.skills_by_char: Dict[str,List[Dict[str,Any]]] = {}
+        for sk in (mods.get("skills") or {}).values():
+            if set(sk.get("sources") or {}) == {"genshin"}:
+                self.skills_by_char.setdefault(sk.get("character_id"), []).append(sk)
+        weapons = list((mods.get("weapons") or {}).values())
+        # one list page for every weapon: reusable only while none was merged with 7dsorigin
+        tainted = any(set(w.get("sources") or {}) != {"genshin"} for w in weapons)
+        self.genshin_weapons = None if tainted or not weapons else weapons
+
+    def character(self, url: str, content_hash: str) -> Optional[Tuple[Dict[str,Any], List[Dict[str,Any]]]]:
+        charx = self.chars_by_url.get(url)
+        if charx is None or self.page_hashes.get(url) != content_hash:
+            return None
+        skills = self.skills_by_char.get(charx["id"]) or explode_genshin_skills(charx, url)
+        return charx, skills
+
+    def weapons(self, content_hash: str) -> Optional[List[Dict[str,Any]]]:
+        if self.page_hashes.get(GENSHIN_WEAPONS_LIST) != content_hash:
+            return None
+        return self.genshin_weapons
+
+def build_db(enable_7dsorigin: bool, incremental: bool = False,
+             page_hashes: Optional[Dict[str,str]] = None) -> Tuple[Dict[str,Any], Dict[str,Any], Dict[str,Any]]:
     """
     Returns (legacy_db, normalized_db, meta)
+
+    incremental=True reuses records from the previous data/db.json for every page whose
+    content hash is unchanged instead of re-parsing it. page_hashes, when given, is filled with
+    url -> page_hash() of every genshin.gg page the build used (save_page_hashes() after writing).
     """
     generated = utc_now_iso()
+    page_hashes = page_hashes if page_hashes is not None else {}
+    if incremental:
+        prev_db = load_existing_db()
+        prev = PreviousBuild(prev_db, load_page_hashes(prev_db))
+    else:
+        prev = None
+    reused_pages, parsed_pages = 0, 0
+
+    # Stage 1: list pages. Each list runs on its own worker so hosts overlap;
+    # the paginated 7dsorigin weapon crawl stays sequential within its worker.
+    sdso_weapon_urls: List[str] = []
+    sdso_char_urls: List[str] = []
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="lists") as ex:
+        f_char_list = ex.submit(parse_genshin_character_list)
+        f_weapons = ex.submit(http_get, GENSHIN_WEAPONS_LIST)
+        f_sdso_weapons = ex.submit(parse_sdso_list_pages, SDSO_WEAPONS_LIST, "weapons") if enable_7dsorigin else None
+        f_sdso_chars = ex.submit(parse_sdso_char_list) if enable_7dsorigin else None
+
+        char_links = f_char_list.result()
+        weapons_html = f_weapons.result()
+        if f_sdso_weapons is not None:
+            try:
+                sdso_weapon_urls = f_sdso_weapons.result()
+            except Exception as e:
+                print(f"[WARN] 7dsorigin weapon list failed: {e}", file=sys.stderr)
+        if f_sdso_chars is not None:
+            try:
+                sdso_char_urls = f_sdso_chars.result()
+            except Exception as e:
+                print(f"[WARN] 7dsorigin character list failed: {e}", file=sys.stderr)
+
+    # Stage 2: every detail page, all hosts in one bounded pool.
+    # Parsing below walks the original URL lists, so completion order never leaks into the output.
+    char_urls = [url for _, url in char_links]
+    pages = {url: (html, err) for url, html, err in fetch_many(list(dict.fromkeys(char_urls + sdso_weapon_urls + sdso_char_urls)))}
+
+    # Weapons
+    weapons_hash = page_hashes[GENSHIN_WEAPONS_LIST] = page_hash(weapons_html)
+    reused_weapons = prev.weapons(weapons_hash) if prev else None
+    if reused_weapons:
+        weapons = ModuleStore("weapons", [genshin_weapon_legacy(w) for w in reused_weapons], {w["id"]: w for w in reused_weapons})
+        reused_pages += 1
+    else:
+        weapons = ModuleStore("weapons", *parse_genshin_weapons_list(weapons_html))
+        parsed_pages += 1
 
     # Characters
-    char_links = parse_genshin_character_list()
-    chars_legacy: List[Dict[str,Any]] = []
-    chars_x: Dict[str,Any] = {}
+    chars = ModuleStore("characters")
     skills_x: Dict[str,Any] = {}
 
-    for _, url in char_links:
+    for url in char_urls:
         try:
-            legacy, charx = parse_genshin_character_page(url)
-            chars_legacy.append(legacy)
-            chars_x[charx["id"]] = charx
+            html, err = pages[url]
+            if err is not None:
+                raise err
+            h = page_hash(html)
+            hit = prev.character(url, h) if prev else None
+            if hit:
+                charx, skill_recs = hit
+                legacy = genshin_character_legacy(charx, url)
+                reused_pages += 1
+            else:
+                legacy, charx = parse_genshin_character_page(url, html)
+                skill_recs = explode_genshin_skills(charx, url)
+                parsed_pages += 1
+            chars.add(legacy, charx)
+            page_hashes[url] = h
 
             # explode skills into module
-            for wt, skills in (charx.get("skills_by_weapon") or {}).items():
-                for idx, sk in enumerate(skills):
-                    sid = stable_id("sk", charx["id"], wt, sk.get("name",""), sk.get("type",""), str(idx))
-                    skill_rec = {
-                        "id": sid,
-                        "character_id": charx["id"],
-                        "weapon_type": wt,
-                        "slot": idx,
-                        **sk,
-                        "sources": {"genshin": {"source_url": url}}
-                    }
-                    skills_x[sid] = skill_rec
+            for skill_rec in skill_recs:
+                skills_x[skill_rec["id"]] = skill_rec
 
         except Exception as e:
             print(f"[WARN] character parse failed: {url} :: {e}", file=sys.stderr)
 
-    # Weapons
-    weapons_legacy, weapons_x = parse_genshin_weapons_list()
+    if incremental:
+        print(f"[INFO] incremental: reused {reused_pages} unchanged genshin.gg pages, parsed {parsed_pages}", file=sys.stderr)
 
     # Optional secondary source: 7dsorigin.gg (requires permission)
     sources = ["genshin.gg/7dso"]
@@ -1077,82 +1716,52 @@ def build_db(enable_7dsorigin: bool) -> Tuple[Dict[str,Any], Dict[str,Any], Dict
         sources.append("7dsorigin.gg")
 
         # --- Import weapons from 7dsorigin.gg
-        try:
-            sdso_weapon_urls = parse_sdso_list_pages(SDSO_WEAPONS_LIST, "weapons")
-            for wurl in sdso_weapon_urls:
-                try:
-                    w_legacy, wx = parse_sdso_weapon_page(wurl)
-                    wid = wx["id"]
-                    if wid in weapons_x:
-                        weapons_x[wid] = merge_sources_record(weapons_x[wid], wx, "7dsorigin", conflicts, "weapons")
-                    else:
-                        weapons_x[wid] = wx
-                    # legacy merge (best effort)
-                    existing = next((w for w in weapons_legacy if w.get("id") == wid), None)
-                    if existing:
-                        # fill missing legacy fields
-                        if not existing.get("icon") and w_legacy.get("icon"):
-                            existing["icon"] = w_legacy["icon"]
-                        if existing.get("atk_bonus", 0) == 0 and w_legacy.get("atk_bonus", 0) > 0:
-                            existing["atk_bonus"] = w_legacy["atk_bonus"]
-                        existing.setdefault("sources", {})["7dsorigin"] = w_legacy.get("source")
-                    else:
-                        w_legacy["sources"] = {"7dsorigin": w_legacy.get("source")}
-                        weapons_legacy.append(w_legacy)
-                except Exception as e:
-                    print(f"[WARN] 7dsorigin weapon parse failed: {wurl} :: {e}", file=sys.stderr)
-        except Exception as e:
-            print(f"[WARN] 7dsorigin weapon list failed: {e}", file=sys.stderr)
+        for wurl in sdso_weapon_urls:
+            try:
+                html, err = pages[wurl]
+                if err is not None:
+                    raise err
+                w_legacy, wx = parse_sdso_weapon_page(wurl, html)
+                merge_sdso_weapon(weapons, w_legacy, wx, conflicts)
+            except Exception as e:
+                print(f"[WARN] 7dsorigin weapon parse failed: {wurl} :: {e}", file=sys.stderr)
 
         # --- Import characters from 7dsorigin.gg
-        try:
-            sdso_char_urls = parse_sdso_char_list()
-            for curl in sdso_char_urls:
-                try:
-                    c_legacy, cx = parse_sdso_character_page(curl)
-                    cid = cx["id"]
-                    if cid in chars_x:
-                        chars_x[cid] = merge_sources_record(chars_x[cid], cx, "7dsorigin", conflicts, "characters")
-                    else:
-                        # new character not present on genshin.gg
-                        chars_x[cid] = cx
-                        chars_legacy.append(c_legacy)
-
-                    # legacy merge
-                    existing = next((c for c in chars_legacy if c.get("id") == cid), None)
-                    if existing:
-                        if not existing.get("icon") and c_legacy.get("icon"):
-                            existing["icon"] = c_legacy["icon"]
-                        if not existing.get("summary") and c_legacy.get("summary"):
-                            existing["summary"] = c_legacy["summary"]
-                        existing.setdefault("sources", {})["7dsorigin"] = c_legacy.get("source")
-
-                    # explode *sdso* skills into module with unique IDs (avoid collisions)
-                    for wt, skills in (cx.get("skills_by_weapon") or {}).items():
-                        for idx, sk in enumerate(skills):
-                            sid = stable_id("sk", "7dsorigin", cid, wt, sk.get("name",""), sk.get("type",""), str(idx))
-                            skill_rec = {
-                                "id": sid,
-                                "character_id": cid,
-                                "weapon_type": wt,
-                                "slot": idx,
-                                **sk,
-                                "sources": {"7dsorigin": {"source_url": curl}}
-                            }
-                            skills_x[sid] = skill_rec
-
-                except Exception as e:
-                    print(f"[WARN] 7dsorigin character parse failed: {curl} :: {e}", file=sys.stderr)
-        except Exception as e:
-            print(f"[WARN] 7dsorigin character list failed: {e}", file=sys.stderr)
+        for curl in sdso_char_urls:
+            try:
+                html, err = pages[curl]
+                if err is not None:
+                    raise err
+                c_legacy, cx = parse_sdso_character_page(curl, html)
+                cid = cx["id"]
+                merge_sdso_character(chars, c_legacy, cx, conflicts)
+
+                # explode *sdso* skills into module with unique IDs (avoid collisions)
+                for wt, skills in (cx.get("skills_by_weapon") or {}).items():
+                    for idx, sk in enumerate(skills):
+                        sid = stable_id("sk", "7dsorigin", cid, wt, sk.get("name",""), sk.get("type",""), str(idx))
+                        skill_rec = {
+                            "id": sid,
+                            "character_id": cid,
+                            "weapon_type": wt,
+                            "slot": idx,
+                            **sk,
+                            "sources": {"7dsorigin": {"source_url": curl}}
+                        }
+                        skills_x[sid] = skill_rec
+
+            except Exception as e:
+                print(f"[WARN] 7dsorigin character parse failed: {curl} :: {e}", file=sys.stderr)
+
+    enrich_parsed(skills_x, chars.records, _PARSE_MEMO)
 
     # Build normalized db
     dbx: Dict[str,Any] = {
         "schema_version": "1.0",
         "generated_at": generated,
         "modules": {
-            "characters": chars_x,
-            "weapons": weapons_x,
+            "characters": chars.records,
+            "weapons": weapons.records,
             "skills": skills_x,
             "passives": {},
             "sets": {},
@@ -1160,8 +1769,8 @@ def build_db(enable_7dsorigin: bool) -> Tuple[Dict[str,Any], Dict[str,Any], Dict
             "scenarios": {}
         },
         "indexes": {
-            "characters": [c["id"] for c in sorted(chars_legacy, key=lambda x: x["name"])],
-            "weapons": [w["id"] for w in sorted(weapons_legacy, key=lambda x: x["name"])],
+            "characters": [c["id"] for c in sorted(chars.legacy, key=lambda x: x["name"])],
+            "weapons": [w["id"] for w in sorted(weapons.legacy, key=lambda x: x["name"])],
         },
         "source_priority": ["genshin"],
         "notes": [
@@ -1172,8 +1781,8 @@ def build_db(enable_7dsorigin: bool) -> Tuple[Dict[str,Any], Dict[str,Any], Dict
 
     legacy_db: Dict[str,Any] = {
         "schema_version": "0.3",
-        "characters": sorted(chars_legacy, key=lambda x: x["name"]),
-        "weapons": sorted(weapons_legacy, key=lambda x: x["name"]),
+        "characters": sorted(chars.legacy, key=lambda x: x["name"]),
+        "weapons": sorted(weapons.legacy, key=lambda x: x["name"]),
     }
 
     meta = {
@@ -1190,47 +1799,187 @@ def build_db(enable_7dsorigin: bool) -> Tuple[Dict[str,Any], Dict[str,Any], Dict
 
     return legacy_db, dbx, meta
 
-def write_outputs(legacy_db: Dict[str,Any], dbx: Dict[str,Any], meta: Dict[str,Any], do_snapshot: bool):
+# Sharded live DB for the web app (src/core/livedb.js).
+# data/db_live.js is a small index (meta, top-level keys, shard file names); shards are
+# content-hashed data/live/<name>.<hash>.js scripts, so unchanged shards keep their URL (browser
+# cache) across daily updates. Boot shards are loaded before the app starts; "char.<id>" shards
+# (full kit + modules.skills of one character) only when a view needs that character, "tables.<id>"
+# (its precomputed skill tables, tools/skill_tables.py) only when asked for.
+LIVE_FORMAT = 1
+LIVE_BASE = "data/live/"
+LIVE_KIT_FIELDS = ("skills_by_weapon", "potential_by_weapon", "costumes")
+
+def live_shards(legacy_db: Dict[str,Any], dbx: Dict[str,Any],
+                skill_tables: Optional[Dict[str,Any]] = None) -> Tuple[Dict[str,Any], List[str], Dict[str,Any]]:
+    """(name -> payload, boot shard names, dbx without the sharded modules)."""
+    mods = dbx.get("modules") or {}
+    chars = mods.get("characters") or {}
+    shards: Dict[str,Any] = {"db": legacy_db}
+    shards["characters"] = {cid: {k: v for k, v in c.items() if k not in LIVE_KIT_FIELDS} for cid, c in chars.items()}
+
+    kits: Dict[str,Dict[str,Any]] = {cid: {"character": {k: c[k] for k in LIVE_KIT_FIELDS if k in c}, "skills": {}} for cid, c in chars.items()}
+    orphan_skills: Dict[str,Any] = {}
+    for sid, sk in (mods.get("skills") or {}).items():
+        kit = kits.get(sk.get("character_id"))
+        (kit["skills"] if kit is not None else orphan_skills)[sid] = sk
+    if orphan_skills:
+        shards["skills"] = orphan_skills
+
+    inline: Dict[str,Any] = {}
+    for module, recs in mods.items():
+        if module in ("characters", "skills"):
+            continue
+        if recs:
+            shards[f"module.{module}"] = recs
+        else:
+            inline[module] = recs
+    boot = list(shards.keys())
+    for cid, kit in kits.items():
+        shards[f"char.{cid}"] = kit
+    for cid, tables in ((skill_tables or {}).get("characters") or {}).items():
+        shards[f"tables.{cid}"] = tables
+
+    doc = {k: v for k, v in dbx.items() if k != "modules"}
+    doc["modules"] = inline
+    return shards, boot, doc
+
+def write_live_db(legacy_db: Dict[str,Any], dbx: Dict[str,Any], meta: Dict[str,Any],
+                  skill_tables: Optional[Dict[str,Any]] = None) -> Dict[str,Any]:
+    """
+    Write the shards (minified, with .gz/.br next to them; only new ones touch the disk),
+    drop stale ones, then the index script.
+    """
+    LIVE_DIR.mkdir(parents=True, exist_ok=True)
+    shards, boot, doc = live_shards(legacy_db, dbx, skill_tables)
+    files: Dict[str,str] = {}
+    for name, data in shards.items():
+        prefix = f"(window.__DB_LIVE_SHARDS__=window.__DB_LIVE_SHARDS__||{{}})[{json.dumps(name)}]="
+        h = json_sha1(data, separators=MIN_SEPARATORS, prefix=prefix, suffix=";\n")
+        fname = f"{name}.{h[:12]}.js"
+        path = LIVE_DIR / fname
+        if not path.exists():
+            write_json(path, data, separators=MIN_SEPARATORS, prefix=prefix, suffix=";\n")
+        if not is_precompressed(path):
+            precompress(path)
+        files[name] = fname
+    keep = {n for fname in files.values() for n in artifact_names(fname)}
+    for p in LIVE_DIR.iterdir():
+        if p.is_file() and p.name not in keep:
+            p.unlink()
+
+    index = {"format": LIVE_FORMAT, "meta": meta, "base": LIVE_BASE, "boot": boot, "shards": files, "doc": doc}
+    write_json(DB_LIVE_JS, index, separators=MIN_SEPARATORS,
+               prefix="// Auto-generated. Do not edit.\nwindow.__DB_LIVE_INDEX__=", suffix=";\n")
+    precompress(DB_LIVE_JS)
+    return index
+
+def write_outputs(legacy_db: Dict[str,Any], dbx: Dict[str,Any], meta: Dict[str,Any], do_snapshot: bool,
+                  sqlite_path: Optional[Path] = None):
+    # Every file is streamed record by record to a temp file and swapped in atomically (tools/json_stream.py).
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
     # db.json (normalized)
-    DB_JSON.write_text(json.dumps(dbx, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(DB_JSON, dbx, indent=2)
+
+    # db.min.json (+ .gz/.br) for the static host
+    write_json(DB_MIN_JSON, dbx, separators=MIN_SEPARATORS)
+    precompress(DB_MIN_JSON)
 
-    # db_live.js (legacy + extended)
-    payload = {"meta": meta, "db": legacy_db, "dbx": dbx}
-    js = "// Auto-generated. Do not edit.\n\nwindow.__DB_LIVE__ = " + json.dumps(payload, ensure_ascii=False) + ";\n"
-    DB_LIVE_JS.write_text(js, encoding="utf-8")
+    # skill_tables.json (+ .gz/.br): precomputed per character / weapon type / formula profile
+    skill_tables = build_skill_tables(dbx)
+    write_json(SKILL_TABLES_JSON, skill_tables, separators=MIN_SEPARATORS)
+    precompress(SKILL_TABLES_JSON)
+
+    # text_index.json (+ .gz/.br): full-text postings for tools/text_index.py queries
+    write_text_index(build_text_index(dbx), TEXT_INDEX_JSON)
+
+    # db.sqlite (optional): relational copy for ad-hoc analytics, merge conflicts included
+    if sqlite_path is not None:
+        export_sqlite(dbx, sqlite_path, meta.get("conflicts") or [])
+
+    # db_live.js index + data/live/ shards (legacy + extended + skill tables)
+    live_index = write_live_db(legacy_db, dbx, meta, skill_tables)
+
+    # what each module costs in transfer size and parse time
+    report = size_report(dbx, live_index, LIVE_DIR, DB_JSON, DB_MIN_JSON)
+    write_json(DB_SIZE_REPORT_JSON, report, indent=2)
+    total = report["total"]
+    print(f"[INFO] sizes: db {total['min_bytes'] // 1024} KB minified, {total['gzip_bytes'] // 1024} KB gzip"
+          + (f", {total['brotli_bytes'] // 1024} KB brotli" if total["brotli_bytes"] is not None else " (brotli not installed)"),
+          file=sys.stderr)
+
+    # db_manifest.json (id -> record hash, computed once and shared with the snapshot store)
+    manifest = manifest_of(dbx)
+    write_json(DB_MANIFEST_JSON, {"generated_at": dbx.get("generated_at"), "modules": manifest}, indent=2)
 
     # Snapshot + diff
     if do_snapshot:
-        snap = write_snapshot(dbx)
-        keep_last_snapshots(30)
-
-        # compute diff latest two
-        snaps = sorted(SNAP_DIR.glob("db_*.json"))
+        snap = write_snapshot(dbx, manifest)
+        # columnar history first: it keeps the snapshots pruning is about to drop
+        rows = HistoryTable(HISTORY_DIR).append(SnapshotStore(SNAP_DIR))
+        print(f"[INFO] history: +{rows} rows", file=sys.stderr)
+        keep_last_snapshots(SNAPSHOT_KEEP)
+
+        # diff latest two: manifests first, only changed records are loaded and walked
+        store = SnapshotStore(SNAP_DIR)
+        snaps = store.ids()
         if len(snaps) >= 2:
-            old = json.loads(snaps[-2].read_text(encoding="utf-8"))
-            new = json.loads(snaps[-1].read_text(encoding="utf-8"))
-            diff = compute_diff(old, new)
-            DB_DIFF_JSON.write_text(json.dumps(diff, ensure_ascii=False, indent=2), encoding="utf-8")
+            diff = diff_snapshots(store, snaps[-2], snaps[-1])
+            write_json(DB_DIFF_JSON, diff, indent=2)
         else:
-            DB_DIFF_JSON.write_text(json.dumps({"added":{}, "removed":{}, "changed":{}}, ensure_ascii=False, indent=2), encoding="utf-8")
+            write_json(DB_DIFF_JSON, {"added":{}, "removed":{}, "changed":{}, "fields":{}}, indent=2)
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--enable-7dsorigin", action="store_true", help="Enable optional secondary source 7dsorigin.gg (check permissions first).")
     ap.add_argument("--no-snapshot", action="store_true", help="Do not write snapshot history/diff.")
+    ap.add_argument("--incremental", action="store_true", help="Reuse records of the previous data/db.json for pages whose content hash is unchanged.")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Concurrent page fetches (default {DEFAULT_WORKERS}).")
+    ap.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help=f"Max in-flight requests per host (default {DEFAULT_PER_HOST}).")
+    ap.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help=f"Max request starts per second per host, 0 = unlimited (default {DEFAULT_RATE_LIMIT}).")
+    ap.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help=f"Retries per request on 429/5xx/connection errors (default {DEFAULT_RETRIES}).")
+    ap.add_argument("--offline", action="store_true", help="Run the whole pipeline from the HTTP cache only (no network).")
+    ap.add_argument("--no-cache", action="store_true", help="Disable the on-disk HTTP cache (always download full pages).")
+    ap.add_argument("--cache-dir", type=Path, default=HTTP_CACHE_DIR, help="HTTP cache directory (default .cache/http).")
+    ap.add_argument("--cache-max-mb", type=float, default=DEFAULT_CACHE_MAX_MB, help=f"Evict least-recently-used entries above this size (default {DEFAULT_CACHE_MAX_MB}).")
+    ap.add_argument("--cache-max-age-days", type=float, default=DEFAULT_CACHE_MAX_AGE_DAYS, help=f"Evict entries unused for this many days (default {DEFAULT_CACHE_MAX_AGE_DAYS}).")
+    ap.add_argument("--no-parse-cache", action="store_true", help="Re-parse every skill/potential text (ignore .cache/parse).")
+    ap.add_argument("--sqlite", type=Path, nargs="?", const=DB_SQLITE, default=None, help=f"Also export the DB as SQLite (default path {DB_SQLITE.relative_to(ROOT)}).")
     args = ap.parse_args()
-
-    legacy_db, dbx, meta = build_db(enable_7dsorigin=args.enable_7dsorigin)
-    write_outputs(legacy_db, dbx, meta, do_snapshot=not args.no_snapshot)
+    if args.offline and args.no_cache:
+        ap.error("--offline and --no-cache are mutually exclusive")
+
+    configure_fetch(args.workers, args.per_host, args.rate_limit, args.retries)
+    cache = configure_cache(None if args.no_cache else args.cache_dir, offline=args.offline,
+                            max_mb=args.cache_max_mb, max_age_days=args.cache_max_age_days)
+    memo = configure_parse_memo(None if args.no_parse_cache else PARSE_MEMO_PATH)
+
+    page_hashes: Dict[str,str] = {}
+    legacy_db, dbx, meta = build_db(enable_7dsorigin=args.enable_7dsorigin, incremental=args.incremental, page_hashes=page_hashes)
+    write_outputs(legacy_db, dbx, meta, do_snapshot=not args.no_snapshot, sqlite_path=args.sqlite)
+    save_page_hashes(dbx, page_hashes)
+    memo.save()
+    print(f"[INFO] parser v{PARSER_VERSION}: {memo.misses} texts parsed, {memo.hits} from memo", file=sys.stderr)
+
+    if cache is not None and not args.offline:
+        removed, removed_bytes = cache.evict()
+        if removed:
+            print(f"[INFO] HTTP cache: evicted {removed} entries ({removed_bytes // 1024} KB)", file=sys.stderr)
+    print(f"[INFO] HTTP: {STATS.summary()}", file=sys.stderr)
 
     print("[OK] Updated DB:")
     print(f" - {DB_JSON.relative_to(ROOT)} (normalized)")
-    print(f" - {DB_LIVE_JS.relative_to(ROOT)} (embedded)")
+    print(f" - {DB_LIVE_JS.relative_to(ROOT)} + {LIVE_DIR.relative_to(ROOT)}/ (web app index + shards)")
+    print(f" - {DB_MIN_JSON.relative_to(ROOT)} (+ .gz/.br) and {DB_SIZE_REPORT_JSON.relative_to(ROOT)} (size report)")
+    print(f" - {DB_MANIFEST_JSON.relative_to(ROOT)} (record hashes)")
+    print(f" - {SKILL_TABLES_JSON.relative_to(ROOT)} (+ .gz/.br) (skill tables)")
+    print(f" - {TEXT_INDEX_JSON.relative_to(ROOT)} (+ .gz/.br) (full-text index)")
+    if args.sqlite is not None:
+        print(f" - {args.sqlite} (SQLite export)")
     if not args.no_snapshot:
         print(f" - {SNAP_DIR.relative_to(ROOT)}/ (snapshots)")
         print(f" - {DB_DIFF_JSON.relative_to(ROOT)} (diff latest)")
+        print(f" - {HISTORY_DIR.relative_to(ROOT)}/ (columnar history)")
 
 if __name__ == "__main__":
     main()